@@ -2,6 +2,7 @@ const express = require('express');
 const router = express.Router();
 const {
   getModuleFlows,
+  getModuleIndex,
   getFlow,
   updateModuleFlows,
   generateFlowId
@@ -24,6 +25,16 @@ router.get('/:module', async (req, res, next) => {
   }
 });
 
+// GET /api/flows/:module/index - Get the compact flow index for a module
+router.get('/:module/index', async (req, res, next) => {
+  try {
+    const { module } = req.params;
+    res.json(await getModuleIndex(module));
+  } catch (error) {
+    next(error);
+  }
+});
+
 // GET /api/flows/:module/:flowId - Get specific flow
 router.get('/:module/:flowId', async (req, res, next) => {
   try {
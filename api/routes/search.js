@@ -1,26 +1,81 @@
 const express = require('express');
 const router = express.Router();
-const { searchFlows, getCrossModuleWorkflows } = require('../utils/fileUtils');
+const { searchFlows, getFlow, getCrossModuleWorkflows } = require('../utils/fileUtils');
+const { loadSearchIndex, searchIndex, analyze, expandTerm, highlightResult } = require('../utils/searchIndex');
+const { loadFuzzyIndex, correctQuery } = require('../utils/fuzzyIndex');
+const { loadFacets, selectFlows, hasFlow, toBitmap, flowIdOf, facetCounts, parseFilters } = require('../utils/facets');
 
 // GET /api/search - Search across all flows
 router.get('/', async (req, res, next) => {
   try {
-    const { q, query, module, limit = 50, offset = 0 } = req.query;
+    const { q, query, module, include, limit = 50, offset = 0 } = req.query;
 
-    const searchQuery = q || query;
-    if (!searchQuery || searchQuery.trim().length < 2) {
+    let searchQuery = q || query;
+    if (!searchQuery || !searchQuery.trim()) {
       return res.status(400).json({
-        error: 'Search query must be at least 2 characters',
+        error: 'Search query must not be empty',
         query: searchQuery
       });
     }
 
-    // Search in module flows
-    const results = await searchFlows(searchQuery, { module });
+    // Filters by module, category, topic or cited document need the facet bitmaps,
+    // except a single module, which the searches below can filter on themselves
+    const filters = parseFilters(req.query);
+    const facets = loadFacets();
+    const facetFiltered = Object.keys(filters).some(facet => facet !== 'module' || filters.module.length > 1);
+    if (facetFiltered && !facets) {
+      return res.status(503).json({
+        error: 'Facet filters are unavailable until build_facets.py has been run',
+        filters
+      });
+    }
+    const selected = facets && selectFlows(facets, filters);
+    const moduleFilter = facets ? undefined : module;
+
+    // Search in module flows, with the BM25 index when it is built and current.
+    // BM25 doc ids are the facet flow ids, as both follow iter_all_flows() order.
+    const index = loadSearchIndex();
+    const findFlows = async text => index
+      ? searchIndex(index, text, {
+          module: moduleFilter,
+          allowed: selected && (doc => hasFlow(selected, doc))
+        }).map(hit => ({
+          module: hit.module,
+          flowId: hit.id,
+          flowName: hit.flow_name,
+          category: hit.category,
+          doc: hit.doc,
+          matchedFields: hit.matchedFields.map(field => field === 'name' ? 'flow_name' : field),
+          matchedPositions: hit.matchedPositions,
+          score: hit.score
+        }))
+      : (await searchFlows(text, { module: moduleFilter }))
+          .map(result => ({ ...result, doc: facets ? flowIdOf(facets, result.module, result.flow) : undefined }))
+          .filter(result => !selected || (result.doc !== undefined && hasFlow(selected, result.doc)));
+
+    // Replace misspelt words with their closest known word: with the BM25 index,
+    // words no indexed term starts with; without it, any unknown word once
+    // the substring scan has found nothing
+    let corrections = [];
+    const fuzzyIndex = loadFuzzyIndex();
+    const correct = shouldCorrect => {
+      const corrected = correctQuery(fuzzyIndex, searchQuery, shouldCorrect);
+      corrections = corrected.corrections;
+      searchQuery = corrected.query;
+      return corrections.length > 0;
+    };
+
+    if (fuzzyIndex && index) {
+      correct(word => analyze(index, word).some(term => expandTerm(index, term).length === 0));
+    }
+    let results = await findFlows(searchQuery);
+    if (fuzzyIndex && !index && results.length === 0 && correct()) {
+      results = await findFlows(searchQuery);
+    }
 
-    // Also search in cross-module workflows if no specific module filter
+    // Also search in cross-module workflows if the flows are not filtered
     const crossModuleResults = [];
-    if (!module) {
+    if (!Object.keys(filters).length) {
       const workflows = await getCrossModuleWorkflows();
       const searchTerm = searchQuery.toLowerCase();
 
@@ -72,18 +127,42 @@ router.get('/', async (req, res, next) => {
     const allResults = [...results, ...crossModuleResults];
     allResults.sort((a, b) => b.score - a.score);
 
-    // Apply pagination
-    const paginatedResults = allResults.slice(
+    // Apply pagination. Indexed hits on this page get a snippet cut from the
+    // offsets stored in the index; full flows are only loaded with include=flow.
+    const includeFlow = String(include || '').split(',').includes('flow');
+    const paginatedResults = await Promise.all(allResults.slice(
       parseInt(offset),
       parseInt(offset) + parseInt(limit)
-    );
+    ).map(async result => {
+      if (!result.flowId) {
+        const { doc, ...rest } = result;
+        return rest;
+      }
+      const { snippet, nameHighlights } = highlightResult(index, result);
+      return {
+        module: result.module,
+        flowId: result.flowId,
+        flowName: result.flowName,
+        category: result.category,
+        snippet,
+        nameHighlights,
+        ...(includeFlow && { flow: await getFlow(result.module, result.flowId) }),
+        matchedFields: result.matchedFields,
+        score: result.score
+      };
+    }));
 
     res.json({
       query: searchQuery,
+      ...(corrections.length && { originalQuery: q || query, corrections }),
       total: allResults.length,
       limit: parseInt(limit),
       offset: parseInt(offset),
-      results: paginatedResults
+      results: paginatedResults,
+      // Counts per facet value over all matching flows, for narrowing the search
+      ...(facets && {
+        facets: facetCounts(facets, toBitmap(facets, results.map(result => result.doc).filter(doc => doc !== undefined)))
+      })
     });
   } catch (error) {
     next(error);
@@ -0,0 +1,41 @@
+const express = require('express');
+const router = express.Router();
+const fs = require('fs-extra');
+const path = require('path');
+
+// Written by validate_watch.py at the repository root
+const STATUS_FILE = path.join(__dirname, '../../data/generated/validation_status.json');
+
+// GET /api/validation/status - Latest PDF reference validation results
+router.get('/status', async (req, res, next) => {
+  try {
+    if (!await fs.pathExists(STATUS_FILE)) {
+      return res.status(404).json({
+        error: 'No validation status available. Run validate_watch.py to generate it.'
+      });
+    }
+
+    const status = await fs.readJson(STATUS_FILE);
+    const { module } = req.query;
+
+    if (module) {
+      if (!status.modules[module]) {
+        return res.status(404).json({
+          error: 'Module not found in validation status',
+          module: module
+        });
+      }
+      return res.json({
+        generated_at: status.generated_at,
+        module: module,
+        ...status.modules[module]
+      });
+    }
+
+    res.json(status);
+  } catch (error) {
+    next(error);
+  }
+});
+
+module.exports = router;
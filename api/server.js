@@ -18,6 +18,7 @@ const moduleRoutes = require('./routes/modules');
 const crossModuleRoutes = require('./routes/crossModule');
 const searchRoutes = require('./routes/search');
 const updateFlowRoutes = require('./routes/updateFlow');
+const validationRoutes = require('./routes/validation');
 
 // Health check
 app.get('/api/health', (req, res) => {
@@ -30,6 +31,7 @@ app.use('/api/modules', moduleRoutes);
 app.use('/api/cross-module', crossModuleRoutes);
 app.use('/api/search', searchRoutes);
 app.use('/api/update-flow', updateFlowRoutes);
+app.use('/api/validation', validationRoutes);
 
 // Error handling middleware
 app.use((err, req, res, next) => {
@@ -0,0 +1,73 @@
+#!/usr/bin/env node
+
+// Compares GET /api/search from the Express API with search_service.py.
+// Start both first:
+//   node server.js                      (port 3001)
+//   python3 ../search_service.py        (port 3002)
+// Bodies must be byte for byte identical. Non-integer limit/offset values
+// are left out: the service answers them with a 400 where Express uses NaN.
+
+const EXPRESS_BASE = process.env.EXPRESS_BASE || 'http://localhost:3001/api/search';
+const SERVICE_BASE = process.env.SERVICE_BASE || 'http://localhost:3002/api/search';
+
+const QUERIES = [
+  'q=alerts',
+  'q=email%20alerts',
+  'query=dashboard',
+  'q=dash',
+  'q=%22smart%20alerts%22',
+  'q=alrets',
+  'q=crisis',
+  'q=report&module=measure',
+  'q=report&module=measure,listen',
+  'q=post&category=Content%20Creation',
+  'q=search&topic=alerts',
+  'q=search&module=listen&include=flow',
+  'q=export&limit=3',
+  'q=export&limit=3&offset=2',
+  'q=export&offset=-2&limit=3',
+  'q=export&limit=-1',
+  'q=export&limit=0',
+  'q=export&offset=1000',
+  'q=export&limit=5abc',
+  'q=zzzzqqq',
+  'q=',
+  'q=%20%20',
+  ''
+];
+
+async function fetchSearch(base, params) {
+  const response = await fetch(params ? `${base}?${params}` : base);
+  return { status: response.status, body: await response.text() };
+}
+
+async function runTests() {
+  console.log('🧪 Comparing search_service.py with the Express search route\n');
+  console.log('=' .repeat(50));
+
+  let failures = 0;
+  for (const params of QUERIES) {
+    const [express, service] = await Promise.all([
+      fetchSearch(EXPRESS_BASE, params),
+      fetchSearch(SERVICE_BASE, params)
+    ]);
+    const same = express.status === service.status && express.body === service.body;
+    console.log(`   ${same ? '✅' : '❌'} ${params || '(no parameters)'} → ${express.status}`);
+    if (!same) {
+      failures++;
+      console.log(`      Express ${express.status}: ${express.body.slice(0, 200)}`);
+      console.log(`      Service ${service.status}: ${service.body.slice(0, 200)}`);
+    }
+  }
+
+  console.log('\n' + '=' .repeat(50));
+  console.log(failures
+    ? `❌ ${failures} of ${QUERIES.length} responses differ\n`
+    : `✨ All ${QUERIES.length} responses match\n`);
+  process.exitCode = failures ? 1 : 0;
+}
+
+runTests().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,174 @@
+const fs = require('fs');
+const path = require('path');
+
+// Binary chunk store built by build_chunk_store.py
+const CHUNK_STORE_FILE = path.join(__dirname, '../../data/generated/chunk_store.bin');
+const PDFS_PATH = path.join(__dirname, '../../public/pdfs');
+
+const MAGIC = 'BWCHUNKS';
+const STORE_VERSION = 1;
+const HEADER_SIZE = 64;
+const CHUNK_RECORD_SIZE = 32;
+const PDF_RECORD_SIZE = 40;
+
+let cachedStore = null;
+let cachedMtime = 0;
+
+// Open the store, reading only the header, chunk and PDF tables and the
+// string pool. Chunk text stays on disk and is read per passage.
+// Returns null if the store has not been built, is not a known version or
+// a PDF changed since it was built.
+function loadChunkStore() {
+  let stat;
+  try {
+    stat = fs.statSync(CHUNK_STORE_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (cachedStore && stat.mtimeMs === cachedMtime) {
+    return pdfsAreCurrent(cachedStore) ? cachedStore : null;
+  }
+  if (cachedStore) {
+    fs.closeSync(cachedStore.fd);
+    cachedStore = null;
+  }
+
+  const fd = fs.openSync(CHUNK_STORE_FILE, 'r');
+  const header = Buffer.alloc(HEADER_SIZE);
+  fs.readSync(fd, header, 0, HEADER_SIZE, 0);
+  if (header.toString('latin1', 0, 8) !== MAGIC || header.readUInt32LE(8) !== STORE_VERSION) {
+    fs.closeSync(fd);
+    return null;
+  }
+
+  const chunkCount = header.readUInt32LE(12);
+  const pdfCount = header.readUInt32LE(16);
+  const chunksOffset = Number(header.readBigUInt64LE(24));
+  const textOffset = Number(header.readBigUInt64LE(48));
+
+  // Chunk table, PDF table and strings are contiguous and small
+  const tables = Buffer.alloc(textOffset - chunksOffset);
+  fs.readSync(fd, tables, 0, tables.length, chunksOffset);
+
+  const store = {
+    fd,
+    tables,
+    chunkCount,
+    pdfCount,
+    pdfsStart: Number(header.readBigUInt64LE(32)) - chunksOffset,
+    stringsStart: Number(header.readBigUInt64LE(40)) - chunksOffset,
+    textOffset,
+    pdfIds: new Map()
+  };
+  for (let pdf = 0; pdf < pdfCount; pdf++) {
+    store.pdfIds.set(pdfRecord(store, pdf).path, pdf);
+  }
+
+  cachedStore = store;
+  cachedMtime = stat.mtimeMs;
+  return pdfsAreCurrent(store) ? store : null;
+}
+
+// Whether every PDF still has the size and mtime_ns it was chunked at, as ChunkStore.is_stale()
+function pdfsAreCurrent(store) {
+  for (let pdf = 0; pdf < store.pdfCount; pdf++) {
+    const record = pdfRecord(store, pdf);
+    try {
+      const pdfStat = fs.statSync(path.join(PDFS_PATH, ...record.path.split('/')), { bigint: true });
+      if (pdfStat.size !== record.size || pdfStat.mtimeNs !== record.mtimeNs) {
+        return false;
+      }
+    } catch (error) {
+      return false;
+    }
+  }
+  return true;
+}
+
+function readString(store, offset, length) {
+  const start = store.stringsStart + offset;
+  return store.tables.toString('utf8', start, start + length);
+}
+
+function pdfRecord(store, pdf) {
+  const base = store.pdfsStart + pdf * PDF_RECORD_SIZE;
+  const t = store.tables;
+  return {
+    path: readString(store, t.readUInt32LE(base), t.readUInt32LE(base + 4)),
+    module: readString(store, t.readUInt32LE(base + 8), t.readUInt32LE(base + 12)) || null,
+    firstChunk: t.readUInt32LE(base + 16),
+    chunkCount: t.readUInt32LE(base + 20),
+    size: t.readBigUInt64LE(base + 24),
+    mtimeNs: t.readBigUInt64LE(base + 32)
+  };
+}
+
+function chunkRecord(store, chunk) {
+  const base = chunk * CHUNK_RECORD_SIZE;
+  const t = store.tables;
+  return {
+    textOffset: Number(t.readBigUInt64LE(base)),
+    textLength: t.readUInt32LE(base + 8),
+    pdf: t.readUInt32LE(base + 12),
+    pageStart: t.readUInt16LE(base + 16),
+    pageEnd: t.readUInt16LE(base + 18),
+    heading: readString(store, t.readUInt32LE(base + 20), t.readUInt32LE(base + 24)),
+    words: t.readUInt32LE(base + 28)
+  };
+}
+
+// One chunk with its text, read from disk at its offset
+function getChunk(store, chunk) {
+  const record = chunkRecord(store, chunk);
+  const text = Buffer.alloc(record.textLength);
+  fs.readSync(store.fd, text, 0, record.textLength, store.textOffset + record.textOffset);
+  const pdf = pdfRecord(store, record.pdf);
+  return {
+    chunk,
+    pdf: pdf.path,
+    module: pdf.module,
+    pageStart: record.pageStart,
+    pageEnd: record.pageEnd,
+    // Opens the PDF viewers at the passage's first page
+    anchor: `${pdf.path}#page=${record.pageStart}`,
+    heading: record.heading,
+    words: record.words,
+    text: text.toString('utf8')
+  };
+}
+
+// Chunks of one PDF (path relative to public/pdfs), optionally only
+// those covering a 1-based page
+function getPassages(store, pdfPath, options = {}) {
+  const pdf = store.pdfIds.get(pdfPath);
+  if (pdf === undefined) {
+    return [];
+  }
+
+  const { firstChunk, chunkCount } = pdfRecord(store, pdf);
+  const passages = [];
+  for (let chunk = firstChunk; chunk < firstChunk + chunkCount; chunk++) {
+    if (options.page) {
+      const { pageStart, pageEnd } = chunkRecord(store, chunk);
+      if (options.page < pageStart || options.page > pageEnd) continue;
+    }
+    passages.push(getChunk(store, chunk));
+    if (options.limit && passages.length >= options.limit) break;
+  }
+  return passages;
+}
+
+// PDF paths in the store containing text (case-insensitive)
+function findPdfs(store, text) {
+  const needle = text.toLowerCase();
+  return Array.from(store.pdfIds.keys()).filter(pdfPath => pdfPath.toLowerCase().includes(needle));
+}
+
+module.exports = {
+  loadChunkStore,
+  getChunk,
+  getPassages,
+  findPdfs,
+  CHUNK_STORE_FILE
+};
@@ -0,0 +1,167 @@
+const fs = require('fs');
+const path = require('path');
+const { sourcesAreCurrent } = require('./searchIndex');
+
+// Facet bitmaps built by build_facets.py
+const FACETS_FILE = path.join(__dirname, '../../data/generated/facets.json');
+
+const FACET_NAMES = ['module', 'category', 'topic', 'document'];
+
+let cachedFacets = null;
+let cachedMtime = 0;
+
+// Load the facets once, reloading only when the file changes.
+// Returns null if they have not been built or a module file is newer than them.
+function loadFacets() {
+  let stat;
+  try {
+    stat = fs.statSync(FACETS_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (!cachedFacets || stat.mtimeMs !== cachedMtime) {
+    const raw = JSON.parse(fs.readFileSync(FACETS_FILE, 'utf8'));
+    const words = Math.ceil(raw.flows.length / 32);
+    const bitmaps = {};
+    const counts = {};
+    for (const [facet, values] of Object.entries(raw.facets)) {
+      bitmaps[facet] = new Map();
+      counts[facet] = {};
+      for (const [value, [count, containers]] of Object.entries(values)) {
+        bitmaps[facet].set(value, decodeBitmap(containers, words));
+        counts[facet][value] = count;
+      }
+    }
+    const all = new Uint32Array(words).fill(0xFFFFFFFF);
+    if (raw.flows.length % 32) all[words - 1] = (1 << (raw.flows.length % 32)) - 1;
+    const ids = new Map(raw.flows.map(([moduleId, flowRef], id) => [`${moduleId}/${flowRef}`, id]));
+    cachedFacets = { sources: raw.sources, flows: raw.flows, ids, bitmaps, counts, all };
+    cachedMtime = stat.mtimeMs;
+  }
+
+  return sourcesAreCurrent(cachedFacets.sources) ? cachedFacets : null;
+}
+
+// Roaring-style containers (see build_facets.encode_bitmap) to a flat bitset of 32-bit words
+function decodeBitmap(containers, words) {
+  const bits = new Uint32Array(words);
+  const set = id => {
+    bits[id >>> 5] |= 1 << (id & 31);
+  };
+  for (const [high, kind, payload] of containers) {
+    const base = high << 16;
+    if (kind === 'array') {
+      for (const low of payload) set(base + low);
+    } else if (kind === 'run') {
+      for (const [start, extra] of payload) {
+        for (let low = start; low <= start + extra; low++) set(base + low);
+      }
+    } else {
+      const bytes = Buffer.from(payload, 'base64');
+      for (let i = 0; i < bytes.length; i++) {
+        for (let bit = 0; bytes[i] >> bit; bit++) {
+          if (bytes[i] >> bit & 1) set(base + i * 8 + bit);
+        }
+      }
+    }
+  }
+  return bits;
+}
+
+function popcount(word) {
+  word -= (word >>> 1) & 0x55555555;
+  word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+  return (((word + (word >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+}
+
+// Flow ids matching { facet: [values] } as a bitset: any value within a facet,
+// every facet given. Unknown facets or values match nothing.
+function selectFlows(facets, filters) {
+  const selected = facets.all.slice();
+  for (const [facet, values] of Object.entries(filters)) {
+    const union = new Uint32Array(selected.length);
+    for (const value of values) {
+      const bits = facets.bitmaps[facet] && facets.bitmaps[facet].get(value);
+      if (!bits) continue;
+      for (let i = 0; i < union.length; i++) union[i] |= bits[i];
+    }
+    for (let i = 0; i < selected.length; i++) selected[i] &= union[i];
+  }
+  return selected;
+}
+
+function hasFlow(bits, id) {
+  return (bits[id >>> 5] >>> (id & 31) & 1) === 1;
+}
+
+// Bitset of the given flow ids
+function toBitmap(facets, ids) {
+  const bits = new Uint32Array(facets.all.length);
+  for (const id of ids) bits[id >>> 5] |= 1 << (id & 31);
+  return bits;
+}
+
+// Selected flow ids in order
+function flowIds(bits) {
+  const ids = [];
+  for (let i = 0; i < bits.length; i++) {
+    for (let word = bits[i]; word; word &= word - 1) {
+      ids.push(i * 32 + 31 - Math.clz32(word & -word));
+    }
+  }
+  return ids;
+}
+
+// { facet: { value: count } } over the selected flows, most frequent first, zero counts left out
+function facetCounts(facets, selected) {
+  const counts = {};
+  for (const [facet, values] of Object.entries(facets.bitmaps)) {
+    const facetCount = [];
+    for (const [value, bits] of values) {
+      let count = 0;
+      for (let i = 0; i < bits.length; i++) {
+        if (bits[i] & selected[i]) count += popcount(bits[i] & selected[i]);
+      }
+      if (count) facetCount.push([value, count]);
+    }
+    facetCount.sort((a, b) => b[1] - a[1]);
+    counts[facet] = Object.fromEntries(facetCount);
+  }
+  return counts;
+}
+
+// Dense id of a module flow, keyed like flow_data.get_flow_ref(); undefined if not indexed
+function flowIdOf(facets, moduleId, flow) {
+  const flowRef = flow.flow_id || flow.id || (flow.flow_name || flow.name || '').replace(/[ -]/g, '_');
+  return facets.ids.get(`${moduleId}/${flowRef}`);
+}
+
+// Filters from query parameters: a facet repeated for several values, or given
+// comma-separated (except document, as PDF paths contain commas)
+function parseFilters(params) {
+  const filters = {};
+  for (const facet of FACET_NAMES) {
+    const raw = params[facet];
+    if (!raw) continue;
+    const values = (Array.isArray(raw) ? raw : [raw])
+      .flatMap(value => facet === 'document' ? [String(value)] : String(value).split(','))
+      .map(value => value.trim())
+      .filter(Boolean);
+    if (values.length) filters[facet] = values;
+  }
+  return filters;
+}
+
+module.exports = {
+  loadFacets,
+  selectFlows,
+  hasFlow,
+  toBitmap,
+  flowIds,
+  flowIdOf,
+  facetCounts,
+  parseFilters,
+  FACET_NAMES,
+  FACETS_FILE
+};
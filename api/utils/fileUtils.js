@@ -87,13 +87,79 @@ async function getModuleFlows(moduleId) {
   return [];
 }
 
+// Per-flow shards written by build_flow_shards.py
+const SHARDS_PATH = path.join(DATA_PATH, 'generated', 'flows');
+
+// Read a module's shard index, or null if it is missing or older than the module file
+async function readShardIndex(moduleId) {
+  const fileName = MODULE_FILES[moduleId];
+  if (!fileName) {
+    throw new Error(`Invalid module: ${moduleId}`);
+  }
+
+  try {
+    const index = await fs.readJson(path.join(SHARDS_PATH, moduleId, 'index.json'));
+    const stat = await fs.stat(path.join(DATA_PATH, fileName), { bigint: true });
+    if (index.source_size === Number(stat.size) &&
+        index.source_mtime_ms === Number(stat.mtimeNs / 1000000n)) {
+      return index;
+    }
+  } catch (error) {
+    // Shards have not been built
+  }
+  return null;
+}
+
+// Flow fields copied into index rows, as build_flow_shards.SUMMARY_FIELDS
+const SUMMARY_FIELDS = [
+  'flow_id', 'id', 'flow_name', 'name', 'description', 'flowCategory', 'category',
+  'categoryDescription', 'isPrerequisite', 'dependencies', 'source_documents'
+];
+
+// Get the compact flow index for a module (id, name, category, step count, summary)
+async function getModuleIndex(moduleId) {
+  const index = await readShardIndex(moduleId);
+  if (index) {
+    return { module: moduleId, count: index.count, sharded: true, flows: index.flows };
+  }
+
+  const flows = await getModuleFlows(moduleId);
+  return {
+    module: moduleId,
+    count: flows.length,
+    sharded: false,
+    flows: flows.map(f => {
+      const name = f.flow_name || f.name || '';
+      return {
+        id: f.flow_id || f.id || name.replace(/ /g, '_').replace(/-/g, '_'),
+        flow_id: f.flow_id || f.id || name.toLowerCase().replace(/\s+/g, '_'),
+        name: name,
+        category: f.category || f.flowCategory || null,
+        steps: (f.steps || []).length,
+        summary: Object.fromEntries(Object.entries(f).filter(([field]) => SUMMARY_FIELDS.includes(field)))
+      };
+    })
+  };
+}
+
 // Get a specific flow
 async function getFlow(moduleId, flowId) {
+  // Read just the one shard when the shards are up to date
+  const index = await readShardIndex(moduleId);
+  if (index) {
+    const entry = index.flows.find(f => f.id === flowId || f.flow_id === flowId);
+    if (entry) {
+      return await readJsonFile(path.join(SHARDS_PATH, moduleId, entry.file));
+    }
+  }
+
   const flows = await getModuleFlows(moduleId);
   return flows.find(f =>
     f.flow_id === flowId ||
     f.id === flowId ||
-    (f.flow_name && f.flow_name.toLowerCase().replace(/\s+/g, '_') === flowId)
+    (f.flow_name && f.flow_name.toLowerCase().replace(/\s+/g, '_') === flowId) ||
+    // Reference form used in related_flows and the search index
+    ((f.flow_name || f.name || '').replace(/ /g, '_').replace(/-/g, '_') === flowId)
   );
 }
 
@@ -237,6 +303,7 @@ module.exports = {
   readJsonFile,
   writeJsonFile,
   getModuleFlows,
+  getModuleIndex,
   getFlow,
   updateModuleFlows,
   searchFlows,
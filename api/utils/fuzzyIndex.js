@@ -0,0 +1,146 @@
+const fs = require('fs');
+const path = require('path');
+const { sourcesAreCurrent } = require('./searchIndex');
+
+// Trigram word index built by build_fuzzy_index.py
+const FUZZY_INDEX_FILE = path.join(__dirname, '../../data/generated/fuzzy_index.json');
+
+const MIN_WORD_LENGTH = 3;
+
+let cachedIndex = null;
+let cachedMtime = 0;
+
+// Load the index once, reloading only when the file changes.
+// Returns null if it has not been built or a module file is newer than it.
+function loadFuzzyIndex() {
+  let stat;
+  try {
+    stat = fs.statSync(FUZZY_INDEX_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (!cachedIndex || stat.mtimeMs !== cachedMtime) {
+    const raw = JSON.parse(fs.readFileSync(FUZZY_INDEX_FILE, 'utf8'));
+    const postings = new Map();
+    for (const [gram, deltas] of Object.entries(raw.grams)) {
+      const ids = new Uint32Array(deltas.length);
+      let id = 0;
+      deltas.forEach((delta, i) => {
+        id += delta;
+        ids[i] = id;
+      });
+      postings.set(gram, ids);
+    }
+    cachedIndex = {
+      sources: raw.sources,
+      words: raw.words,
+      counts: raw.counts,
+      ids: new Map(raw.words.map((word, id) => [word, id])),
+      postings,
+      gramsPerEdit: raw.grams_per_edit,
+      shared: new Uint16Array(raw.words.length)
+    };
+    cachedMtime = stat.mtimeMs;
+  }
+  return cachedIndex.sources && sourcesAreCurrent(cachedIndex.sources) ? cachedIndex : null;
+}
+
+// Same thresholds as build_fuzzy_index.max_edits()
+function maxEdits(word) {
+  if (word.length < MIN_WORD_LENGTH) return 0;
+  return word.length <= 4 ? 1 : 2;
+}
+
+function trigrams(word) {
+  const padded = `^${word}$`;
+  const grams = [];
+  for (let i = 0; i + 3 <= padded.length; i++) {
+    grams.push(padded.slice(i, i + 3));
+  }
+  return grams;
+}
+
+// Optimal string alignment distance, or limit + 1 once it must exceed limit
+function boundedDistance(a, b, limit) {
+  if (Math.abs(a.length - b.length) > limit) return limit + 1;
+  let previousPrevious = null;
+  let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      let value = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+      if (previousPrevious && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+        value = Math.min(value, previousPrevious[j - 2] + 1);
+      }
+      current.push(value);
+      if (value < rowMin) rowMin = value;
+    }
+    if (rowMin > limit) return limit + 1;
+    previousPrevious = previous;
+    previous = current;
+  }
+  return previous[b.length];
+}
+
+// Words within maxEdits(word) of word: [{ word, distance, count }], closest then most frequent
+function lookupWord(index, word, limit = 5) {
+  word = word.toLowerCase();
+  if (index.ids.has(word)) {
+    return [{ word, distance: 0, count: index.counts[index.ids.get(word)] }];
+  }
+  const edits = maxEdits(word);
+  if (!edits) return [];
+
+  const grams = trigrams(word);
+  const needed = Math.max(1, grams.length - index.gramsPerEdit * edits);
+  const shared = index.shared;
+  const touched = [];
+  for (const gram of new Set(grams)) {
+    const ids = index.postings.get(gram);
+    if (!ids) continue;
+    for (const id of ids) {
+      if (shared[id] === 0) touched.push(id);
+      shared[id]++;
+    }
+  }
+
+  const matches = [];
+  for (const id of touched) {
+    if (shared[id] >= needed) {
+      const distance = boundedDistance(word, index.words[id], edits);
+      if (distance <= edits) {
+        matches.push({ word: index.words[id], distance, count: index.counts[id] });
+      }
+    }
+    shared[id] = 0;
+  }
+
+  matches.sort((a, b) => a.distance - b.distance || b.count - a.count);
+  return matches.slice(0, limit);
+}
+
+// Replace words the index does not know with their closest known word.
+// shouldCorrect(word) can exempt words the caller can already match.
+// Returns { query, corrections: [{ from, to, distance }] }; quoting is kept.
+function correctQuery(index, query, shouldCorrect = () => true) {
+  const corrections = [];
+  const corrected = query.replace(/[A-Za-z0-9]+(?:'[A-Za-z]+)?/g, original => {
+    const word = original.toLowerCase();
+    if (/^\d+$/.test(word) || index.ids.has(word) || !shouldCorrect(word)) return original;
+    const [best] = lookupWord(index, word, 1);
+    if (!best) return original;
+    corrections.push({ from: original, to: best.word, distance: best.distance });
+    return best.word;
+  });
+  return { query: corrected, corrections };
+}
+
+module.exports = {
+  loadFuzzyIndex,
+  lookupWord,
+  correctQuery,
+  FUZZY_INDEX_FILE
+};
@@ -0,0 +1,43 @@
+const fs = require('fs');
+const path = require('path');
+const { sourcesAreCurrent } = require('./searchIndex');
+
+// Cited pages of source_documents built by build_page_citations.py
+const PAGE_CITATIONS_FILE = path.join(__dirname, '../../public/data/generated/page_citations.json');
+
+let cachedCitations = null;
+let cachedMtime = 0;
+
+// Load the page citations once, reloading only when the file changes.
+// Returns null if they have not been built or a module file is newer than them.
+function loadPageCitations() {
+  let stat;
+  try {
+    stat = fs.statSync(PAGE_CITATIONS_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (!cachedCitations || stat.mtimeMs !== cachedMtime) {
+    cachedCitations = JSON.parse(fs.readFileSync(PAGE_CITATIONS_FILE, 'utf8'));
+    cachedMtime = stat.mtimeMs;
+  }
+
+  return sourcesAreCurrent(cachedCitations.sources) ? cachedCitations : null;
+}
+
+// source_pages of a module flow: from the module file when --write put them there,
+// otherwise from the built citations; [] when neither has them
+function flowPageCitations(moduleId, flow) {
+  if (flow.source_pages) return flow.source_pages;
+  const citations = loadPageCitations();
+  const flowRef = flow.flow_id || flow.id || (flow.flow_name || flow.name || '').replace(/[ -]/g, '_');
+  const entry = citations && citations.modules[moduleId] && citations.modules[moduleId][flowRef];
+  return entry ? entry.source_pages : [];
+}
+
+module.exports = {
+  loadPageCitations,
+  flowPageCitations,
+  PAGE_CITATIONS_FILE
+};
@@ -0,0 +1,303 @@
+const fs = require('fs');
+const path = require('path');
+
+// BM25 index built by build_search_index.py
+const SEARCH_INDEX_FILE = path.join(__dirname, '../../data/generated/search_index.json');
+const DATA_PATH = path.join(__dirname, '../../public/data');
+
+const TOKEN_RE = /[a-z0-9]+(?:'[a-z]+)?/g;
+// Partial words expand to at most this many indexed terms
+const MAX_PREFIX_EXPANSIONS = 20;
+// Same as build_search_index.SNIPPET_FIELDS and the text_utils snippet settings
+const SNIPPET_FIELDS = ['description', 'steps', 'prerequisites'];
+const SNIPPET_CHARS = 160;
+const SNIPPET_LEAD_TOKENS = 4;
+
+let cachedIndex = null;
+let cachedMtime = 0;
+
+// Load the index once, reloading only when the file changes.
+// Returns null if it has not been built or a module file is newer than it.
+function loadSearchIndex() {
+  let stat;
+  try {
+    stat = fs.statSync(SEARCH_INDEX_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (!cachedIndex || stat.mtimeMs !== cachedMtime) {
+    const index = JSON.parse(fs.readFileSync(SEARCH_INDEX_FILE, 'utf8'));
+    index.fieldNames = Object.keys(index.fields);
+    index.sortedTerms = Object.keys(index.terms).sort();
+    index.stopWords = new Set(index.analyzer.stop_words);
+    cachedIndex = index;
+    cachedMtime = stat.mtimeMs;
+  }
+
+  return sourcesAreCurrent(cachedIndex.sources) ? cachedIndex : null;
+}
+
+// Whether the module files still match the { moduleId: { size, mtime_ms } } an artifact was built from
+function sourcesAreCurrent(sources) {
+  for (const [moduleId, source] of Object.entries(sources)) {
+    try {
+      const moduleStat = fs.statSync(path.join(DATA_PATH, `${moduleId}_user_flows_with_citations.json`), { bigint: true });
+      if (Number(moduleStat.size) !== source.size || Number(moduleStat.mtimeNs / 1000000n) !== source.mtime_ms) {
+        return false;
+      }
+    } catch (error) {
+      return false;
+    }
+  }
+  return true;
+}
+
+// Same suffix stripping as text_utils.stem()
+function stem(token, suffixes) {
+  for (const suffix of suffixes) {
+    if (token.endsWith(suffix) && token.length - suffix.length >= 3) {
+      const stemmed = token.slice(0, -suffix.length);
+      return suffix === 'ies' || suffix === 'ied' ? stemmed + 'y' : stemmed;
+    }
+  }
+  return token;
+}
+
+// Same analysis as text_utils.stemmed_tokens()
+function analyze(index, text) {
+  const tokens = text.toLowerCase().match(TOKEN_RE) || [];
+  return tokens
+    .filter(token => !index.stopWords.has(token))
+    .map(token => stem(token, index.analyzer.suffixes));
+}
+
+// Indexed terms for a query term: the term itself, or the terms it prefixes
+function expandTerm(index, term) {
+  if (index.terms[term]) {
+    return [term];
+  }
+
+  const terms = index.sortedTerms;
+  let low = 0;
+  let high = terms.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (terms[mid] < term) low = mid + 1;
+    else high = mid;
+  }
+
+  const expansions = [];
+  for (let i = low; i < terms.length && terms[i].startsWith(term); i++) {
+    expansions.push(terms[i]);
+    if (expansions.length >= MAX_PREFIX_EXPANSIONS) break;
+  }
+  return expansions;
+}
+
+// A doc's entries in a posting list, which is sorted by doc, found by binary search
+function docPostings(postings, doc) {
+  let low = 0;
+  let high = postings.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (postings[mid][0] < doc) low = mid + 1;
+    else high = mid;
+  }
+
+  let end = low;
+  while (end < postings.length && postings[end][0] === doc) end++;
+  return postings.slice(low, end);
+}
+
+// Phrase starts that are followed by the term `offset` positions later: a
+// merge of two sorted position lists
+function followedBy(starts, positions, offset) {
+  const kept = [];
+  let i = 0;
+  let j = 0;
+  while (i < starts.length && j < positions.length) {
+    const start = positions[j] - offset;
+    if (starts[i] === start) {
+      kept.push(start);
+      i++;
+      j++;
+    } else if (starts[i] < start) {
+      i++;
+    } else {
+      j++;
+    }
+  }
+  return kept;
+}
+
+// Whether the phrase's terms occur at consecutive positions in one field of a doc
+function matchesPhrase(index, doc, phraseTerms) {
+  if (!phraseTerms.length || !phraseTerms.every(term => index.terms[term])) return false;
+
+  const entries = phraseTerms.map(term => docPostings(index.terms[term][1], doc));
+  for (const [, field, , positions] of entries[0]) {
+    let starts = positions;
+    for (let offset = 1; offset < phraseTerms.length && starts.length; offset++) {
+      const entry = entries[offset].find(([, code]) => code === field);
+      starts = entry ? followedBy(starts, entry[3], offset) : [];
+    }
+    if (starts.length) return true;
+  }
+  return false;
+}
+
+// Rank flows for a query. Quoted parts must match as phrases.
+// options.allowed(doc) can restrict the docs, e.g. to a facet selection.
+// Returns [{ doc, module, id, flow_name, category, description, score, matchedFields,
+// matchedPositions: { field: [token positions] } }] best first.
+function searchIndex(index, query, options = {}) {
+  const phrases = [];
+  const plainQuery = query.replace(/"([^"]+)"/g, (match, phrase) => {
+    phrases.push(analyze(index, phrase));
+    return ` ${phrase} `;
+  });
+
+  const scores = new Map();
+  const matchedFields = new Map();
+  const matchedPositions = new Map();
+  for (const queryTerm of new Set(analyze(index, plainQuery))) {
+    for (const term of expandTerm(index, queryTerm)) {
+      const [idf, postings] = index.terms[term];
+      for (const [doc, code, tf, positions] of postings) {
+        if (options.module && index.docs[doc].module !== options.module) continue;
+        if (options.allowed && !options.allowed(doc)) continue;
+
+        const field = index.fieldNames[code];
+        const norm = index.norms[field][doc];
+        const score = idf * index.fields[field].boost * (tf * (index.k1 + 1)) / (tf + norm);
+        scores.set(doc, (scores.get(doc) || 0) + score);
+
+        if (!matchedFields.has(doc)) {
+          matchedFields.set(doc, new Set());
+          matchedPositions.set(doc, {});
+        }
+        matchedFields.get(doc).add(field);
+        const fieldPositions = matchedPositions.get(doc);
+        fieldPositions[field] = (fieldPositions[field] || []).concat(positions);
+      }
+    }
+  }
+
+  const results = [];
+  for (const [doc, score] of scores) {
+    if (phrases.some(phrase => phrase.length && !matchesPhrase(index, doc, phrase))) continue;
+    results.push({
+      doc,
+      ...index.docs[doc],
+      score: Math.round(score * 1000) / 1000,
+      matchedFields: Array.from(matchedFields.get(doc)),
+      matchedPositions: matchedPositions.get(doc)
+    });
+  }
+
+  results.sort((a, b) => b.score - a.score);
+  return results;
+}
+
+// Token spans of an indexed field from its [gap, length, ...] encoding
+function fieldSpans(index, field, doc) {
+  const [text, flat] = index.snippets[field][doc];
+  const spans = [];
+  let end = 0;
+  for (let i = 0; i < flat.length; i += 2) {
+    const start = end + flat[i];
+    end = start + flat[i + 1];
+    spans.push([start, end]);
+  }
+  return { text, spans };
+}
+
+// Same window as text_utils.cut_snippet(): an excerpt opening a few tokens before
+// the run of matched positions that fits most of them into maxChars.
+// Returns { text, highlights: [[start, end], ...] within the excerpt }.
+function cutSnippet(text, spans, positions, maxChars = SNIPPET_CHARS) {
+  const hits = Array.from(new Set(positions.filter(p => p >= 0 && p < spans.length))).sort((a, b) => a - b);
+  if (!hits.length) {
+    let end = text.length;
+    if (end > maxChars) {
+      end = Math.max(...spans.map(([, tokenEnd]) => tokenEnd).filter(tokenEnd => tokenEnd <= maxChars), 0) || maxChars;
+    }
+    return { text: text.slice(0, end).replace(/\n/g, ' ') + (end < text.length ? '…' : ''), highlights: [] };
+  }
+
+  let best = 0;
+  let bestCount = 0;
+  let last = 0;
+  for (let first = 0; first < hits.length; first++) {
+    last = Math.max(last, first);
+    while (last + 1 < hits.length && spans[hits[last + 1]][1] - spans[hits[first]][0] <= maxChars) last++;
+    if (last - first + 1 > bestCount) {
+      best = first;
+      bestCount = last - first + 1;
+    }
+  }
+  const covered = hits.slice(best, best + bestCount);
+  const lastHit = covered[covered.length - 1];
+
+  let lead = Math.max(covered[0] - SNIPPET_LEAD_TOKENS, 0);
+  while (lead < covered[0] && spans[lastHit][1] - spans[lead][0] > maxChars) lead++;
+  const start = lead === 0 ? 0 : spans[lead][0];
+  let end = text.length;
+  if (text.length - start > maxChars) {
+    end = spans[lastHit][1];
+    for (let i = lastHit + 1; i < spans.length && spans[i][1] - start <= maxChars; i++) {
+      end = spans[i][1];
+    }
+  }
+
+  const prefix = start > 0 ? '…' : '';
+  const shift = prefix.length - start;
+  return {
+    text: prefix + text.slice(start, end).replace(/\n/g, ' ') + (end < text.length ? '…' : ''),
+    highlights: hits
+      .filter(p => spans[p][0] >= start && spans[p][1] <= end)
+      .map(p => [spans[p][0] + shift, spans[p][1] + shift])
+  };
+}
+
+// Snippet and name highlights of a search result from the offsets stored at build
+// time, with no re-tokenizing. The snippet comes from the field with the most
+// matched positions. Returns { snippet: { field, text, highlights }, nameHighlights }.
+function highlightResult(index, result) {
+  const matched = result.matchedPositions || {};
+  let field = SNIPPET_FIELDS[0];
+  for (const candidate of SNIPPET_FIELDS) {
+    if (new Set(matched[candidate] || []).size > new Set(matched[field] || []).size) field = candidate;
+  }
+
+  const { text, spans } = fieldSpans(index, field, result.doc);
+  const name = fieldSpans(index, 'name', result.doc);
+  return {
+    snippet: { field, ...cutSnippet(text, spans, matched[field] || []) },
+    nameHighlights: Array.from(new Set(matched.name || [])).sort((a, b) => a - b).map(p => name.spans[p])
+  };
+}
+
+// Text with each highlight wrapped in markers, like text_utils.mark_highlights()
+function markHighlights(text, highlights, before = '**', after = '**') {
+  let marked = '';
+  let previous = 0;
+  for (const [start, end] of highlights) {
+    marked += text.slice(previous, start) + before + text.slice(start, end) + after;
+    previous = end;
+  }
+  return marked + text.slice(previous);
+}
+
+module.exports = {
+  loadSearchIndex,
+  searchIndex,
+  analyze,
+  expandTerm,
+  highlightResult,
+  cutSnippet,
+  markHighlights,
+  sourcesAreCurrent,
+  SEARCH_INDEX_FILE
+};
@@ -0,0 +1,33 @@
+const fs = require('fs');
+const path = require('path');
+const { sourcesAreCurrent } = require('./searchIndex');
+
+// Topic posting lists built by build_topic_index.py
+const TOPIC_INDEX_FILE = path.join(__dirname, '../../data/generated/topic_index.json');
+
+let cachedIndex = null;
+let cachedMtime = 0;
+
+// Load the topic index once, reloading only when the file changes.
+// Returns null if it has not been built or a module file is newer than it.
+function loadTopicIndex() {
+  let stat;
+  try {
+    stat = fs.statSync(TOPIC_INDEX_FILE);
+  } catch (error) {
+    return null;
+  }
+
+  if (!cachedIndex || stat.mtimeMs !== cachedMtime) {
+    cachedIndex = JSON.parse(fs.readFileSync(TOPIC_INDEX_FILE, 'utf8'));
+    cachedMtime = stat.mtimeMs;
+  }
+
+  // Indexes built before sources were recorded cannot be checked, so are not trusted
+  return cachedIndex.sources && sourcesAreCurrent(cachedIndex.sources) ? cachedIndex : null;
+}
+
+module.exports = {
+  loadTopicIndex,
+  TOPIC_INDEX_FILE
+};
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Build the autocomplete dictionary the search box loads in the browser.
+
+Completions are flow names, categories, step actions and PDF titles,
+each with a popularity weight:
+
+    flow       10 + 5 per flow that lists it in related_flows
+    category   5 per flow in the category
+    pdf        3 + 3 per citation in source_documents
+    step       2 per step with that action (at most MAX_STEP_WORDS words)
+
+Every completion is reachable from the start of its text and from the
+start of each later word that is not a stop word, so "alerts" completes
+"Creating and Managing Email Alerts". Keys are normalised (lower case,
+punctuation to spaces), sorted and front-coded in blocks of BLOCK_SIZE:
+the first key of a block is stored whole, the others as (length of the
+prefix shared with the previous key, rest of the key). A lookup binary
+searches the block heads and decodes only the blocks its prefix covers.
+
+public/data/generated/autocomplete.json:
+
+    entries    [[text, type, weight, module, target], ...]
+    blocks     [[head key, head entry, [[shared, suffix, entry], ...]], ...]
+
+src/utils/autocomplete.js reads it for SearchBar.
+
+    python3 build_autocomplete.py [--prefix "dash" --prefix "email al"]
+"""
+
+import argparse
+import bisect
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from flow_data import (
+    GENERATED_PATH,
+    MODULE_FILES,
+    get_flow_name,
+    get_flow_ref,
+    iter_all_flows,
+    iter_source_documents,
+    write_json_atomic,
+)
+from build_page_index import pdf_module
+from pdf_paths import resolve_pdf_path
+from pdf_text import list_pdfs
+from text_utils import STOP_WORDS
+
+AUTOCOMPLETE_FILE = os.path.join(GENERATED_PATH, 'autocomplete.json')
+INDEX_VERSION = 1
+BLOCK_SIZE = 16
+MAX_STEP_WORDS = 8
+DEFAULT_LIMIT = 8
+
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    return _NON_WORD_RE.sub(' ', text.lower()).strip()
+
+
+def completion_keys(text):
+    """Normalised text from its start and from each later non-stop word"""
+    words = normalize(text).split()
+    return {
+        ' '.join(words[i:]) for i in range(len(words))
+        if i == 0 or words[i] not in STOP_WORDS
+    }
+
+
+def collect_entries():
+    """{(text, type, module, target): weight} for every completion"""
+    flows = list(iter_all_flows())
+    referenced = Counter()
+    citations = Counter()
+    categories = Counter()
+    steps = Counter()
+    for module_id, _, _, flow in flows:
+        for ref in set(flow.get('related_flows') or []):
+            referenced[(module_id, ref)] += 1
+        for _, document in iter_source_documents(flow):
+            citations[resolve_pdf_path(document, module_id)] += 1
+        category = flow.get('category') or flow.get('flowCategory')
+        if category:
+            categories[(module_id, category)] += 1
+        for step in flow.get('steps') or []:
+            action = step if isinstance(step, str) else (step.get('action') or step.get('description') or '')
+            action = ' '.join(action.split()).rstrip('.')
+            if action and len(action.split()) <= MAX_STEP_WORDS:
+                steps[(module_id, action)] += 1
+
+    entries = Counter()
+    for module_id, _, _, flow in flows:
+        flow_ref = get_flow_ref(flow)
+        entries[(get_flow_name(flow), 'flow', module_id, f'{module_id}/{flow_ref}')] += \
+            10 + 5 * referenced[(module_id, flow_ref)]
+    for (module_id, category), count in categories.items():
+        entries[(category, 'category', module_id, None)] += 5 * count
+    for (module_id, action), count in steps.items():
+        entries[(action, 'step', module_id, None)] += 2 * count
+    for rel_path in list_pdfs():
+        title = rel_path.rsplit('/', 1)[-1][:-len('.pdf')]
+        entries[(title, 'pdf', pdf_module(rel_path), rel_path)] += 3 + 3 * citations[rel_path]
+    return entries
+
+
+def build_autocomplete():
+    weighted = collect_entries()
+    entries = sorted(weighted, key=lambda entry: (-weighted[entry], entry[0]))
+    keys = sorted(
+        (key, entry_id)
+        for entry_id, entry in enumerate(entries)
+        for key in completion_keys(entry[0])
+    )
+
+    blocks = []
+    for start in range(0, len(keys), BLOCK_SIZE):
+        head, head_entry = keys[start]
+        rest = []
+        previous = head
+        for key, entry_id in keys[start + 1:start + BLOCK_SIZE]:
+            shared = len(os.path.commonprefix([previous, key]))
+            rest.append([shared, key[shared:], entry_id])
+            previous = key
+        blocks.append([head, head_entry, rest])
+
+    return {
+        'version': INDEX_VERSION,
+        'modules': list(MODULE_FILES),
+        'entries': [[text, kind, weighted[(text, kind, module_id, target)], module_id, target]
+                    for text, kind, module_id, target in entries],
+        'blocks': blocks
+    }
+
+
+class Autocomplete:
+    """Reference lookup, mirroring src/utils/autocomplete.js"""
+
+    def __init__(self, index):
+        self.entries = index['entries']
+        self.blocks = index['blocks']
+        self.heads = [block[0] for block in self.blocks]
+        # Keys are word suffixes of their entry, so a key of full length is a match at the start
+        self.lengths = [len(normalize(entry[0])) for entry in self.entries]
+
+    def iter_keys(self, prefix):
+        """(key, entry id) for the keys starting with prefix, in order"""
+        block = max(bisect.bisect_left(self.heads, prefix) - 1, 0)
+        for head, head_entry, rest in self.blocks[block:]:
+            key = head
+            for shared, suffix, entry_id in [[0, head, head_entry]] + rest:
+                key = key[:shared] + suffix
+                if key.startswith(prefix):
+                    yield key, entry_id
+                elif key > prefix:
+                    return
+
+    def complete(self, text, limit=DEFAULT_LIMIT, module=None, types=None):
+        """Top completions, heaviest first; matches at the start of the text rank double"""
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        if text[-1:].isspace():
+            prefix += ' '
+
+        scores = {}
+        for key, entry_id in self.iter_keys(prefix):
+            _, kind, weight, entry_module, _ = self.entries[entry_id]
+            if (module and entry_module != module) or (types and kind not in types):
+                continue
+            score = weight * (2 if self.lengths[entry_id] == len(key) else 1)
+            scores[entry_id] = max(scores.get(entry_id, 0), score)
+        ranked = sorted(scores, key=lambda entry_id: (-scores[entry_id], entry_id))[:limit]
+        return [self.entries[entry_id] for entry_id in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the autocomplete dictionary')
+    parser.add_argument('--output', default=AUTOCOMPLETE_FILE, help='dictionary path')
+    parser.add_argument('--prefix', action='append', help='complete a prefix with the new dictionary')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_autocomplete()
+    write_json_atomic(args.output, index, indent=None)
+    size = os.path.getsize(args.output)
+    key_count = sum(1 + len(block[2]) for block in index['blocks'])
+    print(f"✅ {len(index['entries'])} completions, {key_count} keys in {len(index['blocks'])} blocks "
+          f"({size / 1024:.0f} KB, {time.perf_counter() - start:.1f} s)")
+    for kind, count in Counter(entry[1] for entry in index['entries']).most_common():
+        print(f"   {kind}: {count}")
+
+    if args.prefix:
+        autocomplete = Autocomplete(index)
+        for prefix in args.prefix:
+            print(f"\n📁 {prefix}")
+            for text, kind, weight, module_id, _ in autocomplete.complete(prefix):
+                print(f"   {weight:4d}  {kind:8s} {text} ({module_id})")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
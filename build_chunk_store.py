@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Split the PDF text into heading-aware, overlapping chunks and write them
+to one binary file that readers memory-map instead of parsing.
+
+Each PDF's cached page text is split into sections at heading lines
+(short, capitalised lines after a blank line that neither end nor break
+off a sentence). A section is cut into windows of --chunk-words words,
+with --overlap words repeated between neighbours. Chunks never span two
+sections, so every chunk carries the heading it belongs to.
+
+data/generated/chunk_store.bin, all integers little-endian:
+
+    header     magic, version, chunk and PDF counts, section offsets
+    chunks     32-byte records: text offset and length, pdf, first and
+               last page, heading offset and length, word count
+    pdfs       40-byte records: path and module offsets and lengths,
+               first chunk, chunk count, PDF size and mtime_ns
+    strings    UTF-8 paths, module ids and headings
+    text       UTF-8 chunk text
+
+ChunkStore (here) and api/utils/chunkStore.js (for the MCP server) read
+the tables in place and slice passages out of the text section without
+copying the corpus into memory. Both compare the PDF records' size and
+mtime_ns with the files to tell when the store is stale.
+
+    python3 build_chunk_store.py [--chunk-words 200] [--overlap 40]
+    python3 build_chunk_store.py --pdf "Publish/Getting Started/Content Approval.pdf" [--page 2]
+"""
+
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+
+import numpy as np
+
+from build_page_index import pdf_module, pdf_source
+from flow_data import SERVER_GENERATED_PATH
+from pdf_text import get_pdf_pages, list_pdfs, warm_cache
+from text_utils import STOP_WORDS
+
+CHUNK_STORE_FILE = os.path.join(SERVER_GENERATED_PATH, 'chunk_store.bin')
+MAGIC = b'BWCHUNKS'
+STORE_VERSION = 1
+DEFAULT_CHUNK_WORDS = 200
+DEFAULT_OVERLAP = 40
+
+# magic, version, chunk count, pdf count, then offsets of the chunks,
+# pdfs, strings and text sections and the size of the text section
+HEADER = struct.Struct('<8sIII4xQQQQQ')
+CHUNK_DTYPE = np.dtype([
+    ('text_offset', '<u8'), ('text_length', '<u4'), ('pdf', '<u4'),
+    ('page_start', '<u2'), ('page_end', '<u2'),
+    ('heading_offset', '<u4'), ('heading_length', '<u4'), ('words', '<u4'),
+])
+PDF_DTYPE = np.dtype([
+    ('path_offset', '<u4'), ('path_length', '<u4'),
+    ('module_offset', '<u4'), ('module_length', '<u4'),
+    ('first_chunk', '<u4'), ('chunk_count', '<u4'),
+    ('size', '<u8'), ('mtime_ns', '<u8'),
+])
+
+MAX_HEADING_WORDS = 10
+SENTENCE_END_RE = re.compile(r'[.,:;]$')
+LIST_ITEM_RE = re.compile(r'^(?:[•\-–*]|\d+[.)])')
+
+
+def is_heading(line, previous_blank):
+    """Short, capitalised line after a blank line that is not part of a sentence"""
+    words = line.split()
+    return (
+        previous_blank
+        and words[0][:1].isupper()
+        and len(words) <= MAX_HEADING_WORDS
+        # A sentence wrapped onto the next line usually breaks after "the", "and", ...
+        and words[-1].lower() not in STOP_WORDS
+        and not SENTENCE_END_RE.search(words[-1])
+        and not LIST_ITEM_RE.match(words[0])
+    )
+
+
+def split_sections(pages):
+    """Split a PDF into [(heading, [(word, page), ...])] sections.
+
+    The first line of the document is its title and starts the first section.
+    """
+    sections = []
+    heading = ''
+    words = []
+    previous_blank = True
+    for page_number, text in enumerate(pages, start=1):
+        for line in text.split('\n'):
+            if not line.strip():
+                previous_blank = True
+                continue
+            if is_heading(line, previous_blank):
+                if words:
+                    sections.append((heading, words))
+                heading = ' '.join(line.split())
+                words = []
+            words.extend((word, page_number) for word in line.split())
+            previous_blank = False
+    if words:
+        sections.append((heading, words))
+    return sections
+
+
+def chunk_section(words, chunk_words, overlap):
+    """Yield overlapping windows of a section's (word, page) list"""
+    step = max(chunk_words - overlap, 1)
+    start = 0
+    while True:
+        window = words[start:start + chunk_words]
+        yield window
+        if start + chunk_words >= len(words):
+            return
+        start += step
+
+
+class _StringPool:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text):
+        """(offset, length) of text's UTF-8 bytes, stored once"""
+        if text not in self.offsets:
+            encoded = text.encode('utf-8')
+            self.offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self.offsets[text]
+
+
+def _pad(data, alignment=8):
+    return data + b'\0' * (-len(data) % alignment)
+
+
+def build_chunk_store(output=CHUNK_STORE_FILE, chunk_words=DEFAULT_CHUNK_WORDS, overlap=DEFAULT_OVERLAP):
+    """Chunk every PDF and write the store; returns (chunk count, pdf count)"""
+    rel_paths = list_pdfs()
+    warm_cache(rel_paths)
+
+    strings = _StringPool()
+    text = bytearray()
+    chunks = []
+    pdfs = []
+    for pdf_id, rel_path in enumerate(rel_paths):
+        first_chunk = len(chunks)
+        for heading, words in split_sections(get_pdf_pages(rel_path) or []):
+            heading_offset, heading_length = strings.add(heading)
+            for window in chunk_section(words, chunk_words, overlap):
+                encoded = ' '.join(word for word, _ in window).encode('utf-8')
+                chunks.append((
+                    len(text), len(encoded), pdf_id, window[0][1], window[-1][1],
+                    heading_offset, heading_length, len(window)
+                ))
+                text += encoded
+
+        size, mtime_ns = pdf_source(rel_path)
+        pdfs.append((
+            *strings.add(rel_path), *strings.add(pdf_module(rel_path) or ''),
+            first_chunk, len(chunks) - first_chunk, size, mtime_ns
+        ))
+
+    sections = [
+        _pad(np.array(chunks, dtype=CHUNK_DTYPE).tobytes()),
+        _pad(np.array(pdfs, dtype=PDF_DTYPE).tobytes()),
+        _pad(bytes(strings.data)),
+    ]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = HEADER.pack(MAGIC, STORE_VERSION, len(chunks), len(pdfs), *offsets, position, len(text))
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+        f.write(text)
+    os.replace(tmp_path, output)
+    return len(chunks), len(pdfs)
+
+
+class ChunkStore:
+    """Memory-mapped, read-only view of chunk_store.bin"""
+
+    def __init__(self, path=CHUNK_STORE_FILE):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, version, chunk_count, pdf_count,
+         chunks_offset, pdfs_offset, strings_offset, text_offset, text_size) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{path} is not a version {STORE_VERSION} chunk store; rebuild it")
+
+        self.chunks = np.frombuffer(self._mmap, CHUNK_DTYPE, chunk_count, chunks_offset)
+        self.pdfs = np.frombuffer(self._mmap, PDF_DTYPE, pdf_count, pdfs_offset)
+        self._strings = strings_offset
+        self._text = self._view[text_offset:text_offset + text_size]
+        self._pdf_ids = {self.pdf_path(i): i for i in range(pdf_count)}
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def is_stale(self):
+        """Whether a PDF has been added, removed or changed since the build"""
+        if set(list_pdfs()) != set(self._pdf_ids):
+            return True
+        return any(
+            pdf_source(rel_path) != [int(self.pdfs[pdf_id]['size']), int(self.pdfs[pdf_id]['mtime_ns'])]
+            for rel_path, pdf_id in self._pdf_ids.items()
+        )
+
+    def close(self):
+        self.chunks = self.pdfs = None
+        self._text.release()
+        self._view.release()
+        self._mmap.close()
+
+    def _string(self, offset, length):
+        start = self._strings + int(offset)
+        return str(self._view[start:start + int(length)], 'utf-8')
+
+    def pdf_path(self, pdf_id):
+        record = self.pdfs[pdf_id]
+        return self._string(record['path_offset'], record['path_length'])
+
+    def passage(self, chunk_id):
+        """The chunk's UTF-8 text as a zero-copy memoryview"""
+        record = self.chunks[chunk_id]
+        start = int(record['text_offset'])
+        return self._text[start:start + int(record['text_length'])]
+
+    def text(self, chunk_id):
+        return str(self.passage(chunk_id), 'utf-8')
+
+    def metadata(self, chunk_id):
+        record = self.chunks[chunk_id]
+        pdf = self.pdfs[record['pdf']]
+        return {
+            'chunk': int(chunk_id),
+            'pdf': self.pdf_path(record['pdf']),
+            'module': self._string(pdf['module_offset'], pdf['module_length']) or None,
+            'page_start': int(record['page_start']),
+            'page_end': int(record['page_end']),
+            'heading': self._string(record['heading_offset'], record['heading_length']),
+            'words': int(record['words'])
+        }
+
+    def chunks_for(self, rel_path, page=None):
+        """Chunk ids of a PDF, optionally only those covering a 1-based page"""
+        pdf_id = self._pdf_ids.get(rel_path)
+        if pdf_id is None:
+            return range(0)
+        first = int(self.pdfs[pdf_id]['first_chunk'])
+        chunk_ids = range(first, first + int(self.pdfs[pdf_id]['chunk_count']))
+        if page is None:
+            return chunk_ids
+        records = self.chunks[first:chunk_ids.stop]
+        covering = (records['page_start'] <= page) & (records['page_end'] >= page)
+        return [first + int(i) for i in np.flatnonzero(covering)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the memory-mapped PDF chunk store')
+    parser.add_argument('--output', default=CHUNK_STORE_FILE, help='store path')
+    parser.add_argument('--chunk-words', type=int, default=DEFAULT_CHUNK_WORDS, help='words per chunk')
+    parser.add_argument('--overlap', type=int, default=DEFAULT_OVERLAP, help='words shared by neighbouring chunks')
+    parser.add_argument('--pdf', help='print the chunks of one PDF (path relative to public/pdfs)')
+    parser.add_argument('--page', type=int, help='with --pdf, only chunks covering this page')
+    args = parser.parse_args()
+
+    if args.overlap >= args.chunk_words:
+        parser.error('--overlap must be smaller than --chunk-words')
+
+    start = time.perf_counter()
+    chunk_count, pdf_count = build_chunk_store(args.output, args.chunk_words, args.overlap)
+    size = os.path.getsize(args.output)
+    print(f"✅ Wrote {chunk_count} chunks from {pdf_count} PDFs "
+          f"({size / 1024:.0f} KB, {time.perf_counter() - start:.1f} s)")
+
+    if args.pdf:
+        store = ChunkStore(args.output)
+        for chunk_id in store.chunks_for(args.pdf, args.page):
+            meta = store.metadata(chunk_id)
+            print(f"\n📁 [{chunk_id}] {meta['heading']} (pages {meta['page_start']}-{meta['page_end']}, "
+                  f"{meta['words']} words)")
+            print(f"   {store.text(chunk_id)[:160]}...")
+        store.close()
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
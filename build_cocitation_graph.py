@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Cross-module co-citation graph from shared source documents.
+
+Builds a document -> flows index over every module, turns it into a
+sparse flow x document incidence matrix B, and takes the co-citation
+matrix C = B @ B.T. Entry C[i, j] is the number of PDFs flows i and j
+both cite. Only pairs of flows from different modules are kept.
+
+The artifact (data/generated/cocitation_graph.json) stores the
+graph as symmetric CSR arrays so consumers can read a flow's
+cross-module neighbours with one slice:
+
+    nodes[i]                              "<module>/<flow ref>"
+    indices[indptr[i]:indptr[i + 1]]      neighbouring node ids
+    weights[...] / shared[...]            cosine weight / shared PDF count
+
+Requires numpy and scipy.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+from flow_data import (
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    iter_all_flows,
+    iter_source_documents,
+    write_json_atomic,
+)
+from pdf_paths import resolve_pdf_path
+
+COCITATION_FILE = os.path.join(SERVER_GENERATED_PATH, 'cocitation_graph.json')
+
+
+def build_document_index():
+    """Return (nodes, documents, document -> [node ids])"""
+    nodes = []
+    document_index = {}
+
+    for module_id, _, _, flow in iter_all_flows():
+        node_id = len(nodes)
+        nodes.append({
+            'id': f'{module_id}/{get_flow_ref(flow)}',
+            'module': module_id,
+            'name': get_flow_name(flow)
+        })
+        for _, doc in iter_source_documents(flow):
+            flows = document_index.setdefault(resolve_pdf_path(doc, module_id), [])
+            if not flows or flows[-1] != node_id:
+                flows.append(node_id)
+
+    documents = sorted(document_index)
+    return nodes, documents, document_index
+
+
+def cocitation_matrix(n_nodes, documents, document_index):
+    """Sparse co-citation counts between flows (diagonal removed)"""
+    rows = []
+    cols = []
+    for column, document in enumerate(documents):
+        for node_id in document_index[document]:
+            rows.append(node_id)
+            cols.append(column)
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(n_nodes, len(documents))
+    )
+    counts = (incidence @ incidence.T).tocsr()
+    counts.setdiag(0)
+    counts.eliminate_zeros()
+
+    citations = np.asarray(incidence.sum(axis=1)).ravel()
+    return counts, citations
+
+
+def cross_module_edges(counts, citations, modules, min_shared=1):
+    """Keep cross-module pairs; weight = shared / sqrt(cites_i * cites_j)"""
+    modules = np.asarray(modules)
+    coo = counts.tocoo()
+    keep = (modules[coo.row] != modules[coo.col]) & (coo.data >= min_shared)
+    rows, cols, shared = coo.row[keep], coo.col[keep], coo.data[keep]
+    weights = shared / np.sqrt(citations[rows] * citations[cols])
+
+    edges = sparse.csr_matrix((weights, (rows, cols)), shape=counts.shape)
+    edges.sort_indices()
+    shared_matrix = sparse.csr_matrix((shared, (rows, cols)), shape=counts.shape)
+    shared_matrix.sort_indices()
+    return edges, shared_matrix
+
+
+def build_cocitation_graph(min_shared=1):
+    nodes, documents, document_index = build_document_index()
+    counts, citations = cocitation_matrix(len(nodes), documents, document_index)
+    edges, shared = cross_module_edges(counts, citations, [n['module'] for n in nodes], min_shared)
+
+    # Module pair -> number of linked flow pairs, for the cross-module overview
+    module_pairs = {}
+    coo = sparse.triu(edges).tocoo()
+    for row, col in zip(coo.row, coo.col):
+        pair = '|'.join(sorted((nodes[row]['module'], nodes[col]['module'])))
+        module_pairs[pair] = module_pairs.get(pair, 0) + 1
+
+    return {
+        'nodes': nodes,
+        'indptr': edges.indptr.tolist(),
+        'indices': edges.indices.tolist(),
+        'weights': [round(float(w), 4) for w in edges.data],
+        'shared': shared.data.astype(int).tolist(),
+        'documents': {
+            document: document_index[document]
+            for document in documents
+            if len({nodes[n]['module'] for n in document_index[document]}) > 1
+        },
+        'module_pairs': dict(sorted(module_pairs.items(), key=lambda item: -item[1]))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the cross-module co-citation graph')
+    parser.add_argument('--min-shared', type=int, default=1,
+                        help='minimum number of shared PDFs for an edge (default: 1)')
+    parser.add_argument('--output', default=COCITATION_FILE, help='artifact path')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = build_cocitation_graph(args.min_shared)
+    elapsed = time.perf_counter() - start
+
+    write_json_atomic(args.output, graph, indent=None)
+
+    n_edges = len(graph['indices']) // 2
+    print(f"✅ {len(graph['nodes'])} flows, {n_edges} cross-module edges, "
+          f"{len(graph['documents'])} PDFs cited from more than one module ({elapsed * 1000:.1f} ms)")
+    for pair, count in list(graph['module_pairs'].items())[:10]:
+        print(f"   {pair.replace('|', ' ↔ ')}: {count}")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
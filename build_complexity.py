@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Precompute flow complexity for the Complexity Dashboard.
+
+Applies the same per-flow metrics as src/utils/complexityAnalyzer.js
+(steps, user/system actions, decision points, depth, branches, loops,
+complexity score, estimated time), once per data build instead of in the
+browser. Three metrics the browser cannot derive cheaply are added:
+
+    prerequisiteDepth   longest prerequisite chain (build_prerequisite_chains.py)
+    citationFanout      distinct PDFs cited by the flow and its steps
+    crossModuleLinks    flows in other modules sharing a cited PDF
+                        (build_cocitation_graph.py)
+
+Module summaries are aggregated over metric arrays with NumPy. Output is
+one file per module, shaped like analyzeAllModules() results so the
+dashboard can use them directly, plus index.json listing the modules
+with the overall stats of calculateOverallStats(), all under
+public/data/generated/complexity/.
+
+Requires numpy and scipy.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from build_cocitation_graph import build_cocitation_graph
+from build_prerequisite_chains import build_prerequisite_chains
+from flow_data import GENERATED_PATH, MODULE_FILES, get_flow_ref, iter_source_documents, load_module, write_json_atomic
+from pdf_paths import resolve_pdf_path
+
+COMPLEXITY_PATH = os.path.join(GENERATED_PATH, 'complexity')
+
+USER_ACTION_WORDS = ('user', 'click', 'select', 'enter', 'upload')
+
+# Integer metrics summed or averaged per module, in column order
+METRICS = (
+    'totalSteps', 'userActions', 'systemActions', 'decisionPoints', 'maxDepth', 'branches',
+    'loops', 'complexityScore', 'estimatedTime', 'sourceDocs', 'prerequisiteDepth',
+    'citationFanout', 'crossModuleLinks'
+)
+
+
+def js_round(value):
+    """Math.round semantics (halves round up), unlike Python's round()"""
+    return int(math.floor(value + 0.5))
+
+
+def module_display_name(data):
+    """Module name as normalizeModuleData() in complexityAnalyzer.js reports it"""
+    if 'user_flows' in data or 'workflows' in data:
+        return data.get('module') or data.get('product') or 'Unknown'
+
+    key = next((k for k in data if 'user_flows' in k or 'workflows' in k), None)
+    if key is None or not data[key]:
+        return 'Unknown'
+    nested = data[key]
+    fallback = key.replace('_user_flows', '', 1).replace('_workflows', '', 1).replace('_', ' ')
+    if isinstance(nested, list):
+        return fallback
+    if 'flows' in nested and 'user_flows' not in nested and 'workflows' not in nested:
+        return (nested.get('metadata') or {}).get('module') or nested.get('module') or fallback
+    return nested.get('module') or nested.get('product') or fallback
+
+
+def analyze_flow(flow):
+    """Port of ComplexityAnalyzer.analyzeFlow()"""
+    counts = {'totalSteps': 0, 'decisionPoints': 0, 'maxDepth': 0, 'userActions': 0,
+              'systemActions': 0, 'loops': 0, 'branches': 0}
+
+    def analyze_step(step, depth=0):
+        counts['totalSteps'] += 1
+        counts['maxDepth'] = max(counts['maxDepth'], depth)
+        if not isinstance(step, dict):
+            counts['systemActions'] += 1
+            return
+
+        description = step.get('description')
+        description = description if isinstance(description, str) else None
+        lowered = description.lower() if description else ''
+
+        if any(word in lowered for word in USER_ACTION_WORDS):
+            counts['userActions'] += 1
+        else:
+            counts['systemActions'] += 1
+        if step.get('type') == 'decision' or (description and '?' in description):
+            counts['decisionPoints'] += 1
+        if 'repeat' in lowered or 'loop' in lowered:
+            counts['loops'] += 1
+
+        if step.get('options'):
+            counts['branches'] += len(step['options'])
+            for option in step['options']:
+                for sub_step in (option.get('next_steps') or []) if isinstance(option, dict) else []:
+                    analyze_step(sub_step, depth + 1)
+        for sub_step in step.get('next_steps') or []:
+            analyze_step(sub_step, depth + 1)
+
+    for step in flow.get('steps') or []:
+        analyze_step(step)
+
+    complexity_score = (
+        counts['totalSteps'] * 1.0
+        + counts['decisionPoints'] * 2.0
+        + counts['maxDepth'] * 1.5
+        + counts['branches'] * 1.5
+        + counts['loops'] * 2.0
+    )
+
+    return {
+        'name': flow.get('flow_name') or flow.get('name') or 'Unnamed Flow',
+        'totalSteps': counts['totalSteps'],
+        'userActions': counts['userActions'],
+        'systemActions': counts['systemActions'],
+        'decisionPoints': counts['decisionPoints'],
+        'maxDepth': counts['maxDepth'],
+        'branches': counts['branches'],
+        'loops': counts['loops'],
+        'complexityScore': js_round(complexity_score),
+        'estimatedTime': max(js_round(counts['userActions'] * 15), counts['totalSteps'] * 10),
+        'sourceDocs': len(flow.get('source_documents') or [])
+    }
+
+
+def module_summaries(rows, module_ids, modules):
+    """calculateModuleSummary() for every module at once, over metric columns"""
+    values = np.array([[row[metric] for metric in METRICS] for row in rows], dtype=np.int64).reshape(-1, len(METRICS))
+    codes = np.array([modules.index(m) for m in module_ids], dtype=np.int64)
+    column = {metric: i for i, metric in enumerate(METRICS)}
+
+    n_modules = len(modules)
+    flows = np.bincount(codes, minlength=n_modules)
+    sums = np.zeros((n_modules, len(METRICS)), dtype=np.int64)
+    np.add.at(sums, codes, values)
+
+    scores = values[:, column['complexityScore']]
+    max_scores = np.full(n_modules, np.iinfo(np.int64).min)
+    min_scores = np.full(n_modules, np.iinfo(np.int64).max)
+    np.maximum.at(max_scores, codes, scores)
+    np.minimum.at(min_scores, codes, scores)
+
+    # First flow reaching the max / min, as the reduce() in the dashboard picks it
+    positions = np.arange(len(rows))
+    first_max = {}
+    first_min = {}
+    for code, score, position in zip(codes, scores, positions):
+        if score == max_scores[code]:
+            first_max.setdefault(code, position)
+        if score == min_scores[code]:
+            first_min.setdefault(code, position)
+
+    summaries = {}
+    for code, module_id in enumerate(modules):
+        n = int(flows[code])
+        if n == 0:
+            summaries[module_id] = {
+                'avgComplexity': 0, 'maxComplexity': 0, 'minComplexity': 0, 'totalSteps': 0,
+                'avgStepsPerFlow': 0, 'totalUserActions': 0, 'totalDecisionPoints': 0,
+                'estimatedTotalTime': 0
+            }
+            continue
+        total = sums[code]
+        summaries[module_id] = {
+            'avgComplexity': js_round(total[column['complexityScore']] / n),
+            'maxComplexity': int(max_scores[code]),
+            'minComplexity': int(min_scores[code]),
+            'totalSteps': int(total[column['totalSteps']]),
+            'avgStepsPerFlow': js_round(total[column['totalSteps']] / n),
+            'totalUserActions': int(total[column['userActions']]),
+            'totalDecisionPoints': int(total[column['decisionPoints']]),
+            'estimatedTotalTime': int(total[column['estimatedTime']]),
+            'maxPrerequisiteDepth': int(values[codes == code, column['prerequisiteDepth']].max()),
+            'avgCitationFanout': round(float(total[column['citationFanout']]) / n, 2),
+            'totalCrossModuleLinks': int(total[column['crossModuleLinks']]),
+            'mostComplexFlow': rows[first_max[code]],
+            'leastComplexFlow': rows[first_min[code]]
+        }
+    return summaries
+
+
+def overall_stats(rows, n_modules):
+    """Port of ComplexityAnalyzer.calculateOverallStats()"""
+    total_flows = len(rows)
+    total_steps = sum(row['totalSteps'] for row in rows)
+    total_user_actions = sum(row['userActions'] for row in rows)
+    total_time = sum(row['estimatedTime'] for row in rows)
+
+    def reduction(total, target):
+        return js_round((total - target) / total * 100) if total else None
+
+    return {
+        'totalModules': n_modules,
+        'totalFlows': total_flows,
+        'totalSteps': total_steps,
+        'totalUserActions': total_user_actions,
+        'avgStepsPerFlow': js_round(total_steps / total_flows) if total_flows else None,
+        'avgComplexity': js_round(sum(row['complexityScore'] for row in rows) / total_flows) if total_flows else None,
+        'estimatedTotalTime': total_time,
+        'estimatedTimeHours': js_round(total_time / 3600),
+        'potentialAIReduction': {
+            'steps': reduction(total_steps, total_flows),
+            'time': reduction(total_time, total_flows * 30),
+            'userActions': reduction(total_user_actions, total_flows)
+        }
+    }
+
+
+def build_complexity():
+    """Return {module_id: analysis} and the overall stats"""
+    chains = build_prerequisite_chains()
+    graph = build_cocitation_graph()
+    degree = {
+        node['id']: graph['indptr'][i + 1] - graph['indptr'][i]
+        for i, node in enumerate(graph['nodes'])
+    }
+
+    rows = []
+    module_ids = []
+    module_names = {}
+    for module_id in MODULE_FILES:
+        data, _, flows = load_module(module_id)
+        module_names[module_id] = module_display_name(data) if isinstance(data, dict) else 'Unknown'
+        for flow in flows:
+            node_id = f'{module_id}/{get_flow_ref(flow)}'
+            row = analyze_flow(flow)
+            row['flowId'] = get_flow_ref(flow)
+            row['prerequisiteDepth'] = chains['depths'].get(node_id, 0)
+            row['citationFanout'] = len({
+                resolve_pdf_path(doc, module_id) for _, doc in iter_source_documents(flow)
+            })
+            row['crossModuleLinks'] = degree.get(node_id, 0)
+            rows.append(row)
+            module_ids.append(module_id)
+
+    modules = list(MODULE_FILES)
+    summaries = module_summaries(rows, module_ids, modules)
+    analysis = {
+        module_id: {
+            'moduleName': module_names[module_id],
+            'totalFlows': module_ids.count(module_id),
+            'flows': [row for row, m in zip(rows, module_ids) if m == module_id],
+            'summary': summaries[module_id]
+        }
+        for module_id in modules
+    }
+    return analysis, overall_stats(rows, len(modules))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute flow complexity for the dashboard')
+    parser.add_argument('--output-dir', default=COMPLEXITY_PATH, help='artifact directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analysis, stats = build_complexity()
+    elapsed = time.perf_counter() - start
+
+    for module_id, module in analysis.items():
+        write_json_atomic(os.path.join(args.output_dir, f'{module_id}.json'), module, indent=None)
+    write_json_atomic(os.path.join(args.output_dir, 'index.json'), {
+        'modules': {
+            module_id: {'moduleName': module['moduleName'], 'totalFlows': module['totalFlows']}
+            for module_id, module in analysis.items()
+        },
+        'overall': stats
+    }, indent=None)
+
+    for module_id, module in analysis.items():
+        summary = module['summary']
+        print(f"✅ {module_id}: {module['totalFlows']} flows, avg complexity {summary['avgComplexity']}, "
+              f"max {summary['maxComplexity']}")
+    print(f"\n{stats['totalFlows']} flows, {stats['totalSteps']} steps ({elapsed * 1000:.0f} ms)")
+    print(f"Written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Build compressed facet bitmaps for filtering flows by module, category,
+topic and cited document.
+
+Every flow gets a dense integer id in iter_all_flows() order, the same
+order as the docs of the BM25 search index, so search hits and facet
+bitmaps share ids. Each facet value stores the set of flow ids as a
+roaring-style bitmap: ids are split by their high 16 bits into
+containers, and each container is stored in whichever form is
+smallest:
+
+    [high, 'array', [low, ...]]              up to ARRAY_MAX ids
+    [high, 'run', [[start, length - 1], ...]]  consecutive ids
+    [high, 'bitmap', base64 of 8 KB]           dense
+
+Module ids are consecutive, so a module is one run. Facet values also
+carry their flow count, so unfiltered counts need no decoding.
+
+data/generated/facets.json, read by api/utils/facets.js:
+
+    sources                module file sizes and mtimes at build time
+    flows[id]              [module, flow ref, name, category, description]
+    facets[f][value]       [count, containers]
+
+    python3 build_facets.py [--filter module=listen --filter topic=alerts]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+from build_topic_index import build_topic_index
+from flow_data import (
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    iter_all_flows,
+    iter_source_documents,
+    module_sources,
+    write_json_atomic,
+)
+from pdf_paths import resolve_pdf_path
+
+FACETS_FILE = os.path.join(SERVER_GENERATED_PATH, 'facets.json')
+INDEX_VERSION = 1
+FACETS = ('module', 'category', 'topic', 'document')
+UNCATEGORISED = 'Other'
+ARRAY_MAX = 4096
+BITMAP_BYTES = 8192
+
+
+def flow_category(flow):
+    return flow.get('category') or flow.get('flowCategory') or UNCATEGORISED
+
+
+def encode_bitmap(ids):
+    """Roaring-style containers for a set of non-negative ints"""
+    by_high = {}
+    for flow_id in sorted(set(ids)):
+        by_high.setdefault(flow_id >> 16, []).append(flow_id & 0xFFFF)
+
+    containers = []
+    for high, lows in by_high.items():
+        runs = []
+        for low in lows:
+            if runs and runs[-1][0] + runs[-1][1] + 1 == low:
+                runs[-1][1] += 1
+            else:
+                runs.append([low, 0])
+
+        # Serialized sizes: 2 bytes per id, 4 bytes per run, a fixed 8 KB bitmap
+        sizes = {'run': 4 * len(runs), 'array': 2 * len(lows), 'bitmap': BITMAP_BYTES}
+        if len(lows) > ARRAY_MAX:
+            del sizes['array']
+        kind = min(sizes, key=sizes.get)
+        if kind == 'run':
+            containers.append([high, 'run', runs])
+        elif kind == 'array':
+            containers.append([high, 'array', lows])
+        else:
+            words = bytearray(BITMAP_BYTES)
+            for low in lows:
+                words[low >> 3] |= 1 << (low & 7)
+            containers.append([high, 'bitmap', base64.b64encode(bytes(words)).decode('ascii')])
+    return containers
+
+
+def decode_bitmap(containers):
+    """The set of ids as a Python int bitset (bit i set for id i)"""
+    bits = 0
+    for high, kind, payload in containers:
+        base = high << 16
+        if kind == 'array':
+            for low in payload:
+                bits |= 1 << (base + low)
+        elif kind == 'run':
+            for start, extra in payload:
+                bits |= ((1 << (extra + 1)) - 1) << (base + start)
+        else:
+            bits |= int.from_bytes(base64.b64decode(payload), 'little') << base
+    return bits
+
+
+def build_facets():
+    flows = []
+    members = {facet: {} for facet in FACETS}
+    ids_by_key = {}
+    for flow_id, (module_id, _, _, flow) in enumerate(iter_all_flows()):
+        flow_ref = get_flow_ref(flow)
+        category = flow_category(flow)
+        flows.append([module_id, flow_ref, get_flow_name(flow), category,
+                      flow.get('description') or flow.get('flow_description') or ''])
+        ids_by_key.setdefault(f'{module_id}/{flow_ref}', []).append(flow_id)
+
+        members['module'].setdefault(module_id, set()).add(flow_id)
+        members['category'].setdefault(category, set()).add(flow_id)
+        for _, document in iter_source_documents(flow):
+            members['document'].setdefault(resolve_pdf_path(document, module_id), set()).add(flow_id)
+
+    for topic, entry in build_topic_index()['topics'].items():
+        for key, _, _ in entry['flows']:
+            members['topic'].setdefault(topic, set()).update(ids_by_key.get(key, ()))
+
+    facets = {
+        facet: {
+            value: [len(ids), encode_bitmap(ids)]
+            for value, ids in sorted(values.items(), key=lambda item: (-len(item[1]), item[0]))
+        }
+        for facet, values in members.items()
+    }
+    return {
+        'version': INDEX_VERSION,
+        'sources': module_sources(),
+        'flows': flows,
+        'facets': facets
+    }
+
+
+class FacetIndex:
+    """Reference filtering over the built facets (mirrors api/utils/facets.js)"""
+
+    def __init__(self, index):
+        self.flows = index['flows']
+        self.counts = {facet: {value: entry[0] for value, entry in values.items()}
+                       for facet, values in index['facets'].items()}
+        self.bitmaps = {facet: {value: decode_bitmap(entry[1]) for value, entry in values.items()}
+                        for facet, values in index['facets'].items()}
+        self.all = (1 << len(self.flows)) - 1
+
+    def select(self, filters):
+        """Flow id bitset for {facet: [values]}: OR within a facet, AND across facets"""
+        selected = self.all
+        for facet, values in filters.items():
+            union = 0
+            for value in values:
+                union |= self.bitmaps[facet].get(value, 0)
+            selected &= union
+        return selected
+
+    def facet_counts(self, selected):
+        """{facet: {value: count}} of the selected flows, most frequent first, zero counts left out"""
+        if selected == self.all:
+            return self.counts
+        counts = {}
+        for facet, values in self.bitmaps.items():
+            facet_counts = [(value, (bits & selected).bit_count()) for value, bits in values.items()]
+            facet_counts.sort(key=lambda item: -item[1])
+            counts[facet] = {value: count for value, count in facet_counts if count}
+        return counts
+
+    def flow_ids(self, selected):
+        return [flow_id for flow_id in range(len(self.flows)) if selected >> flow_id & 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the facet bitmaps for flow filters')
+    parser.add_argument('--output', default=FACETS_FILE, help='artifact path')
+    parser.add_argument('--filter', action='append', default=[], metavar='FACET=VALUE',
+                        help='test a filter against the new bitmaps (repeatable)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_facets()
+    write_json_atomic(args.output, index, indent=None)
+    size = os.path.getsize(args.output)
+    print(f"✅ {len(index['flows'])} flows, "
+          + ', '.join(f"{len(values)} {facet} values" for facet, values in index['facets'].items())
+          + f" ({size / 1024:.0f} KB, {(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    if args.filter:
+        filters = {}
+        for item in args.filter:
+            facet, _, value = item.partition('=')
+            if facet not in FACETS:
+                parser.error(f"unknown facet '{facet}' (expected one of {', '.join(FACETS)})")
+            filters.setdefault(facet, []).append(value)
+        facets = FacetIndex(index)
+        selected = facets.select(filters)
+        flow_ids = facets.flow_ids(selected)
+        print(f"\n📁 {len(flow_ids)} flows match")
+        for flow_id in flow_ids:
+            module_id, flow_ref, name = facets.flows[flow_id][:3]
+            print(f"   {module_id}/{flow_ref}  {name}")
+        for facet, counts in facets.facet_counts(selected).items():
+            top = ', '.join(f'{value} ({count})' for value, count in list(counts.items())[:5])
+            print(f"   {facet}: {top}")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
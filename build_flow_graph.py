@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Precompute the related-flows graph for the frontend.
+
+Resolves every related_flows entry the way FlowDiagram.js does (flow_id,
+id, or the underscored flow name, within the flow's module first) and
+writes one artifact per module plus a global one to
+data/generated/flow_graph/<scope>.json:
+
+    nodes[i]                              "<module>/<flow ref>"
+    indices[indptr[i]:indptr[i + 1]]      related flows of node i (CSR)
+    components[i]                         weakly connected component id
+    reachability                          base64, one row of ceil(n / 8)
+                                          bytes per node, bit j (MSB first)
+                                          set if j is reachable from i
+    hops                                  base64 uint8 n x n row-major,
+                                          shortest hop count, 255 = none
+
+Requires numpy and scipy.
+
+    python3 build_flow_graph.py [--from-generated]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from flow_data import MODULE_FILES, SERVER_GENERATED_PATH, get_flow_ref, iter_all_flows, write_json_atomic
+from build_related_flows import RELATED_FLOWS_FILE
+
+FLOW_GRAPH_PATH = os.path.join(SERVER_GENERATED_PATH, 'flow_graph')
+UNREACHABLE = 255
+
+
+def collect_edges(from_generated=False):
+    """Return (nodes, modules, edges, unresolved) over every module.
+
+    Edges come from the related_flows in the module files, or from
+    build_related_flows.py's artifact with from_generated.
+    """
+    nodes = []
+    modules = []
+    related = []
+    for module_id, _, _, flow in iter_all_flows():
+        nodes.append(f'{module_id}/{get_flow_ref(flow)}')
+        modules.append(module_id)
+        related.append(flow.get('related_flows') or [])
+
+    if from_generated:
+        with open(RELATED_FLOWS_FILE, 'r') as f:
+            generated = json.load(f)['modules']
+        related = [
+            [n['flow'] for n in generated.get(module_id, {}).get(node.split('/', 1)[1], [])]
+            for node, module_id in zip(nodes, modules)
+        ]
+
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    by_ref = {}
+    for i, node in enumerate(nodes):
+        by_ref.setdefault(node.split('/', 1)[1], i)
+
+    edges = set()
+    unresolved = []
+    for source, (module_id, refs) in enumerate(zip(modules, related)):
+        for ref in refs:
+            target = node_ids.get(f'{module_id}/{ref}', by_ref.get(ref))
+            if target is None:
+                unresolved.append({'flow': nodes[source], 'related_flow': ref})
+            elif target != source:
+                edges.add((source, target))
+
+    return nodes, modules, sorted(edges), unresolved
+
+
+def graph_artifact(nodes, edges):
+    """CSR adjacency, components, reachability bitset and hop matrix"""
+    n = len(nodes)
+    rows = np.array([s for s, _ in edges], dtype=np.int32)
+    cols = np.array([t for _, t in edges], dtype=np.int32)
+    adjacency = sparse.csr_matrix((np.ones(len(edges), dtype=np.int8), (rows, cols)), shape=(n, n))
+    adjacency.sort_indices()
+
+    n_components, components = csgraph.connected_components(adjacency, directed=True, connection='weak')
+
+    # BFS from every node; fine for the few hundred flows in a module
+    distances = csgraph.shortest_path(adjacency, directed=True, unweighted=True)
+    reachable = np.isfinite(distances)
+    np.fill_diagonal(reachable, False)
+    hops = np.where(np.isfinite(distances), np.minimum(distances, UNREACHABLE - 1), UNREACHABLE).astype(np.uint8)
+
+    return {
+        'nodes': nodes,
+        'indptr': adjacency.indptr.tolist(),
+        'indices': adjacency.indices.tolist(),
+        'n_components': int(n_components),
+        'components': components.tolist(),
+        'reachability': base64.b64encode(np.packbits(reachable, axis=1).tobytes()).decode('ascii'),
+        'hops': base64.b64encode(hops.tobytes()).decode('ascii'),
+        'diameter': int(hops[hops != UNREACHABLE].max()) if reachable.any() else 0
+    }
+
+
+def build_flow_graphs(from_generated=False):
+    """{scope: artifact} for 'global' and every module"""
+    nodes, modules, edges, unresolved = collect_edges(from_generated)
+    graphs = {'global': graph_artifact(nodes, edges)}
+    graphs['global']['unresolved'] = unresolved
+
+    modules = np.asarray(modules)
+    for module_id in MODULE_FILES:
+        members = np.flatnonzero(modules == module_id)
+        local = {int(node): i for i, node in enumerate(members)}
+        module_edges = [(local[s], local[t]) for s, t in edges if s in local and t in local]
+        graphs[module_id] = graph_artifact([nodes[i] for i in members], module_edges)
+        graphs[module_id]['unresolved'] = [u for u in unresolved if u['flow'].startswith(f'{module_id}/')]
+
+    return graphs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the related-flows graph')
+    parser.add_argument('--from-generated', action='store_true',
+                        help='use the edges from build_related_flows.py instead of the module files')
+    parser.add_argument('--output-dir', default=FLOW_GRAPH_PATH, help='artifact directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graphs = build_flow_graphs(args.from_generated)
+    elapsed = time.perf_counter() - start
+
+    for scope, graph in graphs.items():
+        write_json_atomic(os.path.join(args.output_dir, f'{scope}.json'), graph, indent=None)
+
+    for scope, graph in graphs.items():
+        status = '✅' if not graph['unresolved'] else '⚠️ '
+        print(f"{status} {scope}: {len(graph['nodes'])} flows, {len(graph['indices'])} edges, "
+              f"{graph['n_components']} components, diameter {graph['diameter']}")
+        for u in graph['unresolved'] if scope != 'global' else []:
+            print(f"   ❌ {u['flow']}: related flow '{u['related_flow']}' not found")
+
+    print(f"\nBuilt {len(graphs)} graphs in {elapsed * 1000:.1f} ms")
+    print(f"Written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
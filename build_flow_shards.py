@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shard every module into one file per flow plus a compact index.
+
+Writes public/data/generated/flows/<module>/index.json, with one row per
+flow (id, name, category, step count, content hash, shard file, and a
+summary of the flow's own fields the viewer lists and filters on), and
+<module>/<shard>.json holding the flow exactly as it appears in the
+module file. Clients load the index first and fetch a flow only when it
+is opened; the content hash can be used as a cache-busting query string.
+
+Shards whose content hash is unchanged are not rewritten, and shards of
+flows that no longer exist are removed. The index records the module
+file's size and mtime, so readers can tell when it is stale.
+
+    python3 build_flow_shards.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from flow_data import (
+    GENERATED_PATH,
+    MODULE_FILES,
+    get_flow_id,
+    get_flow_name,
+    get_flow_ref,
+    load_module,
+    module_file_path,
+    write_json_atomic,
+)
+
+SHARDS_PATH = os.path.join(GENERATED_PATH, 'flows')
+# Flow fields copied into index rows: everything the viewer's flow list
+# shows or matches on, i.e. all but the steps
+SUMMARY_FIELDS = (
+    'flow_id', 'id', 'flow_name', 'name', 'description', 'flowCategory', 'category',
+    'categoryDescription', 'isPrerequisite', 'dependencies', 'source_documents'
+)
+
+
+def flow_hash(flow):
+    canonical = json.dumps(flow, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def shard_name(flow_ref, used):
+    """File-system safe, unique shard file name for a flow"""
+    base = re.sub(r'[^A-Za-z0-9_.-]+', '_', flow_ref).strip('._') or 'flow'
+    name = base
+    suffix = 2
+    while name.lower() in used:
+        name = f'{base}-{suffix}'
+        suffix += 1
+    used.add(name.lower())
+    return f'{name}.json'
+
+
+def module_metadata(data, flows_pointer):
+    """The module document without its flows list"""
+    if isinstance(data, list):
+        return {}
+    metadata = json.loads(json.dumps(data))
+    parent = metadata
+    parts = flows_pointer.strip('/').split('/')
+    for part in parts[:-1]:
+        parent = parent[part]
+    parent.pop(parts[-1], None)
+    return metadata
+
+
+def shard_module(module_id, output_dir=SHARDS_PATH):
+    """Write one module's shards and index; returns (index, shards written)"""
+    data, flows_pointer, flows = load_module(module_id)
+    module_dir = os.path.join(output_dir, module_id)
+    os.makedirs(module_dir, exist_ok=True)
+
+    previous = {}
+    try:
+        with open(os.path.join(module_dir, 'index.json'), 'r') as f:
+            previous = {row['file']: row['hash'] for row in json.load(f)['flows']}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    rows = []
+    used = set()
+    written = 0
+    for flow in flows:
+        flow_ref = get_flow_ref(flow)
+        file_name = shard_name(flow_ref, used)
+        content = json.dumps(flow, ensure_ascii=False, separators=(',', ':'))
+        digest = flow_hash(flow)
+        shard_path = os.path.join(module_dir, file_name)
+
+        if previous.get(file_name) != digest or not os.path.exists(shard_path):
+            tmp_path = shard_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, shard_path)
+            written += 1
+
+        rows.append({
+            'id': flow_ref,
+            'flow_id': get_flow_id(flow),
+            'name': get_flow_name(flow),
+            'category': flow.get('category') or flow.get('flowCategory'),
+            'steps': len(flow.get('steps') or []),
+            'hash': digest,
+            'file': file_name,
+            'bytes': len(content.encode('utf-8')),
+            'summary': {field: flow[field] for field in SUMMARY_FIELDS if field in flow}
+        })
+
+    keep = {row['file'] for row in rows} | {'index.json'}
+    for name in os.listdir(module_dir):
+        if name.endswith('.json') and name not in keep:
+            os.remove(os.path.join(module_dir, name))
+
+    stat = os.stat(module_file_path(module_id))
+    index = {
+        'module': module_id,
+        'source': MODULE_FILES[module_id],
+        'source_size': stat.st_size,
+        'source_mtime_ms': stat.st_mtime_ns // 1_000_000,
+        'flows_pointer': flows_pointer,
+        'metadata': module_metadata(data, flows_pointer),
+        'count': len(rows),
+        'flows': rows
+    }
+    write_json_atomic(os.path.join(module_dir, 'index.json'), index, indent=None)
+    return index, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shard module files into per-flow files')
+    parser.add_argument('--output-dir', default=SHARDS_PATH, help='artifact directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    modules = {}
+    for module_id in MODULE_FILES:
+        index, written = shard_module(module_id, args.output_dir)
+        index_bytes = os.path.getsize(os.path.join(args.output_dir, module_id, 'index.json'))
+        modules[module_id] = {
+            'count': index['count'],
+            'index_bytes': index_bytes,
+            'hash': hashlib.sha1(''.join(row['hash'] for row in index['flows']).encode()).hexdigest()[:16]
+        }
+        print(f"✅ {module_id}: {index['count']} flows, index {index_bytes / 1024:.1f} KB "
+              f"(module file {index['source_size'] / 1024:.0f} KB), {written} shards written")
+
+    write_json_atomic(os.path.join(args.output_dir, 'index.json'), {'modules': modules}, indent=None)
+    print(f"\nSharded {len(modules)} modules in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"Written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
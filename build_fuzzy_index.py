@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Build the typo-tolerant word index used to correct search queries.
+
+The vocabulary is every word of the flows (names, categories,
+descriptions, prerequisites, steps) and of the PDF page text, with its
+number of occurrences; flow words count FLOW_WEIGHT times, so
+corrections prefer words the flow search can actually find. Each word
+is padded as "^word$" and split into trigrams, and every trigram gets
+a posting list of word ids.
+
+A lookup counts, for the trigrams of the misspelt word, how many each
+candidate shares. An edit changes at most 4 trigrams of the padded word
+(a transposition touches two characters), so a word within k edits
+shares at least (trigrams - 4k); only candidates that pass that count
+and the length filter have their edit distance computed, with an early
+exit once every cell of a row exceeds k. Distance is optimal string
+alignment: substitutions, insertions, deletions and adjacent
+transpositions each cost one.
+
+data/generated/fuzzy_index.json, read by api/utils/fuzzyIndex.js:
+
+    sources    module_sources() at build time; readers ignore the index
+               once a module file has changed
+    words      vocabulary, most frequent first (ids are positions)
+    counts     weighted occurrences of each word
+    grams      {trigram: delta-encoded ascending word ids}
+
+    python3 build_fuzzy_index.py [--word dashbaord --word influncer]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from flow_data import SERVER_GENERATED_PATH, get_flow_text, iter_all_flows, module_sources, write_json_atomic
+from pdf_text import get_pdf_pages, list_pdfs, warm_cache
+from text_utils import tokenize
+
+FUZZY_INDEX_FILE = os.path.join(SERVER_GENERATED_PATH, 'fuzzy_index.json')
+INDEX_VERSION = 1
+FLOW_WEIGHT = 10
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 30
+# Trigrams a single edit can change in a padded word
+GRAMS_PER_EDIT = 4
+
+_QUERY_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+
+
+def max_edits(word):
+    """Edits tolerated for a query word of this length"""
+    if len(word) < MIN_WORD_LENGTH:
+        return 0
+    return 1 if len(word) <= 4 else 2
+
+
+def trigrams(word):
+    padded = f'^{word}$'
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def is_indexable(word):
+    return MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH and not word.isdigit()
+
+
+def bounded_distance(a, b, limit):
+    """Optimal string alignment distance of a and b, or limit + 1 if it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def build_fuzzy_index():
+    counts = Counter()
+    for _, _, _, flow in iter_all_flows():
+        text = '\n'.join([
+            get_flow_text(flow),
+            flow.get('category') or flow.get('flowCategory') or '',
+            '\n'.join(str(p) for p in flow.get('prerequisites') or [])
+        ])
+        for word in tokenize(text):
+            if is_indexable(word):
+                counts[word] += FLOW_WEIGHT
+
+    rel_paths = list_pdfs()
+    warm_cache(rel_paths)
+    for rel_path in rel_paths:
+        for page in get_pdf_pages(rel_path) or []:
+            counts.update(word for word in tokenize(page) if is_indexable(word))
+
+    words = sorted(counts, key=lambda word: (-counts[word], word))
+    postings = {}
+    for word_id, word in enumerate(words):
+        for gram in set(trigrams(word)):
+            postings.setdefault(gram, []).append(word_id)
+
+    grams = {}
+    for gram in sorted(postings):
+        ids = postings[gram]
+        grams[gram] = [ids[0]] + [ids[i] - ids[i - 1] for i in range(1, len(ids))]
+
+    return {
+        'version': INDEX_VERSION,
+        'grams_per_edit': GRAMS_PER_EDIT,
+        'sources': module_sources(),
+        'words': words,
+        'counts': [counts[word] for word in words],
+        'grams': grams
+    }
+
+
+class FuzzyIndex:
+    """Reference lookup over the built index (mirrors api/utils/fuzzyIndex.js)"""
+
+    def __init__(self, index):
+        self.words = index['words']
+        self.counts = index['counts']
+        self.ids = {word: word_id for word_id, word in enumerate(self.words)}
+        self.postings = {}
+        for gram, deltas in index['grams'].items():
+            ids = []
+            total = 0
+            for delta in deltas:
+                total += delta
+                ids.append(total)
+            self.postings[gram] = ids
+
+    def lookup(self, word, limit=5):
+        """[(word, distance, count)] within max_edits(word), closest then most frequent"""
+        word = word.lower()
+        if word in self.ids:
+            return [(word, 0, self.counts[self.ids[word]])]
+        edits = max_edits(word)
+        if not edits:
+            return []
+
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in set(grams):
+            shared.update(self.postings.get(gram, ()))
+        needed = max(1, len(grams) - GRAMS_PER_EDIT * edits)
+
+        matches = []
+        for word_id, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_distance(word, self.words[word_id], edits)
+            if distance <= edits:
+                matches.append((self.words[word_id], distance, self.counts[word_id]))
+        matches.sort(key=lambda match: (match[1], -match[2]))
+        return matches[:limit]
+
+    def correct(self, query, should_correct=lambda word: True):
+        """(query, [{from, to, distance}]) with unknown words replaced by their
+        closest known word, like correctQuery() in api/utils/fuzzyIndex.js"""
+        corrections = []
+
+        def replace(match):
+            original = match.group()
+            word = original.lower()
+            if word.isdigit() or word in self.ids or not should_correct(word):
+                return original
+            best = self.lookup(word, 1)
+            if not best:
+                return original
+            corrections.append({'from': original, 'to': best[0][0], 'distance': best[0][1]})
+            return best[0][0]
+
+        return _QUERY_WORD_RE.sub(replace, query), corrections
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the trigram index for typo-tolerant search')
+    parser.add_argument('--output', default=FUZZY_INDEX_FILE, help='index path')
+    parser.add_argument('--word', action='append', help='look up a (misspelt) word in the new index')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_fuzzy_index()
+    write_json_atomic(args.output, index, indent=None)
+    size = os.path.getsize(args.output)
+    print(f"✅ Indexed {len(index['words'])} words, {len(index['grams'])} trigrams "
+          f"({size / 1024:.0f} KB, {time.perf_counter() - start:.1f} s)")
+
+    if args.word:
+        fuzzy = FuzzyIndex(index)
+        for word in args.word:
+            start = time.perf_counter()
+            matches = fuzzy.lookup(word)
+            elapsed = (time.perf_counter() - start) * 1000
+            found = ', '.join(f'{match} ({distance})' for match, distance, _ in matches) or 'no match'
+            print(f"   {word} -> {found} [{elapsed:.2f} ms]")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Build a latent semantic (LSA) index over flows and PDF passages.
+
+Flows (name, description, steps) and the passages of the chunk store
+are turned into the same sublinear, L2-normalised TF-IDF rows as
+build_related_flows.py. A randomized truncated SVD (NumPy, a few power
+iterations) reduces them to --rank concepts, so a query about "posting"
+also finds documents that only say "publish" when the two words occur
+in the same contexts.
+
+Written to data/generated/lsa/:
+
+    meta.json          terms, documents (flows and chunks), rank, singular values
+    idf.npy            idf weight of each term
+    components.npy     terms x rank, projects a TF-IDF row into concept space
+    doc_vectors.npy    documents x rank, L2-normalised, float32
+
+A query is folded in with its TF-IDF row @ components and normalised,
+so cosine similarity against every document is one matrix multiply;
+many queries are ranked in a single batched product.
+
+Requires numpy and scipy (for the sparse TF-IDF matrix).
+
+    python3 build_lsa_index.py [--rank 128]
+    python3 build_lsa_index.py --query "schedule a post" --query "notification rules"
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from build_chunk_store import CHUNK_STORE_FILE, ChunkStore, build_chunk_store
+from build_related_flows import idf_weights, tfidf_rows
+from flow_data import SERVER_GENERATED_PATH, get_flow_name, get_flow_ref, get_flow_text, iter_all_flows, write_json_atomic
+from text_utils import stemmed_tokens
+
+LSA_INDEX_PATH = os.path.join(SERVER_GENERATED_PATH, 'lsa')
+INDEX_VERSION = 1
+DEFAULT_RANK = 128
+# Terms in fewer documents than this cannot relate documents to each other
+MIN_DF = 2
+POWER_ITERATIONS = 4
+OVERSAMPLES = 64
+
+
+def collect_documents(store):
+    """(document metadata, term Counter) for every flow and passage"""
+    documents = []
+    term_counts = []
+    for module_id, _, _, flow in iter_all_flows():
+        documents.append({'type': 'flow', 'module': module_id, 'id': get_flow_ref(flow), 'name': get_flow_name(flow)})
+        term_counts.append(Counter(stemmed_tokens(get_flow_text(flow))))
+
+    for chunk_id in range(len(store)):
+        meta = store.metadata(chunk_id)
+        documents.append({
+            'type': 'chunk',
+            'module': meta['module'],
+            'chunk': chunk_id,
+            'pdf': meta['pdf'],
+            'page_start': meta['page_start'],
+            'page_end': meta['page_end'],
+            'heading': meta['heading']
+        })
+        term_counts.append(Counter(stemmed_tokens(f"{meta['heading']}\n{store.text(chunk_id)}")))
+    return documents, term_counts
+
+
+def truncated_svd(matrix, rank, seed=0):
+    """Randomized SVD (Halko et al.): the top `rank` (U, s, Vt) of a sparse matrix"""
+    rank = min(rank, min(matrix.shape) - 1)
+    rng = np.random.default_rng(seed)
+    sample = matrix @ rng.standard_normal((matrix.shape[1], rank + OVERSAMPLES))
+    basis, _ = np.linalg.qr(sample)
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(matrix.T @ basis)
+        basis, _ = np.linalg.qr(matrix @ basis)
+
+    small = np.asarray((matrix.T @ basis).T)
+    u_small, singular_values, vt = np.linalg.svd(small, full_matrices=False)
+    return (basis @ u_small)[:, :rank], singular_values[:rank], vt[:rank]
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def build_lsa_index(rank=DEFAULT_RANK, output_dir=LSA_INDEX_PATH):
+    """Build and save the index; returns its meta dict"""
+    if not os.path.exists(CHUNK_STORE_FILE):
+        build_chunk_store()
+    store = ChunkStore()
+    if store.is_stale():
+        store.close()
+        print("⚠️  PDFs changed since the chunk store was built; rebuilding it")
+        build_chunk_store()
+        store = ChunkStore()
+    documents, term_counts = collect_documents(store)
+    store.close()
+
+    df = Counter(term for counts in term_counts for term in counts)
+    terms = sorted(term for term, count in df.items() if count >= MIN_DF)
+    vocabulary = {term: column for column, term in enumerate(terms)}
+    idf = idf_weights(np.array([df[term] for term in terms], dtype=np.float64), len(documents))
+    matrix = tfidf_rows(term_counts, vocabulary, idf)
+
+    u, singular_values, vt = truncated_svd(matrix, rank)
+    # X @ V = U * s, so documents and folded-in queries share one space
+    doc_vectors = normalize_rows(u * singular_values).astype(np.float32)
+    components = vt.T.astype(np.float32)
+    total = float(matrix.multiply(matrix).sum())
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in (('idf', idf), ('components', components), ('doc_vectors', doc_vectors)):
+        path = os.path.join(output_dir, f'{name}.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array)
+        os.replace(path + '.tmp', path)
+
+    meta = {
+        'version': INDEX_VERSION,
+        'rank': len(singular_values),
+        'explained_variance': round(float((singular_values ** 2).sum()) / total, 4) if total else 0.0,
+        'singular_values': [round(float(value), 4) for value in singular_values],
+        'terms': terms,
+        'documents': documents
+    }
+    write_json_atomic(os.path.join(output_dir, 'meta.json'), meta, indent=None)
+    return meta
+
+
+class LsaIndex:
+    """Concept-space search over a built LSA index"""
+
+    def __init__(self, index_dir=LSA_INDEX_PATH):
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"LSA index version {meta.get('version')}, expected {INDEX_VERSION}")
+
+        self.documents = meta['documents']
+        self.vocabulary = {term: column for column, term in enumerate(meta['terms'])}
+        self.idf = np.load(os.path.join(index_dir, 'idf.npy'))
+        self.components = np.load(os.path.join(index_dir, 'components.npy'), mmap_mode='r')
+        self.doc_vectors = np.load(os.path.join(index_dir, 'doc_vectors.npy'), mmap_mode='r')
+        self.types = np.array([document['type'] for document in self.documents])
+        self.modules = np.array([document['module'] or '' for document in self.documents])
+
+    def embed(self, queries):
+        """Normalised concept vectors (queries x rank) for a list of query strings"""
+        weights = np.zeros((len(queries), len(self.vocabulary)), dtype=np.float32)
+        for row, query in enumerate(queries):
+            for term, count in Counter(stemmed_tokens(query)).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    weights[row, column] = (1.0 + math.log(count)) * self.idf[column]
+        return normalize_rows(weights @ self.components)
+
+    def search(self, queries, k=10, doc_type=None, module=None):
+        """Top-k (document, cosine) lists, one per query, from one batched product"""
+        scores = self.embed(queries) @ self.doc_vectors.T
+        mask = np.ones(len(self.documents), dtype=bool)
+        if doc_type:
+            mask &= self.types == doc_type
+        if module:
+            mask &= self.modules == module
+        scores[:, ~mask] = -np.inf
+
+        k = min(k, int(mask.sum()))
+        if k <= 0:
+            return [[] for _ in queries]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates], kind='stable')]
+            results.append([
+                (self.documents[doc], round(float(scores[row, doc]), 4))
+                for doc in ordered if scores[row, doc] > 0
+            ])
+        return results
+
+
+def describe(document):
+    if document['type'] == 'flow':
+        return f"flow  {document['module']}/{document['id']}  {document['name']}"
+    return (f"chunk {document['pdf']} (pages {document['page_start']}-{document['page_end']}) "
+            f"§ {document['heading']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the LSA concept index over flows and PDF passages')
+    parser.add_argument('--rank', type=int, default=DEFAULT_RANK, help='number of concepts to keep')
+    parser.add_argument('--output-dir', default=LSA_INDEX_PATH, help='index directory')
+    parser.add_argument('--query', action='append', help='test query (repeatable; all run as one batch)')
+    parser.add_argument('--type', choices=('flow', 'chunk'), help='restrict test queries to one document type')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    meta = build_lsa_index(args.rank, args.output_dir)
+    flows = sum(1 for document in meta['documents'] if document['type'] == 'flow')
+    print(f"✅ {len(meta['documents'])} documents ({flows} flows), {len(meta['terms'])} terms, "
+          f"rank {meta['rank']} ({meta['explained_variance']:.0%} of variance, "
+          f"{time.perf_counter() - start:.1f} s)")
+
+    if args.query:
+        index = LsaIndex(args.output_dir)
+        start = time.perf_counter()
+        results = index.search(args.query, k=5, doc_type=args.type)
+        print(f"\n{len(args.query)} queries in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for query, hits in zip(args.query, results):
+            print(f"\n📁 {query}")
+            for document, score in hits:
+                print(f"   {score:.3f}  {describe(document)}")
+    print(f"Written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Find the cited pages behind each flow's and step's source_documents.
+
+A citation names a whole PDF, so the viewer has to load and render all
+of it to show one section. Using the page index (build_page_index.py),
+each flow is scored with BM25 against the pages of every PDF it cites,
+and each step against the pages of its flow's (and its own) PDFs.
+The best page is widened to neighbouring pages that score at least
+RANGE_RATIO of it, up to MAX_RANGE_PAGES, giving a citation:
+
+    {"document": "<source_documents string>", "path": "<ModuleDir>/<pdf>",
+     "pages": [first, last], "page": best, "score": bm25,
+     "anchor": "<path>#page=<best>"}
+
+Flows get one citation per cited PDF, in source_documents order; steps
+get the single best one. PDFs missing from the page index, Markdown
+documents and pages without a matching word are left out.
+
+public/data/generated/page_citations.json, keyed by module and flow
+ref (see flow_data.get_flow_ref):
+
+    {"source_pages": [citation, ...], "steps": [[citation] or [], ...]}
+
+The viewer (src/utils/citations.js) and the MCP server
+(api/utils/pageCitations.js) read it. --write instead adds source_pages
+next to source_documents in the module files, on each flow and each
+step; both readers prefer those when present.
+
+    python3 build_page_citations.py [--write]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from build_page_index import PAGE_INDEX_PATH, PageIndex
+from flow_data import (
+    GENERATED_PATH,
+    MODULE_FILES,
+    get_flow_ref,
+    get_flow_text,
+    get_step_text,
+    iter_all_flows,
+    load_module,
+    module_sources,
+    save_module,
+    write_json_atomic,
+)
+from pdf_paths import resolve_pdf_path
+from text_utils import stemmed_tokens
+
+PAGE_CITATIONS_FILE = os.path.join(GENERATED_PATH, 'page_citations.json')
+INDEX_VERSION = 1
+RANGE_RATIO = 0.6
+MAX_RANGE_PAGES = 3
+
+
+def cited_range(scores):
+    """(first, last, best) 1-based pages around the best-scoring page, or None"""
+    best = int(np.argmax(scores))
+    if scores[best] <= 0:
+        return None
+    floor = scores[best] * RANGE_RATIO
+    first = last = best
+    while last - first + 1 < MAX_RANGE_PAGES:
+        before = scores[first - 1] if first > 0 else -1
+        after = scores[last + 1] if last + 1 < len(scores) else -1
+        if max(before, after) < floor:
+            break
+        if after > before:
+            last += 1
+        else:
+            first -= 1
+    return first + 1, last + 1, best + 1
+
+
+def page_citation(index, terms, document, rel_path):
+    """Citation of the pages of rel_path that best match terms, or None"""
+    scores = index.pdf_page_scores(terms, rel_path)
+    if scores is None or not len(scores):
+        return None
+    pages = cited_range(scores)
+    if pages is None:
+        return None
+    first, last, best = pages
+    return {
+        'document': document,
+        'path': rel_path,
+        'pages': [first, last],
+        'page': best,
+        'score': round(float(scores[best - 1]), 3),
+        'anchor': f'{rel_path}#page={best}'
+    }
+
+
+def flow_page_citations(index, module_id, flow):
+    """{'source_pages': [...], 'steps': [[...], ...]} for one flow"""
+    documents = [(doc, resolve_pdf_path(doc, module_id)) for doc in flow.get('source_documents') or []]
+    terms = stemmed_tokens(get_flow_text(flow))
+    flow_citations = [
+        citation for citation in (page_citation(index, terms, doc, rel_path) for doc, rel_path in documents)
+        if citation
+    ]
+
+    steps = []
+    for step in flow.get('steps') or []:
+        step_documents = list(documents)
+        if isinstance(step, dict):
+            step_documents += [(doc, resolve_pdf_path(doc, module_id)) for doc in step.get('source_documents') or []]
+        terms = stemmed_tokens(get_step_text(step))
+        candidates = [page_citation(index, terms, doc, rel_path) for doc, rel_path in step_documents]
+        candidates = [citation for citation in candidates if citation]
+        steps.append([max(candidates, key=lambda citation: citation['score'])] if candidates else [])
+
+    return {'source_pages': flow_citations, 'steps': steps}
+
+
+def build_page_citations(index):
+    modules = {module_id: {} for module_id in MODULE_FILES}
+    for module_id, _, _, flow in iter_all_flows():
+        modules[module_id][get_flow_ref(flow)] = flow_page_citations(index, module_id, flow)
+    return {
+        'version': INDEX_VERSION,
+        'range_ratio': RANGE_RATIO,
+        'max_range_pages': MAX_RANGE_PAGES,
+        'sources': module_sources(),
+        'modules': modules
+    }
+
+
+def write_module_page_citations(citations):
+    """Set source_pages on the flows and dict steps of the module files"""
+    for module_id, flows_citations in citations['modules'].items():
+        data, _, flows = load_module(module_id)
+        for flow in flows:
+            entry = flows_citations.get(get_flow_ref(flow))
+            if entry is None:
+                continue
+            flow['source_pages'] = entry['source_pages']
+            for step, step_citations in zip(flow.get('steps') or [], entry['steps']):
+                if isinstance(step, dict):
+                    step['source_pages'] = step_citations
+        save_module(module_id, data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the cited pages of source_documents')
+    parser.add_argument('--index-dir', default=PAGE_INDEX_PATH, help='page index directory')
+    parser.add_argument('--output', default=PAGE_CITATIONS_FILE, help='artifact path')
+    parser.add_argument('--write', action='store_true',
+                        help='add source_pages to the module JSON files')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = PageIndex(args.index_dir)
+    if index.is_stale():
+        print("⚠️  PDFs changed since the page index was built; run build_page_index.py first")
+
+    citations = build_page_citations(index)
+    write_json_atomic(args.output, citations, indent=None)
+
+    flows = [entry for module in citations['modules'].values() for entry in module.values()]
+    flow_citations = sum(len(entry['source_pages']) for entry in flows)
+    steps = [step for entry in flows for step in entry['steps']]
+    spans = [citation['pages'][1] - citation['pages'][0] + 1
+             for entry in flows for citation in entry['source_pages']]
+    print(f"✅ {flow_citations} flow citations and {sum(1 for step in steps if step)}/{len(steps)} "
+          f"step citations narrowed to pages ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    if spans:
+        print(f"   {sum(spans) / len(spans):.1f} pages per flow citation on average")
+    print(f"Written to {args.output}")
+
+    if args.write:
+        write_module_page_citations(citations)
+        print(f"✅ Updated source_pages in {len(citations['modules'])} module files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
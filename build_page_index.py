@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Build a positional full-text index over every page of every PDF.
+
+Page text comes from the pdf_text cache, analysed with text_utils like
+the flow search index. Each (PDF, page) pair is one indexed document.
+The index is a directory of flat arrays that readers open with
+numpy's mmap_mode, so only the postings a query touches are read:
+
+    meta.json          PDFs (path, module, first page id), sorted terms, sources
+    pages.npy          per page: pdf index, 1-based page number, token count
+    term_ptr.npy       term t's postings are post_page[term_ptr[t]:term_ptr[t + 1]]
+    post_page.npy      page id of each posting, ascending within a term
+    post_ptr.npy       posting p's positions are positions[post_ptr[p]:post_ptr[p + 1]]
+    positions.npy      token offsets within the page
+    spans.npy          per page token, in page order: start and length of its
+                       characters in the cached page text
+
+Term queries are ranked with BM25; quoted phrases must occur at
+consecutive positions on the page. Hits name the PDF relative to
+public/pdfs and the 1-based page, which is what PDFViewer takes, plus
+an anchor ("<pdf>#page=N") the PDF viewers open at that page, and a
+snippet cut from the page text around the matched positions.
+
+    python3 build_page_index.py
+    python3 build_page_index.py --query '"smart alerts" threshold' [--module listen]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from flow_data import MODULE_DIRS, PDFS_PATH, SERVER_GENERATED_PATH, write_json_atomic
+from pdf_text import get_pdf_pages, list_pdfs, warm_cache
+from text_utils import content_spans, cut_snippet, mark_highlights, stemmed_tokens
+
+PAGE_INDEX_PATH = os.path.join(SERVER_GENERATED_PATH, 'page_index')
+INDEX_VERSION = 2
+K1 = 1.2
+B = 0.75
+
+PAGE_DTYPE = np.dtype([('pdf', '<u4'), ('page', '<u2'), ('length', '<u4')])
+SPAN_DTYPE = np.dtype([('start', '<u4'), ('length', '<u2')])
+ARRAYS = ('pages', 'term_ptr', 'post_page', 'post_ptr', 'positions', 'spans')
+
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+_DIR_TO_MODULE = {directory: module_id for module_id, directory in MODULE_DIRS.items()}
+
+
+def pdf_module(rel_path):
+    return _DIR_TO_MODULE.get(rel_path.split('/', 1)[0])
+
+
+def pdf_source(rel_path):
+    stat = os.stat(os.path.join(PDFS_PATH, *rel_path.split('/')))
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_page_index(rel_paths=None):
+    """Return (meta, arrays) for every page of the given PDFs"""
+    rel_paths = list_pdfs() if rel_paths is None else sorted(rel_paths)
+    warm_cache(rel_paths)
+
+    pdfs = []
+    sources = {}
+    pages = []
+    postings = {}
+    spans = []
+    for pdf_id, rel_path in enumerate(rel_paths):
+        page_texts = get_pdf_pages(rel_path) or []
+        pdfs.append([rel_path, pdf_module(rel_path), len(pages), len(page_texts)])
+        sources[rel_path] = pdf_source(rel_path)
+        for page_number, text in enumerate(page_texts, start=1):
+            page_id = len(pages)
+            tokens = stemmed_tokens(text)
+            pages.append((pdf_id, page_number, len(tokens)))
+            spans.extend((start, min(end - start, 0xFFFF)) for start, end in content_spans(text))
+            token_positions = {}
+            for position, token in enumerate(tokens):
+                token_positions.setdefault(token, []).append(position)
+            for token, positions in token_positions.items():
+                postings.setdefault(token, []).append((page_id, positions))
+
+    terms = sorted(postings)
+    term_ptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    post_page = []
+    post_ptr = [0]
+    positions = []
+    for t, term in enumerate(terms):
+        # Pages are visited in id order, so each list is already ascending
+        for page_id, page_positions in postings[term]:
+            post_page.append(page_id)
+            positions.extend(page_positions)
+            post_ptr.append(len(positions))
+        term_ptr[t + 1] = len(post_page)
+
+    arrays = {
+        'pages': np.array(pages, dtype=PAGE_DTYPE),
+        'term_ptr': term_ptr,
+        'post_page': np.array(post_page, dtype=np.uint32),
+        'post_ptr': np.array(post_ptr, dtype=np.int64),
+        'positions': np.array(positions, dtype=np.uint32),
+        'spans': np.array(spans, dtype=SPAN_DTYPE),
+    }
+    meta = {
+        'version': INDEX_VERSION,
+        'k1': K1,
+        'b': B,
+        'counts': {name: len(array) for name, array in arrays.items()},
+        'pdfs': pdfs,
+        'sources': sources,
+        'terms': terms,
+    }
+    return meta, arrays
+
+
+def save_page_index(meta, arrays, output_dir=PAGE_INDEX_PATH):
+    """Write the arrays, then meta.json, each through a temp file"""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in arrays.items():
+        path = os.path.join(output_dir, f'{name}.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array)
+        os.replace(path + '.tmp', path)
+    write_json_atomic(os.path.join(output_dir, 'meta.json'), meta, indent=None)
+
+
+class PageIndex:
+    """Read-only, memory-mapped view of a built page index"""
+
+    def __init__(self, index_dir=PAGE_INDEX_PATH):
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"page index version {meta.get('version')}, expected {INDEX_VERSION}")
+
+        for name in ARRAYS:
+            array = np.load(os.path.join(index_dir, f'{name}.npy'), mmap_mode='r')
+            if len(array) != meta['counts'][name]:
+                raise ValueError(f"{name}.npy does not match meta.json; rebuild the page index")
+            setattr(self, name, array)
+
+        self.k1 = meta['k1']
+        self.b = meta['b']
+        self.pdfs = meta['pdfs']
+        self.pdf_ids = {pdf[0]: pdf_id for pdf_id, pdf in enumerate(self.pdfs)}
+        self.sources = meta['sources']
+        self.term_ids = {term: t for t, term in enumerate(meta['terms'])}
+        self.lengths = np.asarray(self.pages['length'], dtype=np.float64)
+        self.span_ptr = np.concatenate(([0], np.cumsum(self.pages['length'], dtype=np.int64)))
+        self.avg_len = float(self.lengths.mean()) if len(self.lengths) else 0.0
+
+    def is_stale(self):
+        """Whether a PDF has been added, removed or changed since the build"""
+        if set(list_pdfs()) != set(self.sources):
+            return True
+        return any(pdf_source(rel_path) != source for rel_path, source in self.sources.items())
+
+    def _postings(self, term):
+        t = self.term_ids.get(term)
+        if t is None:
+            return 0, 0
+        return int(self.term_ptr[t]), int(self.term_ptr[t + 1])
+
+    def _positions(self, posting):
+        return self.positions[self.post_ptr[posting]:self.post_ptr[posting + 1]]
+
+    def phrase_pages(self, terms):
+        """Ids of the pages where terms occur at consecutive positions"""
+        ranges = [self._postings(term) for term in terms]
+        if not terms or any(start == end for start, end in ranges):
+            return np.empty(0, dtype=np.uint32)
+
+        candidates = None
+        for start, end in ranges:
+            pages = self.post_page[start:end]
+            candidates = pages if candidates is None else np.intersect1d(candidates, pages, assume_unique=True)
+        if len(terms) == 1:
+            return np.asarray(candidates)
+
+        matches = []
+        for page_id in candidates:
+            starts = None
+            for offset, (start, end) in enumerate(ranges):
+                posting = start + int(np.searchsorted(self.post_page[start:end], page_id))
+                shifted = self._positions(posting).astype(np.int64) - offset
+                starts = shifted if starts is None else np.intersect1d(starts, shifted, assume_unique=True)
+                if not len(starts):
+                    break
+            if len(starts):
+                matches.append(page_id)
+        return np.array(matches, dtype=np.uint32)
+
+    def snippet(self, page_id, terms):
+        """(snippet, highlights) of a page around the positions of terms"""
+        pdf_id, page_number, _ = self.pages[page_id]
+        page_texts = get_pdf_pages(self.pdfs[pdf_id][0]) or []
+        if page_number > len(page_texts):
+            return '', []
+        page_spans = self.spans[self.span_ptr[page_id]:self.span_ptr[page_id + 1]]
+        starts = page_spans['start'].astype(np.int64)
+        spans = list(zip(starts.tolist(), (starts + page_spans['length']).tolist()))
+
+        matched = []
+        for term in terms:
+            start, end = self._postings(term)
+            posting = start + int(np.searchsorted(self.post_page[start:end], page_id))
+            if posting < end and self.post_page[posting] == page_id:
+                matched.extend(self._positions(posting).tolist())
+        return cut_snippet(page_texts[page_number - 1], spans, matched)
+
+    def pdf_page_scores(self, terms, rel_path):
+        """BM25 score of every page of one PDF (index i is page i + 1); None if not indexed"""
+        pdf_id = self.pdf_ids.get(rel_path)
+        if pdf_id is None:
+            return None
+        first, count = self.pdfs[pdf_id][2:4]
+        n = len(self.lengths)
+        lengths = self.lengths[first:first + count]
+        norms = self.k1 * (1 - self.b + self.b * lengths / self.avg_len) if self.avg_len else np.full(count, self.k1)
+        scores = np.zeros(count, dtype=np.float64)
+        for term in set(terms):
+            start, end = self._postings(term)
+            if start == end:
+                continue
+            # Page ids of one PDF are consecutive, so its postings are one slice
+            pages = self.post_page[start:end]
+            low = start + int(np.searchsorted(pages, first))
+            high = start + int(np.searchsorted(pages, first + count))
+            if low == high:
+                continue
+            offsets = np.asarray(self.post_page[low:high], dtype=np.int64) - first
+            tf = np.diff(self.post_ptr[low:high + 1]).astype(np.float64)
+            idf = math.log(1 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[offsets] += idf * tf * (self.k1 + 1) / (tf + norms[offsets])
+        return scores
+
+    def search(self, query, module=None, limit=10):
+        """BM25-ranked page hits; quoted parts of the query must match as phrases"""
+        phrases = [stemmed_tokens(phrase) for phrase in PHRASE_RE.findall(query)]
+        terms = set(stemmed_tokens(PHRASE_RE.sub(r' \1 ', query)))
+
+        n = len(self.lengths)
+        scores = np.zeros(n, dtype=np.float64)
+        norms = self.k1 * (1 - self.b + self.b * self.lengths / self.avg_len) if self.avg_len else np.full(n, self.k1)
+        for term in terms:
+            start, end = self._postings(term)
+            if start == end:
+                continue
+            page_ids = np.asarray(self.post_page[start:end], dtype=np.int64)
+            tf = np.diff(self.post_ptr[start:end + 1]).astype(np.float64)
+            idf = math.log(1 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[page_ids] += idf * tf * (self.k1 + 1) / (tf + norms[page_ids])
+
+        mask = scores > 0
+        for phrase in phrases:
+            if phrase:
+                allowed = np.zeros(n, dtype=bool)
+                allowed[self.phrase_pages(phrase)] = True
+                mask &= allowed
+        if module:
+            module_pdfs = np.array([pdf[1] == module for pdf in self.pdfs], dtype=bool)
+            mask &= module_pdfs[np.asarray(self.pages['pdf'], dtype=np.int64)]
+
+        page_ids = np.flatnonzero(mask)
+        order = page_ids[np.argsort(-scores[page_ids], kind='stable')][:limit]
+        hits = []
+        for page_id in order:
+            pdf_id, page_number, _ = self.pages[page_id]
+            rel_path, module_id = self.pdfs[pdf_id][:2]
+            snippet, highlights = self.snippet(page_id, terms)
+            hits.append({
+                'pdf': rel_path,
+                'module': module_id,
+                'page': int(page_number),
+                'anchor': f'{rel_path}#page={int(page_number)}',
+                'score': round(float(scores[page_id]), 3),
+                'snippet': snippet,
+                'highlights': highlights
+            })
+        return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the PDF page full-text index')
+    parser.add_argument('--output-dir', default=PAGE_INDEX_PATH, help='index directory')
+    parser.add_argument('--query', help='run a test query against the new index')
+    parser.add_argument('--module', help='restrict the test query to one module')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    meta, arrays = build_page_index()
+    save_page_index(meta, arrays, args.output_dir)
+    elapsed = time.perf_counter() - start
+
+    size = sum(os.path.getsize(os.path.join(args.output_dir, name)) for name in os.listdir(args.output_dir))
+    print(f"✅ Indexed {len(meta['pdfs'])} PDFs, {meta['counts']['pages']} pages, "
+          f"{len(meta['terms'])} terms ({size / 1024:.0f} KB, {elapsed:.1f} s)")
+
+    if args.query:
+        index = PageIndex(args.output_dir)
+        start = time.perf_counter()
+        hits = index.search(args.query, module=args.module)
+        print(f"\n📁 {len(hits)} hits in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for hit in hits:
+            print(f"   {hit['score']:6.2f}  {hit['anchor']}")
+            print(f"           {mark_highlights(hit['snippet'], hit['highlights'])}")
+    print(f"Written to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Resolve free-text prerequisites to the flows that produce them.
+
+Each flow's name, description and outcomes describe what it produces.
+These are indexed as stemmed term -> flows postings with idf weights, and
+every prerequisite is scored against them:
+
+    score = idf weight of the prerequisite terms the flow produces
+            / idf weight of all its terms
+
+Prerequisites about roles, permissions, module access, knowledge or the
+user's own accounts ("Advertiser user role", "Access to Advertise
+module", "Understanding of KPI goals", "Valid Facebook or LinkedIn ad
+account") are not produced by any flow and stay unresolved; generic
+words ("access", "existing", "social media") do not count towards a
+match. Flows from another module are only considered when none from the
+same module match, and need a stronger match on several terms.
+
+The resolved links form a DAG. An edge that would close a cycle is
+dropped, weakest first. The artifact
+(data/generated/prerequisite_chains.json) holds the resolved
+prerequisites, one topological order over all flows, the minimal chain
+of flows to complete before each flow, and each flow's prerequisite
+depth.
+
+    python3 build_prerequisite_chains.py [--threshold 0.6] [--verbose]
+"""
+
+import argparse
+import heapq
+import math
+import os
+import sys
+import time
+from collections import Counter
+
+from flow_data import (
+    MODULE_FILES,
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    iter_all_flows,
+    write_json_atomic,
+)
+from text_utils import stem, stemmed_tokens
+
+CHAINS_FILE = os.path.join(SERVER_GENERATED_PATH, 'prerequisite_chains.json')
+DEFAULT_THRESHOLD = 0.6
+# Producers scoring within this share of the best match are kept as alternatives
+ALTERNATIVE_RATIO = 0.9
+# Penalty applied to producers from another module
+CROSS_MODULE_FACTOR = 0.8
+# Producers from another module are only considered when none in the same
+# module match, and need this score (before the penalty) on at least
+# CROSS_MODULE_MIN_TERMS terms: a word or two such as "label" or
+# "content" says little across modules
+CROSS_MODULE_THRESHOLD = 0.9
+CROSS_MODULE_MIN_TERMS = 3
+
+# Prerequisites mentioning these are about the user, not a flow's output
+USER_TERMS = frozenset(stem(word) for word in """
+admin administrator credentials knowledge module permission permissions role
+roles understanding valid
+""".split())
+
+# Words too common in prerequisites to identify a producing flow
+GENERIC_TERMS = frozenset(stem(word) for word in """
+access account active advertiser analyst appropriate available clear data
+defined determined enabled existing have lead logged management media
+platform prepared proper properly relevant social team user users
+""".split())
+
+
+def produced_text(flow):
+    """What a flow produces: its name, description and outcomes"""
+    parts = [get_flow_name(flow), flow.get('description') or flow.get('flow_description') or '']
+    for key in ('outcomes', 'expected_outcomes'):
+        value = flow.get(key)
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value))
+    return '\n'.join(parts)
+
+
+def prerequisite_terms(text):
+    """Terms a producing flow must match; empty for user-side prerequisites"""
+    tokens = set(stemmed_tokens(text))
+    if tokens & USER_TERMS:
+        return set()
+    return tokens - GENERIC_TERMS
+
+
+class ProducerIndex:
+    """Stemmed term -> flows producing it, with idf weights"""
+
+    def __init__(self, nodes, flows):
+        self.nodes = nodes
+        self.postings = {}
+        for node_id, flow in enumerate(flows):
+            for term in set(stemmed_tokens(produced_text(flow))):
+                self.postings.setdefault(term, []).append(node_id)
+        self.idf = {
+            term: math.log((1.0 + len(flows)) / (1.0 + len(postings))) + 1.0
+            for term, postings in self.postings.items()
+        }
+
+    def producers(self, text, node_id, threshold=DEFAULT_THRESHOLD):
+        """[(producer node id, score)] for one prerequisite of node_id"""
+        terms = prerequisite_terms(text)
+        # Terms no flow produces still count against the match
+        total = sum(self.idf.get(term, math.log(1.0 + len(self.nodes)) + 1.0) for term in terms)
+        if not total:
+            return []
+
+        weights = Counter()
+        matched = Counter()
+        for term in terms:
+            for producer in self.postings.get(term, ()):
+                weights[producer] += self.idf[term]
+                matched[producer] += 1
+
+        module_id = self.nodes[node_id]['module']
+        scores = []
+        cross_module = []
+        for producer, weight in weights.items():
+            if producer == node_id:
+                continue
+            score = weight / total
+            if self.nodes[producer]['module'] == module_id:
+                if score >= threshold:
+                    scores.append((producer, score))
+            elif score >= max(threshold, CROSS_MODULE_THRESHOLD) and matched[producer] >= CROSS_MODULE_MIN_TERMS:
+                cross_module.append((producer, score * CROSS_MODULE_FACTOR))
+        scores = scores or cross_module
+        if not scores:
+            return []
+
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        best = scores[0][1]
+        return [(producer, score) for producer, score in scores if score >= best * ALTERNATIVE_RATIO]
+
+
+def reaches(adjacency, source, target):
+    """Whether target is reachable from source"""
+    stack = [source]
+    seen = {source}
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        for successor in adjacency[node]:
+            if successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return False
+
+
+def build_prerequisite_chains(threshold=DEFAULT_THRESHOLD):
+    nodes = []
+    flows = []
+    for module_id, _, _, flow in iter_all_flows():
+        nodes.append({
+            'id': f'{module_id}/{get_flow_ref(flow)}',
+            'module': module_id,
+            'name': get_flow_name(flow)
+        })
+        flows.append(flow)
+
+    index = ProducerIndex(nodes, flows)
+
+    resolved = {}
+    candidate_edges = []
+    for node_id, flow in enumerate(flows):
+        entries = []
+        for text in flow.get('prerequisites') or []:
+            producers = index.producers(text, node_id, threshold)
+            entries.append({
+                'text': text,
+                'producers': [
+                    {'flow': nodes[p]['id'], 'score': round(score, 3)} for p, score in producers
+                ]
+            })
+            if producers:
+                # Only the best producer becomes a chain edge
+                candidate_edges.append((producers[0][1], producers[0][0], node_id))
+        resolved[nodes[node_id]['id']] = entries
+
+    # Strongest edges first; skip any that would close a cycle
+    adjacency = [set() for _ in nodes]
+    dropped = []
+    for score, producer, consumer in sorted(candidate_edges, key=lambda edge: -edge[0]):
+        if consumer in adjacency[producer]:
+            continue
+        if reaches(adjacency, consumer, producer):
+            dropped.append({'from': nodes[producer]['id'], 'to': nodes[consumer]['id'], 'score': round(score, 3)})
+            continue
+        adjacency[producer].add(consumer)
+
+    # Kahn's algorithm; ties keep module order and position in the module file
+    indegree = [0] * len(nodes)
+    for successors in adjacency:
+        for successor in successors:
+            indegree[successor] += 1
+    ready = [node_id for node_id, degree in enumerate(indegree) if degree == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node_id = heapq.heappop(ready)
+        order.append(node_id)
+        for successor in adjacency[node_id]:
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                heapq.heappush(ready, successor)
+
+    position = {node_id: i for i, node_id in enumerate(order)}
+    predecessors = [[] for _ in nodes]
+    for producer, successors in enumerate(adjacency):
+        for successor in successors:
+            predecessors[successor].append(producer)
+
+    # Ancestors in topological order: everything to do first, nothing more
+    # Depth: length of the longest prerequisite path ending at the flow
+    ancestors = [set() for _ in nodes]
+    depth = [0] * len(nodes)
+    for node_id in order:
+        for producer in predecessors[node_id]:
+            ancestors[node_id].add(producer)
+            ancestors[node_id] |= ancestors[producer]
+            depth[node_id] = max(depth[node_id], depth[producer] + 1)
+
+    return {
+        'threshold': threshold,
+        'order': [nodes[node_id]['id'] for node_id in order],
+        'prerequisites': resolved,
+        'chains': {
+            nodes[node_id]['id']: [nodes[a]['id'] for a in sorted(ancestors[node_id], key=position.get)]
+            for node_id in range(len(nodes))
+        },
+        'depths': {nodes[node_id]['id']: depth[node_id] for node_id in range(len(nodes))},
+        'dropped_edges': dropped
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve prerequisites and build prerequisite chains')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum match score (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--output', default=CHAINS_FILE, help='artifact path')
+    parser.add_argument('--verbose', action='store_true', help='print every resolved prerequisite')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = build_prerequisite_chains(args.threshold)
+    elapsed = time.perf_counter() - start
+
+    write_json_atomic(args.output, result)
+
+    entries = [entry for entries in result['prerequisites'].values() for entry in entries]
+    resolved = sum(1 for entry in entries if entry['producers'])
+    longest = max(result['chains'].items(), key=lambda item: len(item[1]))
+
+    print(f"✅ Resolved {resolved}/{len(entries)} prerequisites across {len(MODULE_FILES)} modules "
+          f"({elapsed * 1000:.1f} ms)")
+    if result['dropped_edges']:
+        print(f"⚠️  Dropped {len(result['dropped_edges'])} edges that would create cycles")
+    print(f"Longest chain: {longest[0]} ({len(longest[1])} flows first)")
+    if args.verbose:
+        for flow_id, entries in result['prerequisites'].items():
+            for entry in entries:
+                if entry['producers']:
+                    producers = ', '.join(p['flow'] for p in entry['producers'])
+                    print(f"   {flow_id}: '{entry['text']}' <- {producers}")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
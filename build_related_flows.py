@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Compute related_flows from flow content instead of list position.
+
+Every flow's name, description and steps are turned into a TF-IDF row
+(sublinear tf, smoothed idf, L2-normalised) in one SciPy sparse matrix.
+Cosine similarities come from sparse X @ X.T, processed in row chunks so
+memory stays bounded, and each flow keeps its top-k neighbours in the
+same module above a similarity threshold.
+
+The vector space and neighbour lists are persisted under
+data/generated/, so after an editor saves a flow (e.g. through
+/api/update-flow) --incremental only re-embeds the flows whose content
+hash changed, recomputes their similarity column with one sparse
+product, and patches the neighbour lists that column affects. idf
+weights stay frozen between full builds.
+
+Requires numpy and scipy.
+
+    python3 build_related_flows.py                    # full build
+    python3 build_related_flows.py --incremental      # re-embed changed flows only
+    add --write to update related_flows in the module files
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from flow_data import (
+    MODULE_FILES,
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    get_flow_text,
+    iter_all_flows,
+    load_module,
+    save_module,
+    write_json_atomic,
+)
+from text_utils import stemmed_tokens
+
+RELATED_FLOWS_FILE = os.path.join(SERVER_GENERATED_PATH, 'related_flows.json')
+STATE_MATRIX_FILE = os.path.join(SERVER_GENERATED_PATH, 'related_flows_vectors.npz')
+STATE_FILE = os.path.join(SERVER_GENERATED_PATH, 'related_flows_state.json')
+DEFAULT_TOP_K = 3
+DEFAULT_THRESHOLD = 0.1
+CHUNK_ROWS = 2048
+
+
+def flow_term_counts(flow):
+    return Counter(stemmed_tokens(get_flow_text(flow)))
+
+
+def flow_hash(flow):
+    return hashlib.sha1(get_flow_text(flow).encode('utf-8')).hexdigest()
+
+
+def idf_weights(df, n_documents):
+    """Smoothed idf, as in scikit-learn: log((1 + n) / (1 + df)) + 1"""
+    return np.log((1.0 + n_documents) / (1.0 + df)) + 1.0
+
+
+def tfidf_rows(term_counts, vocabulary, idf):
+    """L2-normalised sublinear TF-IDF rows as a CSR matrix"""
+    indptr = [0]
+    indices = []
+    data = []
+    for counts in term_counts:
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                data.append((1.0 + math.log(count)) * idf[column])
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(term_counts), len(vocabulary))
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ matrix).tocsr()
+
+
+def top_k_neighbours(matrix, groups, k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD,
+                     rows=None, chunk_rows=CHUNK_ROWS):
+    """Top-k most similar rows within the same group for each requested row.
+
+    Returns {row: [(neighbour_row, similarity), ...]} sorted by similarity.
+    Works on row chunks of the sparse similarity product, so it never
+    materialises the full n x n matrix.
+    """
+    groups = np.asarray(groups)
+    rows = np.arange(matrix.shape[0]) if rows is None else np.asarray(sorted(rows), dtype=np.int64)
+    transposed = matrix.T.tocsc()
+    neighbours = {int(row): [] for row in rows}
+
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        similarities = (matrix[chunk] @ transposed).tocoo()
+
+        source = chunk[similarities.row]
+        target = similarities.col
+        scores = similarities.data
+        keep = (groups[source] == groups[target]) & (source != target) & (scores >= threshold)
+        source, target, scores = source[keep], target[keep], scores[keep]
+
+        # Sort by source row, then by descending score, and keep the first k per row
+        order = np.lexsort((-scores, source))
+        source, target, scores = source[order], target[order], scores[order]
+        row_start = np.searchsorted(source, source, side='left')
+        rank = np.arange(len(source)) - row_start
+        keep = rank < k
+
+        for s, t, score in zip(source[keep], target[keep], scores[keep]):
+            neighbours[int(s)].append((int(t), float(score)))
+
+    return neighbours
+
+
+class RelatedFlowsIndex:
+    """Persisted TF-IDF space and neighbour lists for all flows"""
+
+    def __init__(self, k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD):
+        self.k = k
+        self.threshold = threshold
+        self.vocabulary = {}
+        self.df = np.zeros(0)
+        self.idf = np.zeros(0)
+        self.matrix = sparse.csr_matrix((0, 0))
+        # One entry per matrix row: module, ref, name, hash
+        self.rows = []
+        self.neighbours = {}
+
+    @property
+    def groups(self):
+        return [row['module'] for row in self.rows]
+
+    @staticmethod
+    def row_entry(module_id, flow):
+        return {
+            'module': module_id,
+            'ref': get_flow_ref(flow),
+            'name': get_flow_name(flow),
+            'hash': flow_hash(flow)
+        }
+
+    def build(self, records):
+        """Full rebuild from (module_id, flow) records"""
+        term_counts = [flow_term_counts(flow) for _, flow in records]
+        document_frequency = Counter()
+        for counts in term_counts:
+            document_frequency.update(counts.keys())
+
+        terms = sorted(document_frequency)
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+        self.idf = idf_weights(self.df, len(records))
+        self.matrix = tfidf_rows(term_counts, self.vocabulary, self.idf)
+        self.rows = [self.row_entry(module_id, flow) for module_id, flow in records]
+        self.neighbours = top_k_neighbours(self.matrix, self.groups, self.k, self.threshold)
+
+    def update(self, changed):
+        """Re-embed changed flows, given {row: (module_id, flow)}.
+
+        Returns the set of rows whose neighbour lists changed.
+        """
+        if not changed:
+            return set()
+
+        rows = sorted(changed)
+        old_neighbours = {row: list(self.neighbours[row]) for row in self.neighbours}
+        matrix = self.matrix.tolil()
+
+        for row in rows:
+            module_id, flow = changed[row]
+            counts = flow_term_counts(flow)
+
+            # Move document frequencies from the old terms to the new ones
+            self.df[self.matrix[row].indices] -= 1
+            for term in counts:
+                if term not in self.vocabulary:
+                    self.vocabulary[term] = len(self.vocabulary)
+                    self.df = np.append(self.df, 0.0)
+                    self.idf = np.append(self.idf, idf_weights(np.array([1.0]), len(self.rows)))
+            columns = [self.vocabulary[term] for term in counts]
+            self.df[columns] += 1
+
+            if matrix.shape[1] < len(self.vocabulary):
+                matrix.resize((matrix.shape[0], len(self.vocabulary)))
+            matrix[row] = tfidf_rows([counts], self.vocabulary, self.idf)
+            self.rows[row] = self.row_entry(module_id, flow)
+
+        self.matrix = matrix.tocsr()
+        groups = np.asarray(self.groups)
+
+        # Similarity of every flow to each changed flow: one sparse product
+        column_scores = (self.matrix @ self.matrix[rows].T).tocsc()
+
+        recompute = set(rows)
+        for position, changed_row in enumerate(rows):
+            column = column_scores[:, position]
+            scores = dict(zip(column.indices.tolist(), column.data.tolist()))
+            for other, neighbours in self.neighbours.items():
+                if other in recompute or groups[other] != groups[changed_row]:
+                    continue
+                if any(target == changed_row for target, _ in neighbours):
+                    # Its score with the changed flow moved; rank it again
+                    recompute.add(other)
+                    continue
+                score = scores.get(other, 0.0)
+                if score >= self.threshold and (
+                    len(neighbours) < self.k or score > neighbours[-1][1]
+                ):
+                    neighbours.append((changed_row, score))
+                    neighbours.sort(key=lambda item: -item[1])
+                    del neighbours[self.k:]
+
+        self.neighbours.update(
+            top_k_neighbours(self.matrix, groups, self.k, self.threshold, rows=recompute)
+        )
+        return {row for row in self.neighbours if self.neighbours[row] != old_neighbours.get(row)}
+
+    def related_by_module(self):
+        related = {module_id: {} for module_id in MODULE_FILES}
+        for row, entry in enumerate(self.rows):
+            related[entry['module']][entry['ref']] = [
+                {
+                    'flow': self.rows[target]['ref'],
+                    'name': self.rows[target]['name'],
+                    'score': round(score, 4)
+                }
+                for target, score in self.neighbours[row]
+            ]
+        return related
+
+    def save(self):
+        os.makedirs(SERVER_GENERATED_PATH, exist_ok=True)
+        np.savez_compressed(
+            STATE_MATRIX_FILE,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            df=self.df,
+            idf=self.idf
+        )
+        terms = [None] * len(self.vocabulary)
+        for term, column in self.vocabulary.items():
+            terms[column] = term
+        write_json_atomic(STATE_FILE, {
+            'top_k': self.k,
+            'threshold': self.threshold,
+            'terms': terms,
+            'rows': self.rows,
+            'neighbours': [
+                [[target, round(score, 6)] for target, score in self.neighbours[row]]
+                for row in range(len(self.rows))
+            ]
+        }, indent=None)
+
+    @classmethod
+    def load(cls):
+        """Load the persisted index, or None if there is none"""
+        try:
+            with open(STATE_FILE, 'r') as f:
+                state = json.load(f)
+            arrays = np.load(STATE_MATRIX_FILE)
+        except (OSError, ValueError):
+            return None
+
+        index = cls(state['top_k'], state['threshold'])
+        index.vocabulary = {term: column for column, term in enumerate(state['terms'])}
+        index.df = arrays['df']
+        index.idf = arrays['idf']
+        index.matrix = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=tuple(arrays['shape'])
+        )
+        index.rows = state['rows']
+        index.neighbours = {
+            row: [(target, score) for target, score in neighbours]
+            for row, neighbours in enumerate(state['neighbours'])
+        }
+        return index
+
+
+def write_module_related_flows(related, modules=None):
+    """Replace related_flows in the module files with the computed lists"""
+    for module_id in modules or MODULE_FILES:
+        data, _, flows = load_module(module_id)
+        for flow in flows:
+            flow['related_flows'] = [n['flow'] for n in related[module_id].get(get_flow_ref(flow), [])]
+        save_module(module_id, data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute content-based related_flows')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help=f'neighbours kept per flow (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum cosine similarity (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='re-embed only flows whose content changed since the last build')
+    parser.add_argument('--write', action='store_true',
+                        help='update related_flows in the module JSON files')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = [(module_id, flow) for module_id, _, _, flow in iter_all_flows()]
+
+    index = RelatedFlowsIndex.load() if args.incremental else None
+    if index is not None and (
+        index.k != args.top_k
+        or index.threshold != args.threshold
+        or [(row['module'], row['ref']) for row in index.rows]
+        != [(module_id, get_flow_ref(flow)) for module_id, flow in records]
+    ):
+        print("Flows were added, removed or reordered (or settings changed); rebuilding")
+        index = None
+
+    if index is None:
+        index = RelatedFlowsIndex(args.top_k, args.threshold)
+        index.build(records)
+        affected_modules = set(MODULE_FILES)
+        print(f"✅ Built related flows for {index.matrix.shape[0]} flows over "
+              f"{index.matrix.shape[1]} terms in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        changed = {
+            row: record for row, record in enumerate(records)
+            if flow_hash(record[1]) != index.rows[row]['hash']
+        }
+        affected = index.update(changed)
+        affected_modules = {index.rows[row]['module'] for row in affected}
+        print(f"✅ Re-embedded {len(changed)} changed flows; {len(affected)} neighbour lists "
+              f"updated in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for row in sorted(affected):
+            print(f"   {index.rows[row]['module']}/{index.rows[row]['ref']}")
+
+    index.save()
+    related = index.related_by_module()
+    write_json_atomic(RELATED_FLOWS_FILE, {
+        'top_k': index.k,
+        'threshold': index.threshold,
+        'modules': related
+    })
+    print(f"Written to {RELATED_FLOWS_FILE}")
+
+    if args.write and affected_modules:
+        write_module_related_flows(related, sorted(affected_modules))
+        print(f"✅ Updated related_flows in {len(affected_modules)} module files")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Build the BM25 inverted index used by the API and MCP search.
+
+Flow names, categories, descriptions, prerequisites and steps are
+analysed with text_utils (lower-case, stop words removed, stemmed) and
+written to one file, data/generated/search_index.json:
+
+    analyzer                   stop words and suffixes, so query-side code
+                               (api/utils/searchIndex.js) analyses the same way
+    fields[f]                  boost and average length
+    docs[d]                    module, id, flow_name, category, description
+    norms[f][d]                k1 * (1 - b + b * len / avg_len), precomputed
+    terms[t]                   [idf, [[doc, field, tf, [positions]], ...]]
+    snippets[f][d]             [field text, [gap, length, gap, length, ...]]
+
+Scoring is per-field BM25 summed with the field boosts. Positions are
+token offsets within a field, used for quoted phrase queries. Snippets
+map each position back to its characters in the field text (the gap
+from the previous token's end, then the token length, in UTF-16 units
+as JavaScript indexes strings), so a hit's snippet and highlights are
+cut from the matched positions without re-tokenizing.
+
+    python3 build_search_index.py [--query "approval workflow"]
+"""
+
+import argparse
+import bisect
+import math
+import os
+import re
+import sys
+import time
+
+from flow_data import (
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    get_step_text,
+    iter_all_flows,
+    module_sources,
+    write_json_atomic,
+)
+from text_utils import (
+    STOP_WORDS,
+    SUFFIXES,
+    code_point_spans,
+    content_spans,
+    cut_snippet,
+    mark_highlights,
+    stemmed_tokens,
+    utf16_spans,
+)
+
+SEARCH_INDEX_FILE = os.path.join(SERVER_GENERATED_PATH, 'search_index.json')
+K1 = 1.2
+B = 0.75
+# Partial words expand to at most this many indexed terms
+MAX_PREFIX_EXPANSIONS = 20
+
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Field name -> boost; order defines the field codes in postings
+FIELD_BOOSTS = {
+    'name': 3.0,
+    'category': 2.0,
+    'description': 1.5,
+    'prerequisites': 1.0,
+    'steps': 1.0,
+}
+# Fields a snippet is cut from, in order of preference on ties; hits carry
+# their name and category whole
+SNIPPET_FIELDS = ('description', 'steps', 'prerequisites')
+
+
+def flow_fields(flow):
+    """Text of each indexed field"""
+    return {
+        'name': get_flow_name(flow),
+        'category': flow.get('category') or flow.get('flowCategory') or '',
+        'description': flow.get('description') or flow.get('flow_description') or '',
+        'prerequisites': '\n'.join(str(p) for p in flow.get('prerequisites') or []),
+        'steps': '\n'.join(get_step_text(step) for step in flow.get('steps') or []),
+    }
+
+
+def encode_spans(spans):
+    """Token spans as flat [gap from the previous end, length, ...]"""
+    flat = []
+    previous_end = 0
+    for start, end in spans:
+        flat.extend((start - previous_end, end - start))
+        previous_end = end
+    return flat
+
+
+def decode_spans(flat):
+    spans = []
+    end = 0
+    for i in range(0, len(flat), 2):
+        start = end + flat[i]
+        end = start + flat[i + 1]
+        spans.append((start, end))
+    return spans
+
+
+def build_search_index():
+    fields = list(FIELD_BOOSTS)
+    docs = []
+    lengths = {field: [] for field in fields}
+    postings = {}
+    snippets = {field: [] for field in fields}
+
+    for module_id, _, _, flow in iter_all_flows():
+        doc = len(docs)
+        text = flow_fields(flow)
+        docs.append({
+            'module': module_id,
+            'id': get_flow_ref(flow),
+            'flow_name': get_flow_name(flow),
+            'category': text['category'] or None,
+            'description': text['description']
+        })
+        for code, field in enumerate(fields):
+            tokens = stemmed_tokens(text[field])
+            lengths[field].append(len(tokens))
+            snippets[field].append([text[field], encode_spans(utf16_spans(text[field], content_spans(text[field])))])
+            positions = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            # Docs and fields are visited in order, so posting lists are sorted by doc
+            for token, token_positions in positions.items():
+                postings.setdefault(token, []).append([doc, code, len(token_positions), token_positions])
+
+    n = len(docs)
+    field_stats = {}
+    norms = {}
+    for field in fields:
+        avg_len = sum(lengths[field]) / n if n else 0.0
+        field_stats[field] = {'boost': FIELD_BOOSTS[field], 'avg_len': round(avg_len, 4)}
+        norms[field] = [
+            round(K1 * (1 - B + B * length / avg_len), 4) if avg_len else K1
+            for length in lengths[field]
+        ]
+
+    terms = {}
+    for term in sorted(postings):
+        df = len({entry[0] for entry in postings[term]})
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        terms[term] = [round(idf, 4), postings[term]]
+
+    return {
+        'version': 2,
+        'k1': K1,
+        'b': B,
+        'analyzer': {'stop_words': sorted(STOP_WORDS), 'suffixes': list(SUFFIXES)},
+        'sources': module_sources(),
+        'fields': field_stats,
+        'docs': docs,
+        'norms': norms,
+        'terms': terms,
+        'snippets': snippets
+    }
+
+
+def followed_by(starts, positions, offset):
+    """Phrase starts followed by a term offset positions later: a merge of
+    two sorted position lists"""
+    kept = []
+    i = j = 0
+    while i < len(starts) and j < len(positions):
+        start = positions[j] - offset
+        if starts[i] == start:
+            kept.append(start)
+            i += 1
+            j += 1
+        elif starts[i] < start:
+            i += 1
+        else:
+            j += 1
+    return kept
+
+
+class SearchIndex:
+    """In-memory search over a built index, mirroring api/utils/searchIndex.js:
+    partial words expand to the indexed terms they prefix and quoted parts
+    must match as phrases"""
+
+    def __init__(self, index):
+        self.index = index
+        self.fields = list(index['fields'])
+        self.terms = index['terms']
+        self.docs = index['docs']
+        self.sorted_terms = sorted(self.terms)
+
+    def expand(self, term):
+        """The term itself if indexed, else up to MAX_PREFIX_EXPANSIONS terms it prefixes"""
+        if term in self.terms:
+            return [term]
+        expansions = []
+        for indexed in self.sorted_terms[bisect.bisect_left(self.sorted_terms, term):]:
+            if not indexed.startswith(term) or len(expansions) >= MAX_PREFIX_EXPANSIONS:
+                break
+            expansions.append(indexed)
+        return expansions
+
+    def doc_postings(self, term, doc):
+        """doc's entries in a term's posting list, which is sorted by doc"""
+        postings = self.terms[term][1]
+        start, end = 0, len(postings)
+        while start < end:
+            mid = (start + end) // 2
+            if postings[mid][0] < doc:
+                start = mid + 1
+            else:
+                end = mid
+        while end < len(postings) and postings[end][0] == doc:
+            end += 1
+        return postings[start:end]
+
+    def matches_phrase(self, doc, phrase):
+        """Whether the phrase's terms occur at consecutive positions in one field of doc"""
+        if not phrase or not all(term in self.terms for term in phrase):
+            return False
+        entries = [self.doc_postings(term, doc) for term in phrase]
+        for _, code, _, positions in entries[0]:
+            starts = positions
+            for offset in range(1, len(phrase)):
+                following = next((entry[3] for entry in entries[offset] if entry[1] == code), [])
+                starts = followed_by(starts, following, offset)
+                if not starts:
+                    break
+            if starts:
+                return True
+        return False
+
+    def search(self, query, allowed=None):
+        """BM25-ranked hits, best first: docs entries plus doc, score,
+        matched_fields and matched_positions ({field: [positions]}).
+        allowed(doc) can restrict the docs, e.g. to a facet selection."""
+        phrases = [stemmed_tokens(phrase) for phrase in PHRASE_RE.findall(query)]
+        scores = {}
+        matched = {}
+        k1 = self.index['k1']
+        for query_term in dict.fromkeys(stemmed_tokens(PHRASE_RE.sub(r' \1 ', query))):
+            for term in self.expand(query_term):
+                idf, postings = self.terms[term]
+                for doc, code, tf, positions in postings:
+                    if allowed and not allowed(doc):
+                        continue
+                    field = self.fields[code]
+                    norm = self.index['norms'][field][doc]
+                    scores[doc] = scores.get(doc, 0.0) + idf * self.index['fields'][field]['boost'] * tf * (k1 + 1) / (tf + norm)
+                    matched.setdefault(doc, {}).setdefault(field, []).extend(positions)
+
+        hits = [
+            {
+                'doc': doc,
+                **self.docs[doc],
+                'score': round(score, 3),
+                'matched_fields': list(matched[doc]),
+                'matched_positions': matched[doc]
+            }
+            for doc, score in scores.items()
+            if not any(phrase and not self.matches_phrase(doc, phrase) for phrase in phrases)
+        ]
+        hits.sort(key=lambda hit: -hit['score'])
+        return hits
+
+    def field_spans(self, field, doc):
+        """(text, token spans in text) of an indexed field"""
+        text, flat = self.index['snippets'][field][doc]
+        return text, code_point_spans(text, decode_spans(flat))
+
+    def snippet(self, hit):
+        """(field, snippet, highlights) cut from the snippet field with the
+        most matched positions; highlights in UTF-16 units like the API"""
+        matched = hit['matched_positions']
+        field = max(SNIPPET_FIELDS, key=lambda f: (len(set(matched.get(f, ()))), -SNIPPET_FIELDS.index(f)))
+        text, spans = self.field_spans(field, hit['doc'])
+        snippet, highlights = cut_snippet(text, spans, matched.get(field, ()))
+        return field, snippet, utf16_spans(snippet, highlights)
+
+    def name_highlights(self, hit):
+        text, spans = self.field_spans('name', hit['doc'])
+        return utf16_spans(text, [spans[p] for p in sorted(set(hit['matched_positions'].get('name', ())))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the BM25 search index')
+    parser.add_argument('--output', default=SEARCH_INDEX_FILE, help='index path')
+    parser.add_argument('--query', help='run a test query against the new index')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_search_index()
+    elapsed = time.perf_counter() - start
+    write_json_atomic(args.output, index, indent=None)
+
+    size = os.path.getsize(args.output)
+    print(f"✅ Indexed {len(index['docs'])} flows, {len(index['terms'])} terms "
+          f"({size / 1024:.0f} KB, {elapsed * 1000:.0f} ms)")
+    if args.query:
+        search_index = SearchIndex(index)
+        for hit in search_index.search(args.query)[:10]:
+            field, text, highlights = search_index.snippet(hit)
+            print(f"   {hit['score']:6.2f}  {hit['module']}/{hit['id']}  {hit['flow_name']}")
+            print(f"           {field}: {mark_highlights(text, highlights)}")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tag every flow and step with topics using one Aho-Corasick automaton.
+
+All keywords of the topic dictionary are compiled into a single
+automaton, so each field is scanned once no matter how many topics
+there are. A keyword matches where a word starts: "track" tags
+"tracking", but "data" does not tag "metadata". That is the
+toLowerCase().includes() matching of the MCP server, with a word-start
+check added.
+
+The artifact (data/generated/topic_index.json) maps each topic to
+a posting list of flows, ordered by the number of keyword hits:
+
+    topics[topic].flows     [[flow key, hits, [fields]], ...]
+    flows[flow key]         module, flow_id, flow_name, description
+    steps[flow key]         {step index: [topics]}
+    sources                 module file sizes and mtimes at build time
+
+The MCP find_flows_by_topic tool reads it (api/utils/topicIndex.js) while
+no module file has changed since the build.
+
+    python3 build_topic_index.py [--topic alerts]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+from flow_data import (
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    get_step_text,
+    iter_all_flows,
+    module_sources,
+    write_json_atomic,
+)
+
+TOPIC_INDEX_FILE = os.path.join(SERVER_GENERATED_PATH, 'topic_index.json')
+
+# The MCP server's topic map, extended with the product areas the flows cover
+TOPIC_KEYWORDS = {
+    'alerts': ['alert', 'notification', 'warning', 'trigger'],
+    'dashboard': ['dashboard', 'panel', 'widget', 'visualization'],
+    'reporting': ['report', 'export', 'analysis', 'insight'],
+    'social media': ['facebook', 'twitter', 'instagram', 'linkedin', 'tiktok', 'youtube'],
+    'monitoring': ['monitor', 'track', 'watch', 'observe'],
+    'engagement': ['engage', 'respond', 'reply', 'interact'],
+    'analytics': ['analytics', 'metrics', 'measure', 'data'],
+    'influencer': ['influencer', 'influence', 'creator', 'ambassador'],
+    'payments': ['payment', 'invoice', 'budget', 'billing', 'spend'],
+    'integrations': ['integration', 'integrate', 'connect', 'api', 'webhook', 'sync'],
+    'publishing': ['publish', 'schedule', 'post', 'calendar', 'draft'],
+    'approvals': ['approval', 'approve', 'review workflow', 'approver'],
+    'audiences': ['audience', 'segment', 'profile', 'demographic'],
+    'sentiment': ['sentiment', 'positive', 'negative', 'emotion'],
+    'campaigns': ['campaign', 'ad set', 'advert', 'targeting'],
+    'collaboration': ['team', 'assign', 'share', 'permission', 'collaborat'],
+    'automation': ['automat', 'rule', 'smart label', 'auto-'],
+    'search': ['search', 'query', 'boolean', 'filter'],
+    'reviews': ['review', 'rating', 'star'],
+    'crisis': ['crisis', 'spike', 'escalat', 'urgent'],
+}
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher over lower-cased text"""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        # Breadth-first, so every fail target is complete before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self.goto[state].items():
+                queue.append(target)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[target] = self.goto[fallback].get(char, 0)
+                self.output[target] = self.output[target] + self.output[self.fail[target]]
+
+    def iter_matches(self, text):
+        """Yield (start, pattern index) for every occurrence in text"""
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for index in self.output[state]:
+                yield end - len(self.patterns[index]) + 1, index
+
+
+class TopicTagger:
+    def __init__(self, topic_keywords=TOPIC_KEYWORDS):
+        self.topic_keywords = topic_keywords
+        keywords = sorted({keyword for words in topic_keywords.values() for keyword in words})
+        self.automaton = AhoCorasick(keywords)
+        self.keyword_topics = [
+            [topic for topic, words in topic_keywords.items() if keyword in words]
+            for keyword in keywords
+        ]
+
+    def tag(self, text):
+        """Counter-like {topic: hits} for one piece of text"""
+        text = text.lower()
+        hits = {}
+        for start, index in self.automaton.iter_matches(text):
+            if start and text[start - 1].isalnum():
+                continue
+            for topic in self.keyword_topics[index]:
+                hits[topic] = hits.get(topic, 0) + 1
+        return hits
+
+
+def build_topic_index(topic_keywords=TOPIC_KEYWORDS):
+    tagger = TopicTagger(topic_keywords)
+    postings = {topic: [] for topic in topic_keywords}
+    flows = {}
+    steps = {}
+
+    for module_id, _, _, flow in iter_all_flows():
+        flow_ref = get_flow_ref(flow)
+        key = f'{module_id}/{flow_ref}'
+        description = flow.get('description') or flow.get('flow_description') or ''
+        flows[key] = {
+            'module': module_id,
+            'flow_id': flow_ref,
+            'flow_name': get_flow_name(flow),
+            'description': description
+        }
+
+        hits = {}
+        fields = {}
+        for field, text in (('name', get_flow_name(flow)), ('description', description)):
+            for topic, count in tagger.tag(text).items():
+                hits[topic] = hits.get(topic, 0) + count
+                fields.setdefault(topic, []).append(field)
+
+        step_topics = {}
+        for s, step in enumerate(flow.get('steps') or []):
+            tagged = tagger.tag(get_step_text(step))
+            if tagged:
+                step_topics[s] = sorted(tagged)
+            for topic, count in tagged.items():
+                hits[topic] = hits.get(topic, 0) + count
+                if 'steps' not in fields.setdefault(topic, []):
+                    fields[topic].append('steps')
+        steps[key] = step_topics
+
+        for topic, count in hits.items():
+            postings[topic].append([key, count, fields[topic]])
+
+    for posting in postings.values():
+        posting.sort(key=lambda entry: -entry[1])
+
+    return {
+        'topics': {
+            topic: {'keywords': topic_keywords[topic], 'flows': postings[topic]}
+            for topic in topic_keywords
+        },
+        'flows': flows,
+        'steps': steps,
+        'sources': module_sources()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the topic -> flows index')
+    parser.add_argument('--output', default=TOPIC_INDEX_FILE, help='artifact path')
+    parser.add_argument('--topic', help='print the flows tagged with one topic')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_topic_index()
+    elapsed = time.perf_counter() - start
+
+    write_json_atomic(args.output, index, indent=None)
+
+    print(f"✅ Tagged {len(index['flows'])} flows with {len(index['topics'])} topics "
+          f"({elapsed * 1000:.1f} ms)")
+    for topic, entry in index['topics'].items():
+        print(f"   {topic}: {len(entry['flows'])} flows")
+    if args.topic:
+        print(f"\n📁 {args.topic}")
+        for key, hits, fields in index['topics'].get(args.topic, {}).get('flows', []):
+            print(f"   {key} ({hits} hits in {', '.join(fields)})")
+    print(f"Written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Compile cross-module workflow specs into the workflow JSON and Markdown.
+
+Each spec in workflow_specs/<workflow_id>.json describes a workflow once:
+its top-level fields, the Markdown before and after the steps, and per
+step the module, the referenced flow (by id or name), inputs, outputs,
+heading and Markdown body. The compiler resolves every referenced flow
+through a per-module lookup of ids and normalised names, then writes
+
+    public/data/<output>.json    workflow_steps with canonical flow ids
+    public/docs/<output>.md      the guide, with a link to each step's flow
+
+A workflow is only rebuilt when its spec, or a flow it references, or
+the flow list of a module it uses has changed since the last run
+(data/generated/workflow_compiler_state.json).
+
+    python3 compile_workflows.py              # rebuild changed workflows
+    python3 compile_workflows.py --force      # rebuild everything
+    python3 compile_workflows.py --import     # create specs from the current JSON + Markdown
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+from urllib.parse import quote
+
+from flow_data import (
+    BASE_PATH,
+    DATA_PATH,
+    MODULE_FILES,
+    SERVER_GENERATED_PATH,
+    get_flow_name,
+    get_flow_ref,
+    load_module,
+    write_json_atomic,
+)
+
+SPECS_PATH = os.path.join(BASE_PATH, 'workflow_specs')
+DOCS_PATH = os.path.join(BASE_PATH, 'public', 'docs')
+STATE_FILE = os.path.join(SERVER_GENERATED_PATH, 'workflow_compiler_state.json')
+# Bump when the output format changes so every workflow is rebuilt
+COMPILER_VERSION = 1
+FUZZY_CUTOFF = 0.85
+
+# Top-level fields copied from the spec into the workflow JSON, in order
+WORKFLOW_FIELDS = (
+    'workflow_id', 'workflow_name', 'description', 'modules_involved', 'business_value',
+    'workflow_steps', 'workflow_triggers', 'success_metrics', 'best_practices'
+)
+
+STEP_HEADING_RE = re.compile(r'^### 📦 Step (\d+): (.*)$', re.MULTILINE)
+FLOW_LINK_RE = re.compile(r'\A\*\*Flow\*\*: .*\n\n?')
+
+
+def normalize_name(name):
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def digest(value):
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class FlowLookup:
+    """Per-module id and normalised-name lookup of flows"""
+
+    def __init__(self):
+        self.flows = {}
+        self.keys = {}
+        self.names = {}
+
+    def module(self, module_id):
+        if module_id not in self.flows:
+            _, _, flows = load_module(module_id)
+            keys = {}
+            names = {}
+            for flow in flows:
+                for key in (flow.get('flow_id'), flow.get('id'), get_flow_ref(flow)):
+                    if key:
+                        keys.setdefault(key, flow)
+                names.setdefault(normalize_name(get_flow_name(flow)), flow)
+            self.flows[module_id] = flows
+            self.keys[module_id] = keys
+            self.names[module_id] = names
+        return self.flows[module_id]
+
+    def module_digest(self, module_id):
+        """Changes when flows are added, removed or renamed in a module"""
+        return digest([[get_flow_ref(flow), get_flow_name(flow)] for flow in self.module(module_id)])
+
+    def resolve(self, module_id, reference):
+        """Return (flow, exact) for a flow id or name, or (None, False)"""
+        self.module(module_id)
+        flow = self.keys[module_id].get(reference) or self.names[module_id].get(normalize_name(reference))
+        if flow is not None:
+            return flow, True
+        close = difflib.get_close_matches(normalize_name(reference), self.names[module_id], n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return self.names[module_id][close[0]], False
+        return None, False
+
+
+def flow_reference(flow):
+    return {
+        'flow_name': get_flow_name(flow),
+        'flow_id': get_flow_ref(flow),
+        'description': flow.get('description') or flow.get('flow_description') or ''
+    }
+
+
+def compile_workflow(spec, lookup):
+    """Return (workflow JSON, Markdown, dependencies, messages) for one spec"""
+    output = spec['output']
+    document = f'docs/{output}.md'
+    messages = []
+    dependencies = {'modules': {}, 'flows': {}}
+
+    steps = []
+    markdown_steps = []
+    for number, step in enumerate(spec['steps'], start=1):
+        module_id = step['module']
+        if module_id not in MODULE_FILES:
+            raise ValueError(f"step {number}: unknown module '{module_id}'")
+        dependencies['modules'][module_id] = lookup.module_digest(module_id)
+
+        reference = None
+        if step.get('flow'):
+            flow, exact = lookup.resolve(module_id, step['flow'])
+            if flow is None:
+                raise ValueError(f"step {number}: no flow '{step['flow']}' in {module_id}")
+            if not exact:
+                messages.append(f"⚠️  step {number}: '{step['flow']}' matched '{get_flow_name(flow)}' by similarity")
+            reference = flow_reference(flow)
+            if step.get('flow_description'):
+                reference['description'] = step['flow_description']
+            dependencies['flows'][f"{module_id}/{reference['flow_id']}"] = digest(flow_reference(flow))
+
+        compiled = {
+            'step_id': number,
+            'module': module_id,
+            'module_flow_reference': reference,
+            'step_description': step['description']
+        }
+        for key in ('inputs', 'outputs'):
+            if key in step:
+                compiled[key] = step[key]
+        compiled['source_documents'] = [document]
+        steps.append(compiled)
+
+        heading = f"### 📦 Step {number}: {step['heading']}\n"
+        if reference:
+            link = f"#/{module_id}/{quote(reference['flow_id'], safe='')}"
+            heading += f"**Flow**: [{reference['flow_name']}]({link})\n\n"
+        markdown_steps.append(heading + step.get('markdown', ''))
+
+    modules_involved = []
+    for step in steps:
+        if step['module'] not in modules_involved:
+            modules_involved.append(step['module'])
+
+    fields = dict(spec.get('fields', {}))
+    fields.update({
+        'workflow_id': spec['workflow_id'],
+        'workflow_name': spec['workflow_name'],
+        'modules_involved': modules_involved,
+        'workflow_steps': steps
+    })
+    workflow = {key: fields[key] for key in WORKFLOW_FIELDS if key in fields}
+    workflow.update({key: value for key, value in fields.items() if key not in workflow})
+
+    markdown = spec['markdown']['intro'] + ''.join(markdown_steps) + spec['markdown']['outro']
+    return workflow, markdown, dependencies, messages
+
+
+def load_specs():
+    specs = {}
+    if os.path.isdir(SPECS_PATH):
+        for name in sorted(os.listdir(SPECS_PATH)):
+            if name.endswith('.json'):
+                with open(os.path.join(SPECS_PATH, name), 'r') as f:
+                    spec = json.load(f)
+                specs[spec['workflow_id']] = spec
+    return specs
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r') as f:
+            state = json.load(f)
+        if state.get('version') == COMPILER_VERSION:
+            return state['workflows']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def is_stale(workflow_id, spec, previous, lookup):
+    """Whether a workflow's spec or anything it references has changed"""
+    if previous is None or previous['spec'] != digest(spec):
+        return True
+    for module_id, module_digest in previous['modules'].items():
+        if module_id not in MODULE_FILES or lookup.module_digest(module_id) != module_digest:
+            return True
+    for key, flow_digest in previous['flows'].items():
+        module_id, flow_ref = key.split('/', 1)
+        flow, _ = lookup.resolve(module_id, flow_ref)
+        if flow is None or digest(flow_reference(flow)) != flow_digest:
+            return True
+    for suffix, path in (('.json', DATA_PATH), ('.md', DOCS_PATH)):
+        if not os.path.exists(os.path.join(path, spec['output'] + suffix)):
+            return True
+    return False
+
+
+def compile_all(force=False):
+    """Rebuild stale workflows; returns (rebuilt ids, errors)"""
+    lookup = FlowLookup()
+    previous = load_state()
+    state = {}
+    rebuilt = []
+    errors = []
+
+    for workflow_id, spec in load_specs().items():
+        if not force and not is_stale(workflow_id, spec, previous.get(workflow_id), lookup):
+            state[workflow_id] = previous[workflow_id]
+            print(f"   {workflow_id}: up to date")
+            continue
+        try:
+            workflow, markdown, dependencies, messages = compile_workflow(spec, lookup)
+        except ValueError as e:
+            errors.append(f"{workflow_id}: {e}")
+            print(f"❌ {workflow_id}: {e}")
+            continue
+
+        write_json_atomic(os.path.join(DATA_PATH, spec['output'] + '.json'), workflow)
+        with open(os.path.join(DOCS_PATH, spec['output'] + '.md'), 'w') as f:
+            f.write(markdown)
+        state[workflow_id] = {'spec': digest(spec), **dependencies}
+        rebuilt.append(workflow_id)
+
+        print(f"✅ {workflow_id}: {len(workflow['workflow_steps'])} steps -> {spec['output']}.json/.md")
+        for message in messages:
+            print(f"   {message}")
+
+    write_json_atomic(STATE_FILE, {'version': COMPILER_VERSION, 'workflows': state})
+    return rebuilt, errors
+
+
+def import_spec(output):
+    """Build a spec from an existing workflow JSON and its Markdown guide"""
+    with open(os.path.join(DATA_PATH, output + '.json'), 'r') as f:
+        workflow = json.load(f)
+    with open(os.path.join(DOCS_PATH, output + '.md'), 'r') as f:
+        markdown = f.read()
+
+    headings = list(STEP_HEADING_RE.finditer(markdown))
+    if len(headings) != len(workflow['workflow_steps']):
+        raise ValueError(f"{output}: {len(headings)} step headings for {len(workflow['workflow_steps'])} steps")
+
+    # The steps end where the next top-level section starts
+    last_body_start = headings[-1].end() + 1
+    outro_match = re.compile(r'^## ', re.MULTILINE).search(markdown, last_body_start)
+    outro_start = outro_match.start() if outro_match else len(markdown)
+
+    steps = []
+    for i, (step, heading) in enumerate(zip(workflow['workflow_steps'], headings)):
+        body_end = headings[i + 1].start() if i + 1 < len(headings) else outro_start
+        spec_step = {
+            'module': step['module'],
+            'flow': None,
+            'description': step['step_description'],
+            'heading': heading.group(2),
+            # Drop the flow link a previous compile added
+            'markdown': FLOW_LINK_RE.sub('', markdown[heading.end() + 1:body_end], count=1)
+        }
+        reference = step.get('module_flow_reference')
+        if reference:
+            spec_step['flow'] = reference.get('flow_id') or reference.get('flow_name')
+            spec_step['flow_description'] = reference.get('description')
+        for key in ('inputs', 'outputs'):
+            if key in step:
+                spec_step[key] = step[key]
+        steps.append(spec_step)
+
+    return {
+        'workflow_id': workflow['workflow_id'],
+        'workflow_name': workflow['workflow_name'],
+        'output': output,
+        'fields': {
+            key: value for key, value in workflow.items()
+            if key not in ('workflow_id', 'workflow_name', 'modules_involved', 'workflow_steps')
+        },
+        'markdown': {
+            'intro': markdown[:headings[0].start()],
+            'outro': markdown[outro_start:]
+        },
+        'steps': steps
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile cross-module workflow specs')
+    parser.add_argument('--force', action='store_true', help='rebuild every workflow')
+    parser.add_argument('--import', dest='import_specs', action='store_true',
+                        help='create specs from the existing cross_module_*.json and Markdown files')
+    args = parser.parse_args()
+
+    if args.import_specs:
+        os.makedirs(SPECS_PATH, exist_ok=True)
+        for name in sorted(os.listdir(DOCS_PATH)):
+            output = name[:-len('.md')]
+            if name.startswith('cross_module_') and name.endswith('.md'):
+                spec = import_spec(output)
+                spec_file = os.path.join(SPECS_PATH, f"{spec['workflow_id']}.json")
+                with open(spec_file, 'w') as f:
+                    json.dump(spec, f, indent=2, ensure_ascii=False)
+                    f.write('\n')
+                print(f"📁 {output} -> {os.path.relpath(spec_file, BASE_PATH)}")
+        return 0
+
+    rebuilt, errors = compile_all(args.force)
+    print(f"\nRebuilt {len(rebuilt)} workflows")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
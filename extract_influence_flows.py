@@ -2,21 +2,13 @@
 import json
 import os
 from pathlib import Path
-import PyPDF2
 import re
 
+from pdf_text import extract_pages_from_pdf
+
 def extract_text_from_pdf(pdf_path):
     """Extract text from a PDF file"""
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-    except Exception as e:
-        print(f"Error reading {pdf_path}: {e}")
-        return ""
+    return "".join(page + "\n" for page in extract_pages_from_pdf(pdf_path))
 
 def extract_flows_from_influence_pdfs():
     """Extract documented flows from Influence PDFs"""
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate flows and steps across every module with MinHash + LSH.
+
+Each flow and each distinct step text is shingled (stemmed word pairs)
+and reduced to a 128-value MinHash signature, computed for all
+documents at once with NumPy. Signatures are split into bands; documents
+sharing any band bucket become candidates, and only candidates have
+their exact Jaccard similarity checked, so the corpus is never compared
+pairwise. Matches are merged into clusters with union-find.
+
+    python3 find_near_duplicates.py                   # with-citations files
+    python3 find_near_duplicates.py --include-plain   # also *_user_flows.json
+    python3 find_near_duplicates.py --collapse        # also write shared step references
+
+--collapse writes data/generated/shared_steps.json, where the
+text of every distinct step is stored once, keyed by a hash of its
+normalised text, and each flow ("<file>#<flow ref>") lists references
+to its steps. A reference holds the step id in "ref" plus the fields
+that belong to that use of the step (its number, citations, decision
+points); merging them over steps[ref] rebuilds a structured step. The
+same words in other fields or in another case are stored as variants
+"<id>-1", "<id>-2", ... The module files themselves are not changed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from flow_data import (
+    DATA_PATH,
+    MODULE_FILES,
+    SERVER_GENERATED_PATH,
+    find_flows,
+    get_flow_name,
+    get_flow_ref,
+    get_flow_text,
+    get_step_text,
+    write_json_atomic,
+)
+from text_utils import shingles, stemmed_tokens
+
+REPORT_FILE = os.path.join(SERVER_GENERATED_PATH, 'near_duplicates.json')
+SHARED_STEPS_FILE = os.path.join(SERVER_GENERATED_PATH, 'shared_steps.json')
+NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.7
+# Smallest prime above 2**32, so (a * x + b) % PRIME fits in uint64
+PRIME = np.uint64(4294967311)
+CHUNK_SHINGLES = 1 << 16
+
+
+def shingle_hashes(text):
+    """32-bit hashes of a text's stemmed word-pair shingles"""
+    return np.array(
+        sorted({zlib.crc32(' '.join(s).encode('utf-8')) for s in shingles(stemmed_tokens(text), k=2)}),
+        dtype=np.uint64
+    )
+
+
+def minhash_signatures(hash_sets, num_perm=NUM_PERM, seed=1):
+    """(n_documents, num_perm) MinHash signatures for lists of shingle hashes"""
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+
+    signatures = np.full((len(hash_sets), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    lengths = np.array([len(h) for h in hash_sets])
+    owners = np.repeat(np.arange(len(hash_sets)), lengths)
+    values = np.concatenate(hash_sets) if len(hash_sets) else np.zeros(0, dtype=np.uint64)
+
+    for start in range(0, len(values), CHUNK_SHINGLES):
+        chunk = values[start:start + CHUNK_SHINGLES]
+        chunk_owners = owners[start:start + CHUNK_SHINGLES]
+        permuted = (a * chunk + b) % PRIME
+        # Shingles are grouped by document, so reduce over each document's run
+        boundaries = np.flatnonzero(np.r_[True, chunk_owners[1:] != chunk_owners[:-1]])
+        minima = np.minimum.reduceat(permuted, boundaries, axis=1)
+        documents = chunk_owners[boundaries]
+        signatures[documents] = np.minimum(signatures[documents], minima.T)
+
+    return signatures
+
+
+def choose_bands(num_perm, threshold):
+    """Bands x rows whose LSH threshold (1/b)^(1/r) is closest to threshold"""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda option: abs((1.0 / option[0]) ** (1.0 / option[1]) - threshold))
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        x, y = self.find(x), self.find(y)
+        if x != y:
+            self.parent[max(x, y)] = min(x, y)
+
+
+def jaccard(x, y):
+    if not len(x) and not len(y):
+        return 1.0
+    return len(np.intersect1d(x, y, assume_unique=True)) / len(np.union1d(x, y))
+
+
+def near_duplicate_clusters(texts, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+    """Clusters of indices into texts with Jaccard similarity >= threshold.
+
+    Returns [(member indices, lowest verified similarity)] for clusters of
+    two or more texts.
+    """
+    hash_sets = [shingle_hashes(text) for text in texts]
+    signatures = minhash_signatures(hash_sets, num_perm)
+    bands, rows = choose_bands(num_perm, threshold)
+
+    union_find = UnionFind(len(texts))
+    similarity = {}
+    for band in range(bands):
+        buckets = {}
+        for i, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            if len(hash_sets[i]):
+                buckets.setdefault(key.tobytes(), []).append(i)
+        for members in buckets.values():
+            # Checking against the bucket's first member keeps big buckets linear
+            head = members[0]
+            for other in members[1:]:
+                if union_find.find(head) == union_find.find(other):
+                    continue
+                score = jaccard(hash_sets[head], hash_sets[other])
+                if score >= threshold:
+                    union_find.union(head, other)
+                    root = union_find.find(head)
+                    similarity[root] = min(similarity.get(root, 1.0), score)
+
+    groups = {}
+    for i in range(len(texts)):
+        groups.setdefault(union_find.find(i), []).append(i)
+    clusters = []
+    for root, members in groups.items():
+        if len(members) > 1:
+            scores = [score for r, score in similarity.items() if union_find.find(r) == root]
+            clusters.append((members, min(scores, default=1.0)))
+    return sorted(clusters, key=lambda cluster: -len(cluster[0]))
+
+
+def load_corpus(include_plain=False):
+    """(file name, flows pointer, flows, module id) for every flow file"""
+    files = [(name, module_id) for module_id, name in MODULE_FILES.items()]
+    if include_plain:
+        files += [(name.replace('_with_citations', ''), module_id) for name, module_id in list(files)]
+
+    corpus = []
+    for name, module_id in files:
+        path = os.path.join(DATA_PATH, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            pointer, flows = find_flows(json.load(f))
+        corpus.append((name, pointer, flows, module_id))
+    return corpus
+
+
+# Step fields holding its text (see flow_data.get_step_text); everything
+# else, such as its position and citations, belongs to where it is used
+STEP_TEXT_FIELDS = ('action', 'description', 'details', 'user_input')
+
+
+def step_key(step):
+    """Hash of a step's normalised text, identifying an exact step duplicate"""
+    text = ' '.join(get_step_text(step).lower().split())
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def split_step(step):
+    """(shared text, reference fields) of a step; strings are all text"""
+    if not isinstance(step, dict):
+        return step, {}
+    shared = {k: v for k, v in step.items() if k in STEP_TEXT_FIELDS}
+    return shared, {k: v for k, v in step.items() if k not in STEP_TEXT_FIELDS}
+
+
+def find_near_duplicates(include_plain=False, threshold=DEFAULT_THRESHOLD):
+    corpus = load_corpus(include_plain)
+
+    flows = []
+    steps = {}
+    for name, pointer, module_flows, module_id in corpus:
+        for i, flow in enumerate(module_flows):
+            flows.append({
+                'file': name,
+                'module': module_id,
+                'flow': get_flow_ref(flow),
+                'name': get_flow_name(flow),
+                'text': get_flow_text(flow)
+            })
+            for s, step in enumerate(flow.get('steps') or []):
+                # Identical texts are grouped up front; MinHash runs on distinct texts only
+                steps.setdefault(get_step_text(step), []).append(f'{name}#{pointer}/{i}/steps/{s}')
+
+    flow_clusters = near_duplicate_clusters([flow['text'] for flow in flows], threshold)
+    step_texts = [text for text in steps if text]
+    step_clusters = near_duplicate_clusters(step_texts, threshold)
+    clustered = {i for members, _ in step_clusters for i in members}
+
+    return {
+        'threshold': threshold,
+        'files': [name for name, _, _, _ in corpus],
+        'flow_clusters': [
+            {
+                'similarity': round(score, 3),
+                'flows': [{k: flows[i][k] for k in ('file', 'module', 'flow', 'name')} for i in members]
+            }
+            for members, score in flow_clusters
+        ],
+        'step_clusters': [
+            {
+                'similarity': round(score, 3),
+                'variants': [{'text': step_texts[i], 'locations': steps[step_texts[i]]} for i in members]
+            }
+            for members, score in step_clusters
+        ] + [
+            # Exact repeats with no near variant
+            {'similarity': 1.0, 'variants': [{'text': text, 'locations': steps[text]}]}
+            for i, text in enumerate(step_texts)
+            if len(steps[text]) > 1 and i not in clustered
+        ]
+    }
+
+
+def collapse_steps(include_plain=False):
+    """Store each distinct step text once and reference it from the flows"""
+    shared = {}
+    references = {}
+    total = 0
+    for name, _, flows, _ in load_corpus(include_plain):
+        for flow in flows:
+            refs = []
+            for step in flow.get('steps') or []:
+                text, fields = split_step(step)
+                key = base_key = step_key(step)
+                # Same words in other fields or another case get their own variant
+                variant = 0
+                while shared.setdefault(key, text) != text:
+                    variant += 1
+                    key = f'{base_key}-{variant}'
+                refs.append({'ref': key, **fields})
+            total += len(refs)
+            references[f'{name}#{get_flow_ref(flow)}'] = refs
+    return {'steps': shared, 'flows': references}, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate flows and steps')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum Jaccard similarity (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--include-plain', action='store_true',
+                        help='also scan the *_user_flows.json files without citations')
+    parser.add_argument('--collapse', action='store_true',
+                        help=f'write exact step duplicates as shared references to {SHARED_STEPS_FILE}')
+    parser.add_argument('--json', metavar='PATH', default=REPORT_FILE, help='where to write the report')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = find_near_duplicates(args.include_plain, args.threshold)
+    elapsed = time.perf_counter() - start
+    write_json_atomic(args.json, report)
+
+    print("=" * 80)
+    print("NEAR-DUPLICATE FLOWS AND STEPS")
+    print("=" * 80)
+    print(f"\n📁 Flow clusters: {len(report['flow_clusters'])}")
+    for cluster in report['flow_clusters'][:10]:
+        names = ', '.join(f"{f['module']}/{f['flow']}" for f in cluster['flows'])
+        print(f"   ({cluster['similarity']:.2f}) {names}")
+    print(f"\n📁 Step clusters: {len(report['step_clusters'])}")
+    for cluster in report['step_clusters'][:10]:
+        locations = sum(len(v['locations']) for v in cluster['variants'])
+        print(f"   ({cluster['similarity']:.2f}) {locations}x {cluster['variants'][0]['text'][:70]}")
+
+    print(f"\n✅ Done in {elapsed * 1000:.0f} ms")
+    print(f"Report written to {args.json}")
+
+    if args.collapse:
+        shared, total = collapse_steps(args.include_plain)
+        write_json_atomic(SHARED_STEPS_FILE, shared)
+        print(f"✅ {total} steps collapsed to {len(shared['steps'])} shared steps in {SHARED_STEPS_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,12 @@
 #!/usr/bin/env python3
 import json
 import os
-import re
+
+from flow_data import MODULE_FILES, module_file_path
+from pdf_paths import resolve_pdf_path
 
 def fix_all_module_pdf_paths():
-    """Fix PDF paths in all module JSON files by removing module prefix"""
-
-    base_path = '/Users/ashutoshbijoor/Documents/Accion Labs/Projects/Cision/Nexus/Brandwatch/brandwatch-docs-viewer'
-
-    # All module JSON files
-    modules = [
-        'advertise',
-        'audience',
-        'benchmark',
-        'consumer_research',
-        'engage',
-        'influence',
-        'listen',
-        'measure',
-        'publish',
-        'vizia'
-    ]
+    """Fix PDF paths in all module JSON files by normalising them to <Module>/<path>"""
 
     total_fixes = 0
 
@@ -28,8 +14,8 @@ def fix_all_module_pdf_paths():
     print("FIXING PDF PATHS IN ALL MODULES")
     print("=" * 80)
 
-    for module_name in modules:
-        json_file = os.path.join(base_path, 'public', 'data', f'{module_name}_user_flows_with_citations.json')
+    for module_name in MODULE_FILES:
+        json_file = module_file_path(module_name)
 
         if not os.path.exists(json_file):
             print(f"\n❌ Skipping {module_name} - JSON file not found")
@@ -105,55 +91,8 @@ def process_flows(flows, module_name, module_fixes):
     pass
 
 def fix_pdf_path(pdf_path, module_name):
-    """Fix a PDF path by removing module prefix if present"""
-    # Remove any "Source: " prefix first
-    clean_path = pdf_path.replace('Source: ', '') if pdf_path.startswith('Source: ') else pdf_path
-
-    # Module name variations to remove
-    module_prefixes = [
-        f"{module_name.replace('_', ' ').title()}/",
-        f"{module_name.title()}/",
-        "Advertise/",
-        "Audience/",
-        "Benchmark/",
-        "Brandwatch Reviews/",
-        "Consumer Research/",
-        "Engage/",
-        "Influence/",
-        "Listen/",
-        "Measure/",
-        "Publish/",
-        "VIZIA/",
-        "Vizia/"
-    ]
-
-    # Remove module prefix if present at the start
-    for prefix in module_prefixes:
-        if clean_path.startswith(prefix):
-            # Only remove if this is the module's own prefix
-            module_dir = get_module_dir_name(module_name)
-            if prefix.rstrip('/') == module_dir:
-                clean_path = clean_path[len(prefix):]
-                break
-
-    return clean_path
-
-def get_module_dir_name(module_name):
-    """Get the actual directory name for a module"""
-    dir_mapping = {
-        'advertise': 'Advertise',
-        'audience': 'Audience',
-        'benchmark': 'Benchmark',
-        'brandwatch_reviews': 'Brandwatch Reviews',
-        'consumer_research': 'Consumer Research',
-        'engage': 'Engage',
-        'influence': 'Influence',
-        'listen': 'Listen',
-        'measure': 'Measure',
-        'publish': 'Publish',
-        'vizia': 'VIZIA'
-    }
-    return dir_mapping.get(module_name, module_name)
+    """Fix a PDF path by normalising it to the canonical <Module>/<path> form"""
+    return resolve_pdf_path(pdf_path, module_name)
 
 if __name__ == "__main__":
     fix_all_module_pdf_paths()
\ No newline at end of file
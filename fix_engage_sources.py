@@ -2,10 +2,13 @@
 import json
 import re
 
+from flow_data import module_file_path
+from pdf_paths import resolve_pdf_path
+
 def fix_engage_source_documents():
-    """Remove 'Source: ' prefix from PDF references in Engage flows"""
+    """Normalise PDF references in Engage flows (e.g. remove 'Source: ' prefix)"""
 
-    file_path = '/Users/ashutoshbijoor/Documents/Accion Labs/Projects/Cision/Nexus/Brandwatch/brandwatch-docs-viewer/public/data/engage_user_flows_with_citations.json'
+    file_path = module_file_path('engage')
 
     with open(file_path, 'r') as f:
         data = json.load(f)
@@ -28,9 +31,9 @@ def fix_engage_source_documents():
         if 'source_documents' in flow:
             new_docs = []
             for doc in flow['source_documents']:
-                # Remove "Source: " prefix if present
-                if doc.startswith('Source: '):
-                    clean_doc = doc.replace('Source: ', '')
+                # Remove "Source: " prefix and other non-canonical forms
+                clean_doc = resolve_pdf_path(doc, 'engage')
+                if clean_doc != doc:
                     new_docs.append(clean_doc)
                     changes_made += 1
                     print(f"Fixed: {doc} -> {clean_doc}")
@@ -44,8 +47,8 @@ def fix_engage_source_documents():
                 if isinstance(step, dict) and 'source_documents' in step:
                     new_docs = []
                     for doc in step['source_documents']:
-                        if doc.startswith('Source: '):
-                            clean_doc = doc.replace('Source: ', '')
+                        clean_doc = resolve_pdf_path(doc, 'engage')
+                        if clean_doc != doc:
                             new_docs.append(clean_doc)
                             changes_made += 1
                             print(f"Fixed in step: {doc} -> {clean_doc}")
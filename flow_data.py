@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for loading Brandwatch module flow data.
+Mirrors the module mapping and flow extraction rules in api/utils/fileUtils.js.
+"""
+
+import json
+import os
+import re
+
+# Repository paths
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(BASE_PATH, 'public', 'data')
+PDFS_PATH = os.path.join(BASE_PATH, 'public', 'pdfs')
+# Generated files the viewer fetches; `npm run build` copies them into docs/
+GENERATED_PATH = os.path.join(DATA_PATH, 'generated')
+# Generated files only the scripts, API and MCP server read, kept out of public/
+SERVER_GENERATED_PATH = os.path.join(BASE_PATH, 'data', 'generated')
+
+# Module mapping (same ids as the API and MCP server)
+MODULE_FILES = {
+    'advertise': 'advertise_user_flows_with_citations.json',
+    'audience': 'audience_user_flows_with_citations.json',
+    'benchmark': 'benchmark_user_flows_with_citations.json',
+    'consumer_research': 'consumer_research_user_flows_with_citations.json',
+    'engage': 'engage_user_flows_with_citations.json',
+    'influence': 'influence_user_flows_with_citations.json',
+    'listen': 'listen_user_flows_with_citations.json',
+    'measure': 'measure_user_flows_with_citations.json',
+    'publish': 'publish_user_flows_with_citations.json',
+    'reviews': 'reviews_user_flows_with_citations.json',
+    'vizia': 'vizia_user_flows_with_citations.json'
+}
+
+CROSS_MODULE_FILES = [
+    'cross_module_crisis_management.json',
+    'cross_module_content_strategy.json',
+    'cross_module_influencer_campaign.json'
+]
+
+# PDF directory for each module under public/pdfs
+MODULE_DIRS = {
+    'advertise': 'Advertise',
+    'audience': 'Audience',
+    'benchmark': 'Benchmark',
+    'consumer_research': 'Consumer Research',
+    'engage': 'Engage',
+    'influence': 'Influence',
+    'listen': 'Listen',
+    'measure': 'Measure',
+    'publish': 'Publish',
+    'reviews': 'Brandwatch Reviews',
+    'vizia': 'VIZIA'
+}
+
+
+def module_file_path(module_id):
+    """Absolute path of a module's flow JSON file"""
+    return os.path.join(DATA_PATH, MODULE_FILES[module_id])
+
+
+def module_sources():
+    """Size and mtime (ms) of every module file, so readers of a generated
+    index can tell when a module was edited after it was built"""
+    sources = {}
+    for module_id in MODULE_FILES:
+        stat = os.stat(module_file_path(module_id))
+        sources[module_id] = {'size': stat.st_size, 'mtime_ms': stat.st_mtime_ns // 1_000_000}
+    return sources
+
+
+def module_for_file(path):
+    """Return the module id whose JSON file is at path, or None"""
+    name = os.path.basename(path)
+    for module_id, file_name in MODULE_FILES.items():
+        if file_name == name:
+            return module_id
+    return None
+
+
+def find_flows(data):
+    """Locate the flows list in a module document.
+
+    Returns (json_pointer, flows) so callers can report locations inside
+    the original file. Handles the same structure variations as the API.
+    """
+    if isinstance(data, list):
+        return '', data
+    if 'user_flows' in data:
+        return '/user_flows', data['user_flows']
+    if 'flows' in data:
+        return '/flows', data['flows']
+
+    # Check for nested structure
+    for key, value in data.items():
+        if isinstance(value, dict):
+            if 'user_flows' in value:
+                return f'/{key}/user_flows', value['user_flows']
+            if 'flows' in value:
+                return f'/{key}/flows', value['flows']
+
+    return '', []
+
+
+def load_module(module_id):
+    """Load a module file, returning (data, flows_pointer, flows)"""
+    with open(module_file_path(module_id), 'r') as f:
+        data = json.load(f)
+    pointer, flows = find_flows(data)
+    return data, pointer, flows
+
+
+def save_module(module_id, data):
+    """Write a module file back in the data files' 4-space layout"""
+    with open(module_file_path(module_id), 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def iter_all_flows():
+    """Yield (module_id, flows_pointer, index, flow) across every module"""
+    for module_id in MODULE_FILES:
+        _, flows_pointer, flows = load_module(module_id)
+        for i, flow in enumerate(flows):
+            yield module_id, flows_pointer, i, flow
+
+
+def get_flow_name(flow):
+    """Display name of a flow"""
+    return flow.get('flow_name') or flow.get('name') or ''
+
+
+def get_flow_id(flow):
+    """Stable identifier of a flow, matching getFlow() in the API"""
+    flow_id = flow.get('flow_id') or flow.get('id')
+    if flow_id:
+        return flow_id
+    return re.sub(r'\s+', '_', get_flow_name(flow).lower())
+
+
+def get_flow_ref(flow):
+    """Identifier written into related_flows.
+
+    FlowDiagram.js resolves related flows by flow_id, id, or the flow name
+    with spaces and hyphens replaced by underscores.
+    """
+    flow_id = flow.get('flow_id') or flow.get('id')
+    if flow_id:
+        return flow_id
+    return get_flow_name(flow).replace(' ', '_').replace('-', '_')
+
+
+def get_step_text(step):
+    """Flatten a step (plain string or structured dict) into text"""
+    if isinstance(step, str):
+        return step
+    if not isinstance(step, dict):
+        return ''
+
+    parts = []
+    for key in ('action', 'description', 'details', 'user_input'):
+        value = step.get(key)
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(item for item in value if isinstance(item, str))
+    return ' '.join(parts)
+
+
+def get_flow_text(flow):
+    """Name, description and step text of a flow as one string"""
+    parts = [
+        get_flow_name(flow),
+        flow.get('description') or flow.get('flow_description') or ''
+    ]
+    parts.extend(get_step_text(step) for step in flow.get('steps') or [])
+    return '\n'.join(part for part in parts if part)
+
+
+def iter_source_documents(flow):
+    """Yield (json_pointer, document) for flow- and step-level citations.
+
+    Pointers are relative to the flow object.
+    """
+    for i, doc in enumerate(flow.get('source_documents') or []):
+        yield f'/source_documents/{i}', doc
+
+    for s, step in enumerate(flow.get('steps') or []):
+        if isinstance(step, dict) and 'source_documents' in step:
+            for i, doc in enumerate(step['source_documents'] or []):
+                yield f'/steps/{s}/source_documents/{i}', doc
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON via a temp file so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
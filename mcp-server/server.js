@@ -13,6 +13,19 @@ const {
 } = require("@modelcontextprotocol/sdk/types.js");
 const fs = require("fs").promises;
 const path = require("path");
+const {
+  loadSearchIndex,
+  searchIndex,
+  analyze,
+  expandTerm,
+  highlightResult,
+  markHighlights,
+} = require("../api/utils/searchIndex.js");
+const { loadChunkStore, getPassages, findPdfs } = require("../api/utils/chunkStore.js");
+const { loadFuzzyIndex, correctQuery } = require("../api/utils/fuzzyIndex.js");
+const { loadFacets, selectFlows, hasFlow, flowIds } = require("../api/utils/facets.js");
+const { loadTopicIndex } = require("../api/utils/topicIndex.js");
+const { flowPageCitations } = require("../api/utils/pageCitations.js");
 
 // Base path to data files
 const DATA_PATH = path.join(__dirname, "../public/data");
@@ -76,6 +89,10 @@ class BrandwatchMCPServer {
                 description:
                   "Optional: Filter by specific module (e.g., 'listen', 'measure', 'engage')",
               },
+              category: {
+                type: "string",
+                description: "Optional: Filter by flow category",
+              },
               limit: {
                 type: "number",
                 description: "Maximum number of results to return (default: 10)",
@@ -155,6 +172,30 @@ class BrandwatchMCPServer {
             required: ["topic"],
           },
         },
+        {
+          name: "get_document_passages",
+          description:
+            "Get passages of a documentation PDF, optionally only those covering one page",
+          inputSchema: {
+            type: "object",
+            properties: {
+              document: {
+                type: "string",
+                description:
+                  "PDF path relative to public/pdfs, or part of its name (e.g., 'Content Approval')",
+              },
+              page: {
+                type: "number",
+                description: "Optional: 1-based page number",
+              },
+              limit: {
+                type: "number",
+                description: "Maximum number of passages to return (default: 5)",
+              },
+            },
+            required: ["document"],
+          },
+        },
         {
           name: "get_module_info",
           description:
@@ -201,6 +242,8 @@ class BrandwatchMCPServer {
               return await this.getCrossModuleWorkflow(args);
             case "find_flows_by_topic":
               return await this.findFlowsByTopic(args);
+            case "get_document_passages":
+              return await this.getDocumentPassages(args);
             case "get_module_info":
               return await this.getModuleInfo(args);
             case "list_all_modules":
@@ -223,8 +266,47 @@ class BrandwatchMCPServer {
   }
 
   // Tool implementations
-  async searchFlows({ query, module, limit = 10 }) {
+  async searchFlows({ query, module, category, limit = 10 }) {
     try {
+      const index = loadSearchIndex();
+      const facets = loadFacets();
+      // Category filters need the facet bitmaps; without them, scan the module files
+      if (index && (facets || !category)) {
+        // Correct misspelt words that no indexed term starts with
+        const fuzzyIndex = loadFuzzyIndex();
+        if (fuzzyIndex) {
+          query = correctQuery(fuzzyIndex, query, (word) =>
+            analyze(index, word).some((term) => expandTerm(index, term).length === 0)
+          ).query;
+        }
+        // Filter with the facet bitmaps; search and facet ids are both in iter_all_flows() order
+        const options = { module };
+        if (facets) {
+          const selected = selectFlows(facets, {
+            ...(module && { module: [module] }),
+            ...(category && { category: [category] }),
+          });
+          options.module = undefined;
+          options.allowed = (doc) => hasFlow(selected, doc);
+        }
+        const hits = searchIndex(index, query, options).slice(0, limit);
+        return {
+          content: [
+            {
+              type: "text",
+              text: `Found ${hits.length} flows matching "${query}":\n\n${hits
+                .map((r) => {
+                  const { snippet } = highlightResult(index, r);
+                  return `📋 **${r.flow_name}** (${r.module}/${r.id})\n   ${
+                    markHighlights(snippet.text, snippet.highlights) || "No description"
+                  }\n   Matched in: ${r.matchedFields.join(", ")} (score ${r.score})`;
+                })
+                .join("\n\n")}`,
+            },
+          ],
+        };
+      }
+
       const results = [];
       const searchTerm = query.toLowerCase();
 
@@ -253,6 +335,8 @@ class BrandwatchMCPServer {
 
         // Search in flows
         for (const flow of flows) {
+          if (category && (flow.category || flow.flowCategory) !== category) continue;
+
           let match = false;
           let matchedIn = [];
 
@@ -292,7 +376,7 @@ class BrandwatchMCPServer {
               flow_name: flowName,
               description: flow.description,
               matched_in: matchedIn,
-              category: flow.flowCategory,
+              category: flow.category || flow.flowCategory,
             });
 
             if (results.length >= limit) break;
@@ -388,6 +472,7 @@ class BrandwatchMCPServer {
       const dependencies = flow.dependencies || [];
       const prerequisites = flow.prerequisites || [];
       const sourceDocs = flow.source_documents || [];
+      const pageCitations = flowPageCitations(module, flow);
 
       return {
         content: [
@@ -414,7 +499,13 @@ ${
 }${
   sourceDocs.length > 0
     ? `**Source Documents**: \n${sourceDocs
-        .map((d) => `   - ${d}`)
+        .map((d) => {
+          // Cited pages from build_page_citations.py
+          const citation = pageCitations.find((c) => c.document === d);
+          return citation
+            ? `   - ${d} (pages ${citation.pages[0]}-${citation.pages[1]}, ${citation.anchor})`
+            : `   - ${d}`;
+        })
         .join("\n")}`
     : ""
 }`,
@@ -440,42 +531,55 @@ ${
         throw new Error(`Unknown module: ${module}`);
       }
 
-      const filePath = path.join(DATA_PATH, fileName);
-      const data = await fs.readFile(filePath, "utf8");
-      const parsed = JSON.parse(data);
+      // Module and category bitmaps from build_facets.py; otherwise scan the module file
+      let flows;
+      const facets = loadFacets();
+      if (facets) {
+        const selected = selectFlows(facets, {
+          module: [module],
+          ...(category && { category: [category] }),
+        });
+        flows = flowIds(selected).map((id) => {
+          const [, flowRef, name, flowCategory, description] = facets.flows[id];
+          return { id: flowRef, name: name || "Unnamed", category: flowCategory, description };
+        });
+      } else {
+        const filePath = path.join(DATA_PATH, fileName);
+        const data = await fs.readFile(filePath, "utf8");
+        const parsed = JSON.parse(data);
 
-      // Extract flows
-      let flows = parsed.user_flows || parsed.flows || parsed;
-      if (!Array.isArray(flows)) {
-        for (const key of Object.keys(parsed)) {
-          if (parsed[key].user_flows) {
-            flows = parsed[key].user_flows;
-            break;
-          }
-          if (parsed[key].flows) {
-            flows = parsed[key].flows;
-            break;
+        // Extract flows
+        let moduleFlows = parsed.user_flows || parsed.flows || parsed;
+        if (!Array.isArray(moduleFlows)) {
+          for (const key of Object.keys(parsed)) {
+            if (parsed[key].user_flows) {
+              moduleFlows = parsed[key].user_flows;
+              break;
+            }
+            if (parsed[key].flows) {
+              moduleFlows = parsed[key].flows;
+              break;
+            }
           }
         }
-      }
 
-      // Filter by category if specified
-      if (category) {
-        flows = flows.filter((f) => f.flowCategory === category);
+        flows = moduleFlows
+          .map((flow) => ({
+            id: flow.flow_id || flow.id,
+            name: flow.flow_name || flow.name || "Unnamed",
+            category: flow.category || flow.flowCategory || "Other",
+            description: flow.description || "",
+          }))
+          .filter((flow) => !category || flow.category === category);
       }
 
       // Group by category
       const flowsByCategory = {};
       for (const flow of flows) {
-        const cat = flow.flowCategory || "Other";
-        if (!flowsByCategory[cat]) {
-          flowsByCategory[cat] = [];
+        if (!flowsByCategory[flow.category]) {
+          flowsByCategory[flow.category] = [];
         }
-        flowsByCategory[cat].push({
-          id: flow.flow_id || flow.id,
-          name: flow.flow_name || flow.name || "Unnamed",
-          description: flow.description || "",
-        });
+        flowsByCategory[flow.category].push(flow);
       }
 
       // Format output
@@ -563,6 +667,12 @@ ${stepText}
   }
 
   async findFlowsByTopic({ topic }) {
+    // Use the posting lists from build_topic_index.py when they are current
+    const indexed = await this.findFlowsByTopicIndex(topic);
+    if (indexed) {
+      return indexed;
+    }
+
     // This is similar to search but with predefined topic mappings
     const topicKeywords = {
       alerts: ["alert", "notification", "warning", "trigger"],
@@ -597,6 +707,77 @@ ${stepText}
     };
   }
 
+  async findFlowsByTopicIndex(topic, limit = 20) {
+    const index = loadTopicIndex();
+    if (!index) {
+      return null;
+    }
+
+    const entry = index.topics[topic.toLowerCase()];
+    if (!entry) {
+      return null;
+    }
+
+    const results = entry.flows.slice(0, limit).map(([key, hits, fields]) => ({
+      ...index.flows[key],
+      hits,
+      matched_in: fields,
+    }));
+
+    return {
+      content: [
+        {
+          type: "text",
+          text: `Flows related to "${topic}" (${entry.flows.length} tagged):\n\n${results
+            .map(
+              (r) =>
+                `📋 **${r.flow_name}** (${r.module}/${r.flow_id})\n   ${
+                  r.description || "No description"
+                }\n   Matched in: ${r.matched_in.join(", ")} (${r.hits} keyword hits)`
+            )
+            .join("\n\n")}`,
+        },
+      ],
+    };
+  }
+
+  async getDocumentPassages({ document, page, limit = 5 }) {
+    // Chunks written by build_chunk_store.py
+    const store = loadChunkStore();
+    if (!store) {
+      throw new Error("Chunk store missing or older than the PDFs; run python3 build_chunk_store.py");
+    }
+
+    const matches = store.pdfIds.has(document) ? [document] : findPdfs(store, document);
+    if (matches.length !== 1) {
+      return {
+        content: [
+          {
+            type: "text",
+            text: matches.length
+              ? `"${document}" matches ${matches.length} documents:\n${matches.map((m) => `📄 ${m}`).join("\n")}`
+              : `No document matching "${document}"`,
+          },
+        ],
+      };
+    }
+
+    const passages = getPassages(store, matches[0], { page, limit });
+    return {
+      content: [
+        {
+          type: "text",
+          text: `${passages.length} passages from ${matches[0]}${page ? ` (page ${page})` : ""}:\n\n${passages
+            .map(
+              (p) =>
+                `### ${p.heading || "Untitled section"} (pages ${p.pageStart}-${p.pageEnd}, ${p.anchor})\n${p.text}`
+            )
+            .join("\n\n")}`,
+        },
+      ],
+    };
+  }
+
   async getModuleInfo({ module }) {
     const moduleInfo = {
       listen: {
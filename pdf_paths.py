@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Single resolver for source_documents citations.
+
+Citations appear in several forms across the data and the older scripts:
+  "Engage/Getting Started/Introduction to Engage.pdf"          (module-prefixed)
+  "Getting Started/Introduction to Engage.pdf"                 (module-relative)
+  "Source: Engage/Getting Started/Introduction to Engage.pdf"  (prefixed label)
+  "Consumer_Research/...", "Vizia/...", "/pdfs/Listen/..."     (case/separator variants)
+
+All of them resolve to the canonical form the viewer loads from /pdfs/:
+"<ModuleDir>/<path inside module>", relative to public/pdfs.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from flow_data import MODULE_DIRS, PDFS_PATH
+
+_SEPARATOR_RE = re.compile(r'[\s_]+')
+
+# Lower-cased, separator-normalised prefix -> canonical directory name
+_PREFIX_TO_DIR = {
+    _SEPARATOR_RE.sub(' ', name.lower()): name for name in MODULE_DIRS.values()
+}
+# "Reviews/" is used by some hand-written citations for Brandwatch Reviews
+_PREFIX_TO_DIR['reviews'] = MODULE_DIRS['reviews']
+
+# One matcher for every citation form: optional label, optional location
+# prefix, optional module directory (any case, spaces or underscores)
+_CITATION_RE = re.compile(
+    r'^\s*(?:source:\s*)?'
+    r'(?:\.?/)?(?:(?:public/)?pdfs/)?'
+    r'(?:(?P<module>'
+    + '|'.join(
+        r'[\s_]+'.join(re.escape(word) for word in prefix.split())
+        for prefix in sorted(_PREFIX_TO_DIR, key=len, reverse=True)
+    )
+    + r')/)?'
+    r'(?P<path>.+?)\s*$',
+    re.IGNORECASE
+)
+
+
+def module_dir_name(module_id):
+    """Get the actual directory name for a module"""
+    return MODULE_DIRS.get(module_id, module_id)
+
+
+def _exists(rel_path):
+    return os.path.isfile(os.path.join(PDFS_PATH, *rel_path.split('/')))
+
+
+@lru_cache(maxsize=None)
+def resolve_pdf_path(citation, module_id=None):
+    """Normalise any citation form to "<ModuleDir>/<path>".
+
+    Citations without a module prefix are taken as relative to module_id's
+    directory, as are prefixed ones that only exist read that way. Results
+    are memoised per distinct (citation, module) pair.
+    """
+    match = _CITATION_RE.match(citation.replace('\\', '/'))
+    if not match:
+        return citation
+
+    path = match.group('path')
+    prefix = match.group('module')
+    if prefix:
+        module_dir = _PREFIX_TO_DIR[_SEPARATOR_RE.sub(' ', prefix.lower())]
+        prefixed = f'{module_dir}/{path}'
+        # Some modules have a subdirectory named like a module (e.g.
+        # Advertise/Advertise/), so the first segment may be part of a
+        # module-relative path; prefer whichever reading exists on disk
+        if module_id and not _exists(prefixed):
+            relative = f'{module_dir_name(module_id)}/{prefix}/{path}'
+            if _exists(relative):
+                return relative
+        return prefixed
+    if module_id:
+        return f'{module_dir_name(module_id)}/{path}'
+    return path
+
+
+def pdf_absolute_path(citation, module_id=None):
+    """Absolute filesystem path for a citation"""
+    return os.path.join(PDFS_PATH, *resolve_pdf_path(citation, module_id).split('/'))
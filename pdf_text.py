@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Per-page PDF text extraction with an on-disk cache.
+
+Extracting text with PyPDF2 costs tens of milliseconds per page, so every
+PDF is extracted once and its pages are cached under
+data/generated/pdf_text/. A cache entry is reused while the PDF's
+size and mtime are unchanged.
+
+    python3 pdf_text.py              # warm the cache for every PDF in parallel
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+from flow_data import PDFS_PATH, SERVER_GENERATED_PATH, write_json_atomic
+
+PDF_TEXT_CACHE_PATH = os.path.join(SERVER_GENERATED_PATH, 'pdf_text')
+
+
+def extract_pages_from_pdf(pdf_path):
+    """Extract the text of each page of a PDF file"""
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return [page.extract_text() or '' for page in pdf_reader.pages]
+    except Exception as e:
+        print(f"Error reading {pdf_path}: {e}")
+        return []
+
+
+def list_pdfs():
+    """Every PDF under public/pdfs as a path relative to that directory"""
+    pdfs = []
+    for root, dirs, files in os.walk(PDFS_PATH):
+        for file in files:
+            if file.endswith('.pdf'):
+                rel_path = os.path.relpath(os.path.join(root, file), PDFS_PATH)
+                pdfs.append(rel_path.replace(os.sep, '/'))
+    return sorted(pdfs)
+
+
+def _cache_file(rel_path):
+    digest = hashlib.sha1(rel_path.encode('utf-8')).hexdigest()
+    return os.path.join(PDF_TEXT_CACHE_PATH, f'{digest}.json')
+
+
+def get_pdf_pages(rel_path):
+    """Cached per-page text for a PDF given relative to public/pdfs.
+
+    Returns None if the PDF does not exist.
+    """
+    pdf_path = os.path.join(PDFS_PATH, *rel_path.split('/'))
+    try:
+        stat = os.stat(pdf_path)
+    except FileNotFoundError:
+        return None
+
+    cache_file = _cache_file(rel_path)
+    try:
+        with open(cache_file, 'r') as f:
+            cached = json.load(f)
+        if cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return cached['pages']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    pages = extract_pages_from_pdf(pdf_path)
+    write_json_atomic(cache_file, {
+        'path': rel_path,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'pages': pages
+    }, indent=None)
+    return pages
+
+
+def _page_count(rel_path):
+    pages = get_pdf_pages(rel_path)
+    return len(pages) if pages else 0
+
+
+def warm_cache(rel_paths=None, workers=None):
+    """Extract (or validate the cache of) many PDFs on a process pool.
+
+    Returns {rel_path: page_count}.
+    """
+    rel_paths = list_pdfs() if rel_paths is None else sorted(set(rel_paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = pool.map(_page_count, rel_paths, chunksize=4)
+        return dict(zip(rel_paths, counts))
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    counts = warm_cache()
+    print(f"✅ Cached text for {len(counts)} PDFs ({sum(counts.values())} pages) "
+          f"in {time.perf_counter() - start:.1f} s")
+    sys.exit(0)
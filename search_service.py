@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Asyncio HTTP service for GET /api/search, backed by the prebuilt indexes.
+
+Serves the same contract as the Express route in api/routes/search.js
+(q or query, module, category, topic, document, include, limit, offset;
+same response body and errors), but from indexes held in memory: the
+BM25 index (build_search_index.py), the facet bitmaps (build_facets.py)
+and the typo index (build_fuzzy_index.py), plus the cross-module
+workflows.
+
+Each response body is kept in an LRU cache keyed by the query
+parameters and a SHA-256 of every file the indexes were loaded from.
+At most once every RELOAD_INTERVAL seconds a request stats those files
+and the module files; if any changed, the indexes are reloaded, and a
+changed content hash empties the cache.
+
+The service needs the search index. If it is missing, or a module file
+changed after it was built, requests get a 503 so the caller (see
+api/nginx.conf) can fall back to the Express route, which scans the
+module files. Limits and offsets that are not integers are rejected
+with a 400; Express would treat them as NaN. api/test-search-service.js
+compares the two against a running Express API.
+
+Requests are answered on the event loop: a search takes well under a
+millisecond, so offloading it to threads would only add overhead.
+
+    python3 search_service.py [--host 127.0.0.1] [--port 3002] [--cache-size 1024]
+    python3 search_service.py --query "email alerts"     # one search, then exit
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from build_facets import FACETS, FACETS_FILE, FacetIndex
+from build_fuzzy_index import FUZZY_INDEX_FILE, FuzzyIndex
+from build_search_index import SEARCH_INDEX_FILE, SearchIndex
+from flow_data import (
+    CROSS_MODULE_FILES,
+    DATA_PATH,
+    MODULE_FILES,
+    get_flow_ref,
+    iter_all_flows,
+    module_file_path,
+    module_sources,
+)
+from text_utils import stemmed_tokens
+
+DEFAULT_PORT = 3002
+DEFAULT_CACHE_SIZE = 1024
+RELOAD_INTERVAL = 1.0
+DEFAULT_LIMIT = 50
+MAX_REQUEST_LINE = 8192
+
+SEARCH_PATHS = ('/api/search', '/api/search/')
+CROSS_MODULE_PATHS = [os.path.join(DATA_PATH, name) for name in CROSS_MODULE_FILES]
+
+_INT_RE = re.compile(r'\s*([+-]?\d+)')
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+def to_json(data):
+    """Response body bytes, serialised like Express's res.json()"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class SearchError(Exception):
+    """An error response: HTTP status and JSON body"""
+
+    def __init__(self, status, body):
+        super().__init__(body.get('error'))
+        self.status = status
+        self.body = body
+
+
+def parse_int(value, name):
+    """Leading integer of a parameter, like parseInt()"""
+    match = _INT_RE.match(value)
+    if not match:
+        raise SearchError(400, {'error': f'{name} must be an integer', name: value})
+    return int(match.group(1))
+
+
+def parse_filters(params):
+    """{facet: [values]} like parseFilters() in api/utils/facets.js: a facet
+    repeated or comma-separated, except document (PDF paths contain commas)"""
+    filters = {}
+    for facet in FACETS:
+        values = []
+        for value in params.get(facet, ()):
+            values.extend([value] if facet == 'document' else value.split(','))
+        values = [value.strip() for value in values if value.strip()]
+        if values:
+            filters[facet] = values
+    return filters
+
+
+def search_cross_module(workflows, query):
+    """Substring matches in the cross-module workflows, scored as the Express route does"""
+    term = query.lower()
+    results = []
+    for workflow in workflows:
+        matched_fields = [
+            field for field in ('workflow_name', 'description', 'business_value')
+            if workflow.get(field) and term in workflow[field].lower()
+        ]
+        if any(step.get('step_description') and term in step['step_description'].lower()
+               for step in workflow.get('workflow_steps') or []):
+            matched_fields.append('workflow_steps')
+        if matched_fields:
+            results.append({
+                'type': 'cross-module',
+                'workflow': workflow,
+                'matchedFields': matched_fields,
+                'score': 2 if 'workflow_name' in matched_fields else 1
+            })
+    return results
+
+
+class SearchState:
+    """Indexes loaded from disk, reloaded when their files change"""
+
+    def __init__(self):
+        self.stats = None
+        self.content_hash = None
+        self.search_index = None
+        self.facets = None
+        self.fuzzy = None
+        self.workflows = []
+        self.flows = {}
+        self.stale = True
+        self.facets_stale = True
+        self.checked_at = 0.0
+
+    def watched_files(self):
+        return [SEARCH_INDEX_FILE, FACETS_FILE, FUZZY_INDEX_FILE, *CROSS_MODULE_PATHS,
+                *(module_file_path(module_id) for module_id in MODULE_FILES)]
+
+    def file_stats(self):
+        stats = []
+        for path in self.watched_files():
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+        return stats
+
+    def refresh(self):
+        """Reload if a watched file changed; returns True if the content hash changed"""
+        now = time.monotonic()
+        if self.stats is not None and now - self.checked_at < RELOAD_INTERVAL:
+            return False
+        self.checked_at = now
+        stats = self.file_stats()
+        if stats == self.stats:
+            return False
+        self.stats = stats
+
+        digest = hashlib.sha256()
+        loaded = {}
+        for path in (SEARCH_INDEX_FILE, FACETS_FILE, FUZZY_INDEX_FILE, *CROSS_MODULE_PATHS):
+            try:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+            except OSError:
+                continue
+            digest.update(path.encode('utf-8') + b'\0' + raw)
+            loaded[path] = json.loads(raw)
+
+        search_index = loaded.get(SEARCH_INDEX_FILE)
+        self.search_index = SearchIndex(search_index) if search_index else None
+        self.facets = FacetIndex(loaded[FACETS_FILE]) if FACETS_FILE in loaded else None
+        self.workflows = [loaded[path] for path in CROSS_MODULE_PATHS if path in loaded]
+        self.flows = {(module_id, get_flow_ref(flow)): flow for module_id, _, _, flow in iter_all_flows()}
+
+        # Indexes built before a module edit are stale, as in sourcesAreCurrent()
+        current = module_sources()
+        self.stale = not search_index or search_index.get('sources') != current
+        self.facets_stale = self.facets is None or loaded[FACETS_FILE].get('sources') != current
+        fuzzy_index = loaded.get(FUZZY_INDEX_FILE)
+        self.fuzzy = FuzzyIndex(fuzzy_index) if fuzzy_index and fuzzy_index.get('sources') == current else None
+
+        content_hash = digest.hexdigest()
+        changed = content_hash != self.content_hash
+        self.content_hash = content_hash
+        return changed
+
+
+class SearchService:
+    """GET /api/search over a SearchState, with an LRU cache of response bodies"""
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.state = SearchState()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, params):
+        """(status, body bytes, cache status) for the query parameters ({name: [values]})"""
+        if self.state.refresh():
+            self.cache.clear()
+        key = (self.state.content_hash, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        # A module edit makes the index stale without changing its hash
+        body = None if self.state.stale else self.cache.get(key)
+        if body is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return 200, body, 'HIT'
+
+        self.misses += 1
+        try:
+            body = to_json(self.run_search(params))
+        except SearchError as error:
+            return error.status, to_json(error.body), 'MISS'
+        self.cache[key] = body
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return 200, body, 'MISS'
+
+    def run_search(self, params):
+        """The response of the Express route for the same parameters"""
+        first = {name: values[0] for name, values in params.items() if values}
+        original_query = first.get('q') or first.get('query')
+        if not original_query or not original_query.strip():
+            body = {'error': 'Search query must not be empty'}
+            if original_query is not None:
+                body['query'] = original_query
+            raise SearchError(400, body)
+        limit = parse_int(first.get('limit', str(DEFAULT_LIMIT)), 'limit')
+        offset = parse_int(first.get('offset', '0'), 'offset')
+
+        state = self.state
+        if state.stale:
+            raise SearchError(503, {'error': 'Search index is missing or older than the module files; '
+                                             'run build_search_index.py'})
+        index = state.search_index
+
+        filters = parse_filters(params)
+        facets = None if state.facets_stale else state.facets
+        facet_filtered = any(facet != 'module' or len(values) > 1 for facet, values in filters.items())
+        if facet_filtered and not facets:
+            raise SearchError(503, {'error': 'Facet filters are unavailable until build_facets.py has been run',
+                                    'filters': filters})
+        if facets:
+            selected = facets.select(filters)
+            allowed = lambda doc: selected >> doc & 1
+        elif filters:
+            module = filters['module'][0]
+            allowed = lambda doc: index.docs[doc]['module'] == module
+        else:
+            allowed = None
+
+        # Correct misspelt words that no indexed term starts with
+        query = original_query
+        corrections = []
+        if state.fuzzy:
+            query, corrections = state.fuzzy.correct(
+                query, lambda word: any(not index.expand(term) for term in stemmed_tokens(word)))
+
+        hits = index.search(query, allowed)
+        results = [{'hit': hit, 'score': hit['score']} for hit in hits]
+        if not filters:
+            results.extend(search_cross_module(state.workflows, query))
+        results.sort(key=lambda result: -result['score'])
+
+        include_flow = 'flow' in ','.join(params.get('include', ())).split(',')
+        page = []
+        # Python slices treat negative bounds like Array.prototype.slice()
+        for result in results[offset:offset + limit]:
+            hit = result.pop('hit', None)
+            if hit is None:
+                page.append(result)
+                continue
+            field, text, highlights = index.snippet(hit)
+            entry = {
+                'module': hit['module'],
+                'flowId': hit['id'],
+                'flowName': hit['flow_name'],
+                'category': hit['category'],
+                'snippet': {'field': field, 'text': text, 'highlights': highlights},
+                'nameHighlights': index.name_highlights(hit),
+            }
+            if include_flow:
+                entry['flow'] = state.flows.get((hit['module'], hit['id']))
+            entry['matchedFields'] = ['flow_name' if field == 'name' else field for field in hit['matched_fields']]
+            entry['score'] = hit['score']
+            page.append(entry)
+
+        response = {'query': query}
+        if corrections:
+            response.update({'originalQuery': original_query, 'corrections': corrections})
+        response.update({'total': len(results), 'limit': limit, 'offset': offset, 'results': page})
+        if facets:
+            response['facets'] = facets.facet_counts(sum(1 << hit['doc'] for hit in hits))
+        return response
+
+    def health(self):
+        self.state.refresh()
+        return {
+            'status': 'stale' if self.state.stale else 'ok',
+            'indexHash': self.state.content_hash,
+            'cache': {'entries': len(self.cache), 'size': self.cache_size, 'hits': self.hits, 'misses': self.misses}
+        }
+
+    def respond(self, method, target):
+        """(status, body bytes, extra headers) for a request"""
+        url = urlsplit(target)
+        if url.path not in SEARCH_PATHS and url.path != '/health':
+            return 404, b'{"error":"Not Found"}', {}
+        if method not in ('GET', 'HEAD'):
+            return 405, b'{"error":"Method Not Allowed"}', {'Allow': 'GET, HEAD'}
+        if url.path == '/health':
+            return 200, to_json(self.health()), {}
+        status, body, cache = self.search(parse_qs(url.query, keep_blank_values=True))
+        return status, body, {'X-Cache': cache, 'X-Index-Hash': self.state.content_hash or ''}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.x requests on one connection, keeping it alive when asked"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                if len(request_line) > MAX_REQUEST_LINE:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length', '0').isdigit():
+                    await reader.readexactly(int(headers.get('content-length', '0')))
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                try:
+                    status, body, extra = self.respond(method, target)
+                except Exception as error:
+                    status, body, extra = 500, to_json({'error': str(error) or 'Internal Server Error'}), {}
+
+                head = [
+                    f'{version} {status} {STATUS_TEXT.get(status, "")}',
+                    'Content-Type: application/json; charset=utf-8',
+                    f'Content-Length: {len(body)}',
+                    f'Connection: {"keep-alive" if keep_alive else "close"}',
+                    *(f'{name}: {value}' for name, value in extra.items()),
+                ]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, cache_size):
+    service = SearchService(cache_size)
+    service.state.refresh()
+    server = await asyncio.start_server(service.handle, host, port)
+    status = 'stale or missing index, answering 503' if service.state.stale else 'index loaded'
+    print(f"✅ Search service on http://{host}:{port}/api/search ({status}, "
+          f"hash {(service.state.content_hash or '')[:12]})")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve GET /api/search from the prebuilt indexes')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help='cached responses to keep')
+    parser.add_argument('--query', help='print the response for one query and exit')
+    args = parser.parse_args()
+
+    if args.query:
+        service = SearchService(args.cache_size)
+        status, body, _ = service.search({'q': [args.query], 'limit': ['5']})
+        print(json.dumps(json.loads(body), indent=2, ensure_ascii=False))
+        return 0 if status == 200 else 1
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.cache_size))
+    except KeyboardInterrupt:
+        print("\n⚠️  Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,25 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { HashRouter as Router, Routes, Route, Navigate, useParams, useNavigate, useLocation, Link } from 'react-router-dom';
 import './App.css';
 import ModuleSelector from './components/ModuleSelector';
 import FlowDiagram from './components/FlowDiagram';
-// import PDFViewer from './components/PDFViewer';
+import PDFViewer from './components/PDFViewer';
 import SimplePDFViewer from './components/SimplePDFViewer';
 import MarkdownViewer from './components/MarkdownViewer';
 import { FileText, GitBranch, Search, BookOpen, X, ChevronLeft, ChevronRight, BarChart3 } from 'lucide-react';
 import { sortFlowsForModule, sortModules, getModuleMetadata } from './utils/flowOrdering';
+import { citationTarget, findCitation, pageCitation, formatPages, withPageCitations } from './utils/citations';
+import { fetchModuleFlows, loadModuleFlows, loadFlow, hasSummaries } from './utils/flowShards';
+import { loadAutocomplete, complete } from './utils/autocomplete';
 import { Panel, PanelGroup, PanelResizeHandle } from 'react-resizable-panels';
 import { useAuth0 } from '@auth0/auth0-react';
 import { LoginButton, LogoutButton, UserProfile } from './components/AuthButtons';
 import EditSourceModal from './components/EditSourceModal';
 import ComplexityDashboard from './components/ComplexityDashboard';
 
+// PDF suggestions listed above the flow results of the global search
+const DOCUMENT_SUGGESTIONS = 5;
+
 function MainApp() {
   const { isAuthenticated, isLoading, error, user } = useAuth0();
   const { moduleId, flowId } = useParams();
@@ -40,6 +46,10 @@ function MainApp() {
   const [isNavigating, setIsNavigating] = useState(false);
   const [isAdmin, setIsAdmin] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
+  const [autocompleteDictionary, setAutocompleteDictionary] = useState(null);
+  // Flow most recently asked for, so a slower shard fetch cannot override it
+  const requestedFlow = useRef(null);
+  const allFlowContentRequested = useRef(false);
 
   // Debug: Log state changes
   useEffect(() => {
@@ -56,7 +66,7 @@ function MainApp() {
   useEffect(() => {
     // Load modules data
     loadModules();
-    // Load all flows for global search
+    // Load the flow summaries of all modules for global search
     loadAllFlows();
   }, []);
 
@@ -208,59 +218,42 @@ function MainApp() {
     }
   }, [flows, pendingFlowSelection, selectedModule]);
 
-  // Load all flows from all modules for global search
+  const GLOBAL_SEARCH_MODULES = ['listen', 'consumer_research', 'measure', 'benchmark', 'publish',
+                                  'engage', 'reviews', 'advertise', 'influence', 'audience', 'vizia'];
+
+  // Load flows from all modules for global search: the shard index summaries where
+  // they exist, otherwise the module files
   const loadAllFlows = async () => {
     const allFlowsData = [];
-    const moduleIds = ['listen', 'consumer_research', 'measure', 'benchmark', 'publish',
-                       'engage', 'reviews', 'advertise', 'influence', 'audience', 'vizia'];
-
-    for (const moduleId of moduleIds) {
+    for (const moduleId of GLOBAL_SEARCH_MODULES) {
       try {
-        let response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows_with_citations.json?t=${Date.now()}`);
-        if (!response.ok) {
-          response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows.json?t=${Date.now()}`);
-        }
-        if (response.ok) {
-          const data = await response.json();
-          let flowsData = [];
-
-          if (Array.isArray(data)) {
-            flowsData = data;
-          } else if (data.flows) {
-            flowsData = data.flows;
-          } else if (data.user_flows) {
-            flowsData = data.user_flows;
-          } else {
-            const keys = Object.keys(data);
-            for (const key of keys) {
-              if (data[key]?.flows) {
-                flowsData = data[key].flows;
-                break;
-              } else if (data[key]?.user_flows) {
-                flowsData = data[key].user_flows;
-                break;
-              } else if (Array.isArray(data[key])) {
-                flowsData = data[key];
-                break;
-              }
-            }
-          }
-
-          // Add module info to each flow
-          flowsData.forEach(flow => {
-            flow.module = moduleId;
-          });
-
-          allFlowsData.push(...flowsData);
-        }
+        allFlowsData.push(...await loadModuleFlows(moduleId));
       } catch (error) {
         console.error(`Error loading flows for ${moduleId}:`, error);
       }
     }
-
     setAllFlows(allFlowsData);
   };
 
+  // Replace the summaries in allFlows with full flows, so global search also matches steps
+  const loadAllFlowContent = async () => {
+    if (allFlowContentRequested.current) return;
+    allFlowContentRequested.current = true;
+    const modulesWithSummaries = [...new Set(allFlows.filter(flow => flow.shard).map(flow => flow.module))];
+    const fullFlows = {};
+    for (const moduleId of modulesWithSummaries) {
+      try {
+        fullFlows[moduleId] = await fetchModuleFlows(moduleId);
+      } catch (error) {
+        console.error(`Error loading flows for ${moduleId}:`, error);
+      }
+    }
+    setAllFlows(prev => [
+      ...prev.filter(flow => !fullFlows[flow.module]),
+      ...Object.values(fullFlows).flat()
+    ]);
+  };
+
   const loadModules = async () => {
     // Load module data from JSON files
     const moduleList = [
@@ -328,49 +321,9 @@ function MainApp() {
         return;
       }
 
-      // Try with citations file first
-      let response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows_with_citations.json?t=${Date.now()}`);
-
-      // If citations file doesn't exist, try without citations
-      if (!response.ok) {
-        response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows.json?t=${Date.now()}`);
-      }
-
-      if (!response.ok) {
-        throw new Error(`Failed to load flows for ${moduleId}`);
-      }
-
-      const data = await response.json();
-      console.log('Loaded data for', moduleId, ':', data);
-
-      let flowsData = [];
-
-      // Handle different JSON structures
-      if (Array.isArray(data)) {
-        flowsData = data;
-      } else if (data.flows) {
-        flowsData = data.flows;
-      } else if (data.user_flows) {
-        flowsData = data.user_flows;
-      } else {
-        // Check for nested structure (e.g., listen_user_flows, brandwatch_engage_user_flows)
-        const keys = Object.keys(data);
-        for (const key of keys) {
-          // Look for flows in nested structure
-          if (data[key]?.flows) {
-            flowsData = data[key].flows;
-            break;
-          } else if (data[key]?.user_flows) {
-            flowsData = data[key].user_flows;
-            break;
-          } else if (Array.isArray(data[key])) {
-            flowsData = data[key];
-            break;
-          }
-        }
-      }
-
-      console.log('Extracted flows:', flowsData);
+      // Flow summaries from the shard index; each flow is fetched when selected
+      const flowsData = await loadModuleFlows(moduleId);
+      console.log('Loaded flows for', moduleId, ':', flowsData);
 
       // Apply logical ordering to flows based on module
       const orderedFlows = sortFlowsForModule(flowsData || [], moduleId);
@@ -396,15 +349,26 @@ function MainApp() {
 
   // This is now only called when URL changes trigger flow selection
   // No longer called directly from onClick since we use Links
-  const handleFlowSelect = (flow) => {
-    console.log('handleFlowSelect - flow selected via URL change:', flow);
+  const handleFlowSelect = async (summary) => {
+    console.log('handleFlowSelect - flow selected via URL change:', summary);
+    requestedFlow.current = summary;
+
+    // Fetch the flow's shard if only its summary is loaded, and its cited pages
+    let flow = summary;
+    try {
+      flow = await withPageCitations(await loadFlow(summary));
+    } catch (error) {
+      console.error('Error loading flow:', error);
+      return;
+    }
+    if (requestedFlow.current !== summary) return;
 
     // Set the selected flow
     setSelectedFlow(flow);
 
-    // If flow has source documents, select the first one
+    // If flow has source documents, select the first one, at its cited pages
     if (flow?.source_documents && flow.source_documents.length > 0) {
-      setSelectedDocument(flow.source_documents[0]);
+      setSelectedDocument(citationTarget(flow, flow.source_documents[0]));
     }
   };
 
@@ -468,6 +432,57 @@ function MainApp() {
     setSearchResults(results);
   };
 
+  // PDF titles from the autocomplete dictionary, suggested next to the flow results
+  useEffect(() => {
+    loadAutocomplete().then(setAutocompleteDictionary);
+  }, []);
+
+  // Page citation behind the open document, so PDFViewer can fetch just the cited pages
+  const documentCitation = selectedDocument ? findCitation(selectedFlow, selectedDocument) : null;
+
+  const documentSuggestions = autocompleteDictionary && globalSearchTerm
+    ? complete(autocompleteDictionary, globalSearchTerm, { types: ['pdf'], limit: DOCUMENT_SUGGESTIONS })
+    : [];
+
+  // Open a suggested PDF in the viewer, next to the current flow if there is one
+  const handleDocumentSuggestionSelect = (suggestion) => {
+    setSelectedDocument(suggestion.target);
+    if (viewMode === 'flow') {
+      setViewMode('split');
+    }
+    setGlobalSearchTerm('');
+    setSearchResults(null);
+  };
+
+  // Summaries have no steps: load the full flows once a search needs them
+  useEffect(() => {
+    if (globalSearchTerm && hasSummaries(allFlows)) {
+      loadAllFlowContent();
+    }
+  }, [globalSearchTerm, allFlows]);
+
+  // Re-run the global search as full flows replace summaries
+  useEffect(() => {
+    if (globalSearchTerm) {
+      setSearchResults(allFlows.filter(flow => searchInFlow(flow, globalSearchTerm)));
+    }
+  }, [allFlows]);
+
+  // Likewise for filtering the selected module's flows
+  useEffect(() => {
+    const moduleId = selectedModule?.id || selectedModule;
+    if (!searchTerm || !hasSummaries(flows) || !moduleId) return undefined;
+    let cancelled = false;
+    fetchModuleFlows(moduleId)
+      .then(fullFlows => {
+        if (!cancelled) setFlows(sortFlowsForModule(fullFlows, moduleId));
+      })
+      .catch(error => console.error('Error loading flows:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [searchTerm, flows, selectedModule]);
+
   // Select a flow from search results
   const handleSearchResultSelect = (flow) => {
     // Store the flow to be selected after module loads
@@ -496,6 +511,10 @@ function MainApp() {
     const description = (flow.description || '').toLowerCase();
     if (description.includes(searchLower)) return true;
 
+    // Search in category, e.g. a category picked from the search box suggestions
+    const category = (flow.category || flow.flowCategory || '').toLowerCase();
+    if (category.includes(searchLower)) return true;
+
     // Search in flow steps
     if (flow.steps && Array.isArray(flow.steps)) {
       for (const step of flow.steps) {
@@ -602,6 +621,8 @@ function MainApp() {
               <div className="search-results-dropdown">
                 <div className="search-results-header">
                   Found {searchResults.length} result{searchResults.length !== 1 ? 's' : ''}
+                  {documentSuggestions.length > 0 &&
+                    ` and ${documentSuggestions.length} document${documentSuggestions.length !== 1 ? 's' : ''}`}
                   <button
                     className="close-search"
                     onClick={() => {
@@ -613,6 +634,18 @@ function MainApp() {
                   </button>
                 </div>
                 <div className="search-results-list">
+                  {documentSuggestions.map(suggestion => (
+                    <div
+                      key={suggestion.target}
+                      className="search-result-item"
+                      onClick={() => handleDocumentSuggestionSelect(suggestion)}
+                    >
+                      <div className="result-module">
+                        <FileText size={12} /> {suggestion.module} document
+                      </div>
+                      <div className="result-flow">{suggestion.text}</div>
+                    </div>
+                  ))}
                   {searchResults.slice(0, 10).map((flow, idx) => (
                     <div
                       key={idx}
@@ -735,14 +768,16 @@ function MainApp() {
                       {selectedFlow.source_documents.map((doc, idx) => {
                         const isMarkdown = doc.endsWith('.md');
                         const fileName = doc.split('/').pop().replace('.md', '');
+                        const citation = pageCitation(selectedFlow, doc);
                         return (
                           <button
                             key={idx}
                             className={`doc-link compact ${isMarkdown ? 'markdown-doc' : 'pdf-doc'}`}
-                            onClick={() => handlePDFSelect(doc)}
+                            onClick={() => handlePDFSelect(citationTarget(selectedFlow, doc))}
                             title={doc}
                           >
                             {isMarkdown ? `📄 ${fileName}` : fileName}
+                            {citation && ` (${formatPages(citation.pages)})`}
                           </button>
                         );
                       })}
@@ -767,7 +802,10 @@ function MainApp() {
                               (f.flow_name && f.flow_name.replace(/ /g, '_').replace(/-/g, '_') === flowId)
                             );
                             if (targetFlow) {
-                              setSelectedFlow(targetFlow);
+                              loadFlow(targetFlow)
+                                .then(withPageCitations)
+                                .then(setSelectedFlow)
+                                .catch(error => console.error('Error loading flow:', error));
                               // Ensure the module is expanded to show the selected flow
                               if (selectedModule) {
                                 setExpandedModules(prev => ({
@@ -779,6 +817,7 @@ function MainApp() {
                           }}
                           onModuleFlowClick={null} // No longer needed - using Links now
                           showCitations={false}
+                          onDocumentSelect={handlePDFSelect}
                         />
                       </div>
                     </Panel>
@@ -794,7 +833,16 @@ function MainApp() {
                         {selectedDocument.endsWith('.md') ? (
                           <MarkdownViewer documentPath={selectedDocument} />
                         ) : (
-                          <SimplePDFViewer pdfPath={selectedDocument} />
+                          documentCitation ? (
+                            <PDFViewer
+                              key={selectedDocument}
+                              pdfPath={documentCitation.path}
+                              page={documentCitation.page}
+                              pages={documentCitation.pages}
+                            />
+                          ) : (
+                            <SimplePDFViewer pdfPath={selectedDocument} />
+                          )
                         )}
                       </div>
                     </Panel>
@@ -802,6 +850,14 @@ function MainApp() {
                 </PanelGroup>
               </div>
             </>
+          ) : selectedDocument ? (
+            <div className="panel pdf-panel">
+              {selectedDocument.endsWith('.md') ? (
+                <MarkdownViewer documentPath={selectedDocument} />
+              ) : (
+                <SimplePDFViewer pdfPath={selectedDocument} />
+              )}
+            </div>
           ) : (
             <div className="welcome-screen">
               <GitBranch size={64} color="#2196F3" />
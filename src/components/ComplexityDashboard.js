@@ -46,8 +46,7 @@ const ComplexityDashboard = () => {
     const analyzer = new ComplexityAnalyzer();
 
     try {
-      const moduleAnalysis = await analyzer.analyzeAllModules();
-      const stats = analyzer.calculateOverallStats(moduleAnalysis);
+      const { analysis: moduleAnalysis, overallStats: stats } = await analyzer.analyzeAllModulesWithStats();
       setAnalysis(moduleAnalysis);
       setOverallStats(stats);
     } catch (error) {
@@ -89,7 +88,7 @@ const ComplexityDashboard = () => {
     'listen': { bg: 'rgba(14, 165, 233, 0.7)', border: 'rgba(14, 165, 233, 1)' }, // Sky Blue
     'measure': { bg: 'rgba(245, 158, 11, 0.7)', border: 'rgba(245, 158, 11, 1)' }, // Amber
     'publish': { bg: 'rgba(16, 185, 129, 0.7)', border: 'rgba(16, 185, 129, 1)' }, // Emerald
-    'brandwatch_reviews': { bg: 'rgba(99, 102, 241, 0.7)', border: 'rgba(99, 102, 241, 1)' }, // Indigo
+    'reviews': { bg: 'rgba(99, 102, 241, 0.7)', border: 'rgba(99, 102, 241, 1)' }, // Indigo
     'vizia': { bg: 'rgba(217, 70, 239, 0.7)', border: 'rgba(217, 70, 239, 1)' } // Fuchsia
   };
 
@@ -1,8 +1,9 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { ZoomIn, ZoomOut, Maximize2, Move } from 'lucide-react';
+import { citationTarget, formatPages } from '../utils/citations';
 import './FlowDiagram.css';
 
-const FlowDiagram = ({ flow, allFlows = [], onFlowSelect, showCitations = true, onModuleFlowClick }) => {
+const FlowDiagram = ({ flow, allFlows = [], onFlowSelect, showCitations = true, onModuleFlowClick, onDocumentSelect }) => {
   const [nodes, setNodes] = useState([]);
   const [containerSize, setContainerSize] = useState({ width: 800, height: 600 });
   const [zoomLevel, setZoomLevel] = useState(1);
@@ -510,6 +511,18 @@ const FlowDiagram = ({ flow, allFlows = [], onFlowSelect, showCitations = true,
   const svgHeight = bounds.maxY - bounds.minY + 200;
   const viewBox = `${bounds.minX - 50} ${bounds.minY - 50} ${svgWidth} ${svgHeight}`;
 
+  // Cited pages of each step (see withPageCitations), one row per citation
+  const stepCitations = (flow.steps || []).flatMap((step, index) => (
+    step && typeof step === 'object'
+      ? (step.source_pages || []).map(citation => ({
+          index,
+          text: step.action || step.description || step.step_description || '',
+          step,
+          citation
+        }))
+      : []
+  ));
+
   return (
     <div className="flow-diagram" ref={containerRef}>
       <div className="zoom-controls">
@@ -588,6 +601,25 @@ const FlowDiagram = ({ flow, allFlows = [], onFlowSelect, showCitations = true,
           </ul>
         </div>
       )}
+      {onDocumentSelect && stepCitations.length > 0 && (
+        <div className="flow-step-sources-panel">
+          <h4>Step Sources</h4>
+          <ul>
+            {stepCitations.map(({ index, text, step, citation }) => (
+              <li key={`${index}-${citation.anchor}`}>
+                <span className="flow-step-source-step" title={text}>Step {index + 1}</span>
+                <button
+                  className="flow-dependency-link"
+                  onClick={() => onDocumentSelect(citationTarget(step, citation.document))}
+                  title={text}
+                >
+                  {citation.path.split('/').pop()} ({formatPages(citation.pages)})
+                </button>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
       {flow.related_flows && flow.related_flows.length > 0 && (
         <div className="flow-dependencies-panel">
           <h4>Related Flows</h4>
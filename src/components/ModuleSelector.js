@@ -4,6 +4,9 @@ import SearchBar from './SearchBar';
 import { ChevronDown, ChevronRight } from 'lucide-react';
 import './ModuleSelector.css';
 
+// Completions that make sense as a filter over a module's flows
+const FLOW_SUGGESTION_TYPES = ['flow', 'category', 'step'];
+
 const ModuleSelector = ({
   modules,
   selectedModule,
@@ -128,6 +131,7 @@ const ModuleSelector = ({
                       value={searchTerm}
                       onChange={onSearchChange}
                       placeholder="Search flows..."
+                      autocomplete={{ module: module.id, types: FLOW_SUGGESTION_TYPES }}
                     />
                   </div>
                 )}
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { Document, Page, pdfjs } from 'react-pdf';
 import { ChevronLeft, ChevronRight, Download, ZoomIn, ZoomOut } from 'lucide-react';
+import { formatPages } from '../utils/citations';
 import './PDFViewer.css';
 import 'react-pdf/dist/esm/Page/AnnotationLayer.css';
 import 'react-pdf/dist/esm/Page/TextLayer.css';
@@ -8,21 +9,31 @@ import 'react-pdf/dist/esm/Page/TextLayer.css';
 // Configure PDF.js worker
 pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.js`;
 
-const PDFViewer = ({ pdfPath }) => {
+// Fetch only the byte ranges of the pages rendered instead of the whole file
+const RANGE_OPTIONS = { disableAutoFetch: true, disableStream: true };
+
+// pages: optional [first, last] cited range (see build_page_citations.py) to keep to
+const PDFViewer = ({ pdfPath, page, pages }) => {
   const [numPages, setNumPages] = useState(null);
   const [pageNumber, setPageNumber] = useState(1);
   const [scale, setScale] = useState(1.0);
   const [error, setError] = useState(null);
+  const [showAllPages, setShowAllPages] = useState(false);
+
+  const cited = Boolean(pages) && !showAllPages;
+  const firstPage = cited ? pages[0] : 1;
+  const lastPage = cited ? Math.min(pages[1], numPages || pages[1]) : numPages;
 
-  // Construct the full path to the PDF
-  const fullPdfPath = `/pdfs/${pdfPath}`;
+  // Served from public/pdfs; PUBLIC_URL for GitHub Pages deployment
+  const fullPdfPath = `${process.env.PUBLIC_URL}/pdfs/${pdfPath}`;
 
   console.log('Loading PDF from:', fullPdfPath);
   console.log('Original path:', pdfPath);
 
   const onDocumentLoadSuccess = ({ numPages }) => {
     setNumPages(numPages);
-    setPageNumber(1);
+    // Open at the requested page, e.g. a hit from the page index, or the first cited page
+    setPageNumber(Math.min(Math.max(page || (pages ? pages[0] : 1), 1), numPages));
     setError(null);
   };
 
@@ -38,11 +49,18 @@ const PDFViewer = ({ pdfPath }) => {
   };
 
   const previousPage = () => {
-    setPageNumber(prevPageNumber => Math.max(prevPageNumber - 1, 1));
+    setPageNumber(prevPageNumber => Math.max(prevPageNumber - 1, firstPage));
   };
 
   const nextPage = () => {
-    setPageNumber(prevPageNumber => Math.min(prevPageNumber + 1, numPages));
+    setPageNumber(prevPageNumber => Math.min(prevPageNumber + 1, lastPage));
+  };
+
+  const toggleAllPages = () => {
+    if (showAllPages) {
+      setPageNumber(prevPageNumber => Math.min(Math.max(prevPageNumber, pages[0]), pages[1]));
+    }
+    setShowAllPages(!showAllPages);
   };
 
   const zoomIn = () => {
@@ -85,15 +103,21 @@ const PDFViewer = ({ pdfPath }) => {
   return (
     <div className="pdf-viewer">
       <div className="pdf-controls">
-        <button onClick={previousPage} disabled={pageNumber <= 1}>
+        <button onClick={previousPage} disabled={pageNumber <= firstPage}>
           <ChevronLeft size={20} />
         </button>
         <span className="page-info">
           Page {pageNumber} of {numPages || '-'}
+          {cited && ` (cited ${formatPages(pages)})`}
         </span>
-        <button onClick={nextPage} disabled={pageNumber >= numPages}>
+        <button onClick={nextPage} disabled={pageNumber >= lastPage}>
           <ChevronRight size={20} />
         </button>
+        {pages && (
+          <button onClick={toggleAllPages} title="Toggle between the cited pages and the whole document">
+            {showAllPages ? 'Cited pages' : 'All pages'}
+          </button>
+        )}
         <div className="pdf-controls-separator" />
         <button onClick={zoomOut} title="Zoom Out">
           <ZoomOut size={20} />
@@ -110,6 +134,7 @@ const PDFViewer = ({ pdfPath }) => {
       <div className="pdf-document">
         <Document
           file={fullPdfPath}
+          options={RANGE_OPTIONS}
           onLoadSuccess={onDocumentLoadSuccess}
           onLoadError={onDocumentLoadError}
           loading={
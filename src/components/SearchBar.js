@@ -1,19 +1,70 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { Search, X } from 'lucide-react';
+import { loadAutocomplete, complete } from '../utils/autocomplete';
 import './SearchBar.css';
 
-const SearchBar = ({ value, onChange, placeholder = 'Search...' }) => {
+// autocomplete: optional { module, types, limit } to suggest completions while typing
+const SearchBar = ({ value, onChange, placeholder = 'Search...', autocomplete }) => {
+  const [dictionary, setDictionary] = useState(null);
+  const [open, setOpen] = useState(false);
+  const [highlighted, setHighlighted] = useState(-1);
+  const enabled = Boolean(autocomplete);
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+    let cancelled = false;
+    loadAutocomplete().then(loaded => {
+      if (!cancelled) setDictionary(loaded);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [enabled]);
+
+  const suggestions = dictionary && open && value
+    ? complete(dictionary, value, autocomplete)
+    : [];
+
   const handleClear = () => {
     onChange('');
   };
 
+  const handleChange = (e) => {
+    onChange(e.target.value);
+    setOpen(true);
+    setHighlighted(-1);
+  };
+
+  const selectSuggestion = (suggestion) => {
+    onChange(suggestion.text);
+    setOpen(false);
+  };
+
+  const handleKeyDown = (e) => {
+    if (!suggestions.length) return;
+    if (e.key === 'ArrowDown') {
+      e.preventDefault();
+      setHighlighted(prev => Math.min(prev + 1, suggestions.length - 1));
+    } else if (e.key === 'ArrowUp') {
+      e.preventDefault();
+      setHighlighted(prev => Math.max(prev - 1, -1));
+    } else if (e.key === 'Enter' && highlighted >= 0) {
+      e.preventDefault();
+      selectSuggestion(suggestions[highlighted]);
+    } else if (e.key === 'Escape') {
+      setOpen(false);
+    }
+  };
+
   return (
     <div className="search-bar">
       <Search size={16} className="search-icon" />
       <input
         type="text"
         value={value}
-        onChange={(e) => onChange(e.target.value)}
+        onChange={handleChange}
+        onKeyDown={handleKeyDown}
+        onBlur={() => setOpen(false)}
         placeholder={placeholder}
         className="search-input"
       />
@@ -22,8 +73,26 @@ const SearchBar = ({ value, onChange, placeholder = 'Search...' }) => {
           <X size={16} />
         </button>
       )}
+      {suggestions.length > 0 && (
+        <ul className="search-suggestions">
+          {suggestions.map((suggestion, i) => (
+            <li
+              key={`${suggestion.type}-${suggestion.text}-${suggestion.module}`}
+              className={`search-suggestion ${i === highlighted ? 'highlighted' : ''}`}
+              // Select before the input's blur closes the list
+              onMouseDown={(e) => {
+                e.preventDefault();
+                selectSuggestion(suggestion);
+              }}
+            >
+              <span className="search-suggestion-text">{suggestion.text}</span>
+              <span className="search-suggestion-type">{suggestion.type}</span>
+            </li>
+          ))}
+        </ul>
+      )}
     </div>
   );
 };
 
-export default SearchBar;
\ No newline at end of file
+export default SearchBar;
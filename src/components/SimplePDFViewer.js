@@ -1,9 +1,15 @@
 import React, { useState, useEffect } from 'react';
 import { FileText, ExternalLink, AlertCircle, Download } from 'lucide-react';
+import { formatPages } from '../utils/citations';
 import './PDFViewer.css';
 
-const SimplePDFViewer = ({ pdfPath }) => {
+// pdfPath may carry a search hit's page anchor ("<pdf>#page=N"); a page prop also opens at that page.
+// pages: optional [first, last] cited range (see build_page_citations.py), shown next to the name.
+// The browser's viewer opens at the anchor's page but still loads the whole file.
+const SimplePDFViewer = ({ pdfPath: pdfTarget, page, pages }) => {
   const [pdfStatus, setPdfStatus] = useState('loading'); // 'loading', 'ready', 'error'
+  const [pdfPath, anchor] = pdfTarget.split('#');
+  const pageAnchor = page ? `#page=${page}` : (anchor ? `#${anchor}` : '');
 
   // React serves files from public folder at the root
   // So /pdfs/... will serve from public/pdfs/...
@@ -25,7 +31,7 @@ const SimplePDFViewer = ({ pdfPath }) => {
   }, [pdfPath]);
 
   const openInNewTab = () => {
-    window.open(fullPdfPath, '_blank');
+    window.open(fullPdfPath + pageAnchor, '_blank');
   };
 
   const downloadPDF = () => {
@@ -43,6 +49,7 @@ const SimplePDFViewer = ({ pdfPath }) => {
         <div className="pdf-info">
           <FileText size={20} />
           <span>{pdfPath.split('/').pop()}</span>
+          {pages && <span className="pdf-cited-pages">{formatPages(pages)}</span>}
         </div>
         <div className="pdf-actions">
           <button onClick={downloadPDF} title="Download PDF">
@@ -80,7 +87,9 @@ const SimplePDFViewer = ({ pdfPath }) => {
         <div className="pdf-embed-container">
           {/* Use iframe to display PDF - most browsers support this */}
           <iframe
-            src={fullPdfPath}
+            // Browser PDF viewers open at the page named by #page=N; remount to jump between pages
+            key={pageAnchor}
+            src={fullPdfPath + pageAnchor}
             title={pdfPath.split('/').pop()}
             width="100%"
             height="100%"
@@ -0,0 +1,94 @@
+// Client-side completions from the dictionary built by build_autocomplete.py
+
+const DEFAULT_LIMIT = 8;
+
+let dictionaryPromise = null;
+
+// Fetch the dictionary once; resolves to null if it has not been built
+function loadAutocomplete() {
+  if (!dictionaryPromise) {
+    dictionaryPromise = fetch(`${process.env.PUBLIC_URL}/data/generated/autocomplete.json`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(dictionary => dictionary && {
+        ...dictionary,
+        heads: dictionary.blocks.map(block => block[0]),
+        // Keys are word suffixes of their entry, so a key of full length is a match at the start
+        lengths: dictionary.entries.map(([text]) => normalize(text).length)
+      })
+      .catch(() => null);
+  }
+  return dictionaryPromise;
+}
+
+// Same normalisation as build_autocomplete.normalize()
+function normalize(text) {
+  return text.toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+}
+
+// Keys starting with prefix, decoding only the front-coded blocks that can hold them
+function* iterKeys(dictionary, prefix) {
+  const { heads, blocks } = dictionary;
+  let low = 0;
+  let high = heads.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (heads[mid] < prefix) low = mid + 1;
+    else high = mid;
+  }
+
+  for (let b = Math.max(low - 1, 0); b < blocks.length; b++) {
+    const [head, headEntry, rest] = blocks[b];
+    let key = head;
+    for (let i = -1; i < rest.length; i++) {
+      let entryId = headEntry;
+      if (i >= 0) {
+        const [shared, suffix, id] = rest[i];
+        key = key.slice(0, shared) + suffix;
+        entryId = id;
+      }
+      if (key.startsWith(prefix)) {
+        yield [key, entryId];
+      } else if (key > prefix) {
+        return;
+      }
+    }
+  }
+}
+
+// Top completions for text, heaviest first: [{ text, type, weight, module, target }].
+// Matches at the start of a completion count double.
+function complete(dictionary, text, { limit = DEFAULT_LIMIT, module, types } = {}) {
+  let prefix = normalize(text);
+  if (!prefix) return [];
+  if (/\s$/.test(text)) prefix += ' ';
+
+  const scores = new Map();
+  for (const [key, entryId] of iterKeys(dictionary, prefix)) {
+    const [, type, weight, entryModule] = dictionary.entries[entryId];
+    if ((module && entryModule !== module) || (types && !types.includes(type))) continue;
+    const score = weight * (dictionary.lengths[entryId] === key.length ? 2 : 1);
+    if (!(scores.get(entryId) >= score)) scores.set(entryId, score);
+  }
+
+  // Keep the best `limit` by insertion; short prefixes match hundreds of entries
+  const top = [];
+  for (const [entryId, score] of scores) {
+    let i = top.length;
+    while (i > 0 && (score > top[i - 1][1] || (score === top[i - 1][1] && entryId < top[i - 1][0]))) i--;
+    if (i < limit) {
+      top.splice(i, 0, [entryId, score]);
+      if (top.length > limit) top.pop();
+    }
+  }
+
+  return top.map(([entryId]) => {
+    const [entryText, type, weight, entryModule, target] = dictionary.entries[entryId];
+    return { text: entryText, type, weight, module: entryModule, target };
+  });
+}
+
+export {
+  loadAutocomplete,
+  complete,
+  normalize
+};
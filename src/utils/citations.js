@@ -0,0 +1,67 @@
+// Page-level citations of source_documents, built by build_page_citations.py
+
+let citationsPromise = null;
+
+// Fetch generated/page_citations.json once; resolves to null if it has not been built
+function loadPageCitations() {
+  if (!citationsPromise) {
+    citationsPromise = fetch(`${process.env.PUBLIC_URL}/data/generated/page_citations.json`)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return citationsPromise;
+}
+
+// Key of a flow in page_citations.json, as flow_data.get_flow_ref()
+function flowRef(flow) {
+  return flow.flow_id || flow.id || (flow.flow_name || flow.name || '').replace(/[ -]/g, '_');
+}
+
+// The flow with source_pages on it and its steps, unless the module file already has them
+async function withPageCitations(flow) {
+  if (!flow?.module || flow.source_pages) return flow;
+  const citations = await loadPageCitations();
+  const entry = citations?.modules[flow.module]?.[flowRef(flow)];
+  if (!entry) return flow;
+  return {
+    ...flow,
+    source_pages: entry.source_pages,
+    steps: (flow.steps || []).map((step, i) => (
+      step && typeof step === 'object' && entry.steps[i] ? { ...step, source_pages: entry.steps[i] } : step
+    ))
+  };
+}
+
+// The source_pages entry for one of a flow's (or step's) source_documents, if any
+function pageCitation(item, doc) {
+  return (item?.source_pages || []).find(citation => citation.document === doc) || null;
+}
+
+// What to open for a cited document: its cited page anchor ("<pdf>#page=N") when known
+function citationTarget(item, doc) {
+  const citation = pageCitation(item, doc);
+  return citation ? citation.anchor : doc;
+}
+
+// The citation of a flow or one of its steps that citationTarget() returned as target, if any
+function findCitation(flow, target) {
+  for (const item of [flow, ...(flow?.steps || [])]) {
+    const citation = (item?.source_pages || []).find(c => c.anchor === target);
+    if (citation) return citation;
+  }
+  return null;
+}
+
+// "p. 3" or "pp. 3–5"
+function formatPages([first, last]) {
+  return first === last ? `p. ${first}` : `pp. ${first}–${last}`;
+}
+
+export {
+  loadPageCitations,
+  withPageCitations,
+  pageCitation,
+  citationTarget,
+  findCitation,
+  formatPages
+};
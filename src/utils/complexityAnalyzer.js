@@ -13,7 +13,7 @@ class ComplexityAnalyzer {
       'listen',
       'measure',
       'publish',
-      'brandwatch_reviews',
+      'reviews',
       'vizia'
     ];
   }
@@ -166,8 +166,55 @@ class ComplexityAnalyzer {
     };
   }
 
+  // Load analysis precomputed by build_complexity.py as { analysis, overallStats },
+  // or null if it has not been built
+  async loadPrecomputedAnalysis() {
+    try {
+      const response = await fetch(`${process.env.PUBLIC_URL}/data/generated/complexity/index.json`);
+      if (!response.ok) {
+        return null;
+      }
+      const index = await response.json();
+      const analysis = {};
+
+      await Promise.all(Object.keys(index.modules).map(async (module) => {
+        const moduleResponse = await fetch(`${process.env.PUBLIC_URL}/data/generated/complexity/${module}.json`);
+        if (moduleResponse.ok) {
+          analysis[module] = await moduleResponse.json();
+        }
+      }));
+
+      // The precomputed overall stats only hold when every module loaded
+      const complete = Object.keys(analysis).length === Object.keys(index.modules).length;
+      return {
+        analysis,
+        overallStats: complete && index.overall ? index.overall : this.calculateOverallStats(analysis)
+      };
+    } catch (error) {
+      return null;
+    }
+  }
+
+  // Analyze all modules and compute the overall statistics, using the
+  // precomputed analysis when it has been built
+  async analyzeAllModulesWithStats() {
+    const precomputed = await this.loadPrecomputedAnalysis();
+    if (precomputed) {
+      return precomputed;
+    }
+
+    const analysis = await this.analyzeModules();
+    return { analysis, overallStats: this.calculateOverallStats(analysis) };
+  }
+
   // Analyze all modules
   async analyzeAllModules() {
+    const { analysis } = await this.analyzeAllModulesWithStats();
+    return analysis;
+  }
+
+  // Analyze all modules in the browser
+  async analyzeModules() {
     const moduleData = await this.loadAllModuleData();
     const analysis = {};
 
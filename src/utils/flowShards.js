@@ -0,0 +1,89 @@
+// Flow loading from the per-flow shards built by build_flow_shards.py,
+// falling back to the module files when a module has no shards
+
+const SHARDS_URL = `${process.env.PUBLIC_URL}/data/generated/flows`;
+
+const shardCache = new Map();
+
+// Flows list of a module file, whichever of the layouts it uses
+function extractFlows(data) {
+  if (Array.isArray(data)) return data;
+  if (data.flows) return data.flows;
+  if (data.user_flows) return data.user_flows;
+
+  // Nested structure (e.g., listen_user_flows, brandwatch_engage_user_flows)
+  for (const key of Object.keys(data)) {
+    if (data[key]?.flows) return data[key].flows;
+    if (data[key]?.user_flows) return data[key].user_flows;
+    if (Array.isArray(data[key])) return data[key];
+  }
+  return [];
+}
+
+// Every flow of a module, in full, from its module file (citations file first)
+async function fetchModuleFlows(moduleId) {
+  let response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows_with_citations.json?t=${Date.now()}`);
+  if (!response.ok) {
+    response = await fetch(`${process.env.PUBLIC_URL}/data/${moduleId}_user_flows.json?t=${Date.now()}`);
+  }
+  if (!response.ok) {
+    throw new Error(`Failed to load flows for ${moduleId}`);
+  }
+  return extractFlows(await response.json()).map(flow => ({ ...flow, module: moduleId }));
+}
+
+// A module's flows as summaries from its shard index; resolves to null without shards.
+// Summaries hold every flow field but the steps, plus `shard` for loadFlow().
+async function loadFlowIndex(moduleId) {
+  try {
+    const response = await fetch(`${SHARDS_URL}/${moduleId}/index.json?t=${Date.now()}`);
+    if (!response.ok) return null;
+    const index = await response.json();
+    return index.flows.map(row => ({
+      ...row.summary,
+      module: moduleId,
+      shard: { file: row.file, hash: row.hash, steps: row.steps }
+    }));
+  } catch (error) {
+    return null;
+  }
+}
+
+// Summaries from the shard index, or the full flows when the module has no shards
+async function loadModuleFlows(moduleId) {
+  return (await loadFlowIndex(moduleId)) || fetchModuleFlows(moduleId);
+}
+
+// The full flow for a summary from loadFlowIndex(); full flows are returned as they are
+function loadFlow(flow) {
+  if (!flow?.shard) return Promise.resolve(flow);
+  // The content hash changes with the flow, so a cached shard is never stale
+  const url = `${SHARDS_URL}/${flow.module}/${flow.shard.file}?v=${flow.shard.hash}`;
+  if (!shardCache.has(url)) {
+    shardCache.set(url, fetch(url)
+      .then(response => {
+        if (!response.ok) throw new Error(`Failed to load ${flow.module}/${flow.shard.file}`);
+        return response.json();
+      })
+      .then(data => ({ ...data, module: flow.module }))
+      .catch(error => {
+        shardCache.delete(url);
+        throw error;
+      }));
+  }
+  return shardCache.get(url);
+}
+
+// Whether any of the flows is a summary without its steps
+function hasSummaries(flows) {
+  return flows.some(flow => flow.shard);
+}
+
+export {
+  extractFlows,
+  fetchModuleFlows,
+  loadFlowIndex,
+  loadModuleFlows,
+  loadFlow,
+  hasSummaries
+};
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Shared text normalisation for the indexing and verification scripts.
+"""
+
+import re
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Words too common in the documentation to say anything about a match
+STOP_WORDS = frozenset("""
+a an and are as at be by can for from has have if in into is it its of on
+or that the their then this to was will with you your
+""".split())
+
+
+def tokenize(text):
+    """Lower-cased word tokens"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def content_tokens(text):
+    """Tokens with stop words removed"""
+    return [token for token in tokenize(text) if token not in STOP_WORDS]
+
+
+# Longest first so "ations" wins over "s"
+SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ies', 'ied', 'ers', 'er', 'es', 'ed', 'ly', 's', 'e')
+
+
+def stem(token):
+    """Crude suffix stripping so "creating", "creates" and "create" meet"""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            return token + 'y' if suffix in ('ies', 'ied') else token
+    return token
+
+
+def stemmed_tokens(text):
+    """Content tokens reduced to their stems"""
+    return [stem(token) for token in content_tokens(text)]
+
+
+def content_spans(text):
+    """(start, end) in text of each content token: position i of
+    stemmed_tokens(text) is text[start:end] of the i-th span"""
+    lowered = text.lower()
+    origin = None
+    if len(lowered) != len(text):
+        # Lower-casing changed the length (e.g. "İ"), so map offsets back
+        origin = []
+        for i, c in enumerate(text):
+            origin.extend([i] * len(c.lower()))
+        origin.append(len(text))
+    spans = [match.span() for match in TOKEN_RE.finditer(lowered) if match.group() not in STOP_WORDS]
+    if origin:
+        spans = [(origin[start], origin[end - 1] + 1) for start, end in spans]
+    return spans
+
+
+def code_point_spans(text, spans):
+    """Inverse of utf16_spans: UTF-16 offsets back to indices into text"""
+    if all(ord(c) <= 0xFFFF for c in text):
+        return spans
+    index_of = {}
+    units = 0
+    for i, c in enumerate(text):
+        index_of[units] = i
+        units += 2 if ord(c) > 0xFFFF else 1
+    index_of[units] = len(text)
+    return [(index_of[start], index_of[end]) for start, end in spans]
+
+
+def utf16_spans(text, spans):
+    """Spans as UTF-16 code unit offsets, the string indices JavaScript uses"""
+    if all(ord(c) <= 0xFFFF for c in text):
+        return spans
+    units = [0]
+    for c in text:
+        units.append(units[-1] + (2 if ord(c) > 0xFFFF else 1))
+    return [(units[start], units[end]) for start, end in spans]
+
+
+def shingles(tokens, k=2):
+    """Set of k-word shingles; short token lists fall back to single words"""
+    if len(tokens) < k:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+SNIPPET_CHARS = 160
+SNIPPET_LEAD_TOKENS = 4
+
+
+def cut_snippet(text, spans, positions, max_chars=SNIPPET_CHARS):
+    """Excerpt of text around the matched token positions.
+
+    spans are the content token spans of text (see content_spans) and
+    positions index into them. The window opens a few tokens before the
+    run of matches that fits most of them into max_chars. Returns
+    (snippet, [(start, end) of each match within the snippet]); cut ends
+    are marked with an ellipsis and line breaks become spaces.
+    """
+    hits = sorted({p for p in positions if 0 <= p < len(spans)})
+    if not hits:
+        end = len(text)
+        if end > max_chars:
+            end = max([token_end for _, token_end in spans if token_end <= max_chars], default=max_chars)
+        return text[:end].replace('\n', ' ') + ('…' if end < len(text) else ''), []
+
+    best, best_count, last = 0, 0, 0
+    for first in range(len(hits)):
+        last = max(last, first)
+        while last + 1 < len(hits) and spans[hits[last + 1]][1] - spans[hits[first]][0] <= max_chars:
+            last += 1
+        if last - first + 1 > best_count:
+            best, best_count = first, last - first + 1
+    covered = hits[best:best + best_count]
+
+    lead = max(covered[0] - SNIPPET_LEAD_TOKENS, 0)
+    while lead < covered[0] and spans[covered[-1]][1] - spans[lead][0] > max_chars:
+        lead += 1
+    start = 0 if lead == 0 else spans[lead][0]
+    if len(text) - start <= max_chars:
+        end = len(text)
+    else:
+        end = spans[covered[-1]][1]
+        for _, token_end in spans[covered[-1] + 1:]:
+            if token_end - start > max_chars:
+                break
+            end = token_end
+
+    prefix = '…' if start > 0 else ''
+    shift = len(prefix) - start
+    snippet = prefix + text[start:end].replace('\n', ' ') + ('…' if end < len(text) else '')
+    highlights = [(spans[p][0] + shift, spans[p][1] + shift)
+                  for p in hits if spans[p][0] >= start and spans[p][1] <= end]
+    return snippet, highlights
+
+
+def mark_highlights(snippet, highlights, before='[', after=']'):
+    """Snippet with each highlight wrapped in markers, for console output"""
+    parts = []
+    previous = 0
+    for start, end in highlights:
+        parts.extend((snippet[previous:start], before, snippet[start:end], after))
+        previous = end
+    parts.append(snippet[previous:])
+    return ''.join(parts)
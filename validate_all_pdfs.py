@@ -1,30 +1,97 @@
 #!/usr/bin/env python3
+"""
+Validate all PDF references across all modules.
+
+Modules are validated concurrently on a thread pool. Besides the console
+summary, results can be written as a JSON report and as JUnit XML
+(one testsuite per module, one testcase per reference) for CI:
+
+    python3 validate_all_pdfs.py --json reports/pdfs.json --junit reports/pdfs.xml
+"""
+import argparse
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 import sys
+import time
+from xml.etree import ElementTree
+
+from flow_data import (
+    MODULE_FILES,
+    PDFS_PATH,
+    find_flows,
+    get_flow_id,
+    iter_source_documents,
+    module_file_path,
+)
+from pdf_paths import module_dir_name, pdf_absolute_path, resolve_pdf_path
+
+def validate_module_pdfs(module_name):
+    """Validate one module's PDF references and return a result dict"""
+    start = time.perf_counter()
+    result = {
+        'module': module_name,
+        'file': MODULE_FILES[module_name],
+        'error': None,
+        'references': [],
+        'failures': [],
+        'duration_s': 0.0
+    }
+
+    json_file = module_file_path(module_name)
+    if not os.path.exists(json_file):
+        result['error'] = f"Missing JSON file: {MODULE_FILES[module_name]}"
+        result['duration_s'] = time.perf_counter() - start
+        return result
+
+    try:
+        with open(json_file, 'r') as f:
+            data = json.load(f)
+    except ValueError as e:
+        result['error'] = f"Invalid JSON in {MODULE_FILES[module_name]}: {e}"
+        result['duration_s'] = time.perf_counter() - start
+        return result
+
+    # Extract flows based on module structure variations
+    flows_pointer, flows = find_flows(data)
+
+    module_path = os.path.join(PDFS_PATH, module_dir_name(module_name))
+    similar_cache = {}
+
+    for i, flow in enumerate(flows):
+        # Flow-level and step-level source_documents
+        for pointer, doc in iter_source_documents(flow):
+            # Normalise the citation to public/pdfs/<Module>/<path>
+            clean_doc = resolve_pdf_path(doc, module_name)
+            ref = {
+                'flow_id': get_flow_id(flow),
+                'pointer': f'{flows_pointer}/{i}{pointer}',
+                'document': doc,
+                'resolved': clean_doc,
+                'valid': os.path.exists(pdf_absolute_path(doc, module_name))
+            }
+            result['references'].append(ref)
 
-def validate_all_module_pdfs():
-    """Validate all PDF references across all modules"""
-
-    base_path = '/Users/ashutoshbijoor/Documents/Accion Labs/Projects/Cision/Nexus/Brandwatch/brandwatch-docs-viewer'
-    public_pdfs_path = os.path.join(base_path, 'public', 'pdfs')
-
-    # All module JSON files
-    modules = [
-        'advertise',
-        'audience',
-        'benchmark',
-        'brandwatch_reviews',
-        'consumer_research',
-        'engage',
-        'influence',
-        'listen',
-        'measure',
-        'publish',
-        'vizia'
-    ]
+            if not ref['valid']:
+                if clean_doc not in similar_cache:
+                    similar = find_similar_pdfs(clean_doc, module_path)
+                    similar_cache[clean_doc] = (
+                        f"{module_dir_name(module_name)}/{similar}" if similar else None
+                    )
+                result['failures'].append({**ref, 'possible_match': similar_cache[clean_doc]})
 
+    result['duration_s'] = time.perf_counter() - start
+    return result
+
+def validate_all_module_pdfs(workers=None):
+    """Validate all modules concurrently; returns results in module order"""
+    with ThreadPoolExecutor(max_workers=workers or len(MODULE_FILES)) as pool:
+        return list(pool.map(validate_module_pdfs, MODULE_FILES))
+
+def print_report(results):
+    """Print the human-readable summary, returning the number of issues"""
     total_issues = 0
     total_refs = 0
 
@@ -32,84 +99,33 @@ def validate_all_module_pdfs():
     print("VALIDATING ALL MODULE PDF REFERENCES")
     print("=" * 80)
 
-    for module_name in modules:
-        json_file = os.path.join(base_path, 'public', 'data', f'{module_name}_user_flows_with_citations.json')
-
-        if not os.path.exists(json_file):
-            print(f"\n❌ Missing JSON file: {module_name}_user_flows_with_citations.json")
+    for result in results:
+        if result['error']:
+            print(f"\n❌ {result['error']}")
+            total_issues += 1
             continue
 
-        print(f"\n📁 Module: {module_name.upper()}")
+        print(f"\n📁 Module: {result['module'].upper()}")
         print("-" * 40)
 
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-
-        # Extract flows based on module structure variations
-        flows = []
-        if f'brandwatch_{module_name}_user_flows' in data:
-            flows = data[f'brandwatch_{module_name}_user_flows'].get('user_flows', [])
-        elif 'user_flows' in data:
-            flows = data.get('user_flows', [])
-        elif 'flows' in data:
-            flows = data.get('flows', [])
-        elif isinstance(data, list):
-            flows = data
-
-        module_refs = 0
-        module_issues = 0
-        missing_pdfs = set()
-
-        for flow in flows:
-            # Check main source_documents
-            if 'source_documents' in flow:
-                for doc in flow['source_documents']:
-                    module_refs += 1
-                    total_refs += 1
-
-                    # Clean any "Source: " prefix if present
-                    clean_doc = doc.replace('Source: ', '') if doc.startswith('Source: ') else doc
-
-                    # Construct full path
-                    module_dir = get_module_dir_name(module_name)
-                    full_path = os.path.join(public_pdfs_path, module_dir, clean_doc)
-
-                    if not os.path.exists(full_path):
-                        missing_pdfs.add(clean_doc)
-                        module_issues += 1
-                        total_issues += 1
-
-            # Also check steps if they have source_documents
-            if 'steps' in flow:
-                for step in flow['steps']:
-                    if isinstance(step, dict) and 'source_documents' in step:
-                        for doc in step['source_documents']:
-                            module_refs += 1
-                            total_refs += 1
-
-                            clean_doc = doc.replace('Source: ', '') if doc.startswith('Source: ') else doc
-                            module_dir = get_module_dir_name(module_name)
-                            full_path = os.path.join(public_pdfs_path, module_dir, clean_doc)
-
-                            if not os.path.exists(full_path):
-                                missing_pdfs.add(clean_doc)
-                                module_issues += 1
-                                total_issues += 1
+        module_refs = len(result['references'])
+        module_issues = len(result['failures'])
+        total_refs += module_refs
+        total_issues += module_issues
 
         # Report module results
         if module_issues == 0:
-            print(f"✅ All {module_refs} PDF references are valid")
+            print(f"✅ All {module_refs} PDF references are valid ({result['duration_s'] * 1000:.1f} ms)")
         else:
             print(f"❌ Found {module_issues}/{module_refs} invalid PDF references:")
-            for pdf in sorted(missing_pdfs):
-                print(f"   • {pdf}")
-                # Try to find similar files
-                module_dir = get_module_dir_name(module_name)
-                module_path = os.path.join(public_pdfs_path, module_dir)
-                if os.path.exists(module_path):
-                    similar = find_similar_pdfs(pdf, module_path)
-                    if similar:
-                        print(f"     Possible match: {similar}")
+            reported = set()
+            for failure in result['failures']:
+                if failure['resolved'] in reported:
+                    continue
+                reported.add(failure['resolved'])
+                print(f"   • {failure['resolved']}")
+                if failure['possible_match']:
+                    print(f"     Possible match: {failure['possible_match']}")
 
     print("\n" + "=" * 80)
     print("VALIDATION SUMMARY")
@@ -124,22 +140,71 @@ def validate_all_module_pdfs():
 
     return total_issues
 
-def get_module_dir_name(module_name):
-    """Get the actual directory name for a module"""
-    dir_mapping = {
-        'advertise': 'Advertise',
-        'audience': 'Audience',
-        'benchmark': 'Benchmark',
-        'brandwatch_reviews': 'Brandwatch Reviews',
-        'consumer_research': 'Consumer Research',
-        'engage': 'Engage',
-        'influence': 'Influence',
-        'listen': 'Listen',
-        'measure': 'Measure',
-        'publish': 'Publish',
-        'vizia': 'VIZIA'
+def build_json_report(results, elapsed_s):
+    """Machine-readable report with per-module timings and failures"""
+    modules = {}
+    for result in results:
+        modules[result['module']] = {
+            'file': result['file'],
+            'error': result['error'],
+            'references': len(result['references']),
+            'failures': result['failures'],
+            'duration_ms': round(result['duration_s'] * 1000, 3)
+        }
+
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'duration_ms': round(elapsed_s * 1000, 3),
+        'total_references': sum(len(r['references']) for r in results),
+        'total_failures': sum(len(r['failures']) for r in results),
+        'total_errors': sum(1 for r in results if r['error']),
+        'modules': modules
     }
-    return dir_mapping.get(module_name, module_name)
+
+def build_junit_report(results, elapsed_s):
+    """JUnit XML: one testsuite per module, one testcase per reference"""
+    suites = ElementTree.Element('testsuites', {
+        'name': 'pdf-references',
+        'tests': str(sum(len(r['references']) for r in results)),
+        'failures': str(sum(len(r['failures']) for r in results)),
+        'errors': str(sum(1 for r in results if r['error'])),
+        'time': f'{elapsed_s:.6f}'
+    })
+
+    for result in results:
+        suite = ElementTree.SubElement(suites, 'testsuite', {
+            'name': result['module'],
+            'tests': str(len(result['references'])),
+            'failures': str(len(result['failures'])),
+            'errors': '1' if result['error'] else '0',
+            'time': f"{result['duration_s']:.6f}",
+            'file': f"public/data/{result['file']}"
+        })
+
+        if result['error']:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': result['module'],
+                'name': result['file']
+            })
+            ElementTree.SubElement(case, 'error', {'message': result['error']})
+            continue
+
+        for ref in result['references']:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': f"{result['module']}.{ref['flow_id']}",
+                'name': ref['pointer'],
+                'file': f"public/data/{result['file']}"
+            })
+            if not ref['valid']:
+                failure = next(f for f in result['failures'] if f['pointer'] == ref['pointer'])
+                message = f"PDF not found: {ref['resolved']}"
+                if failure['possible_match']:
+                    message += f" (possible match: {failure['possible_match']})"
+                node = ElementTree.SubElement(case, 'failure', {'message': message})
+                node.text = f"{ref['document']} -> public/pdfs/{ref['resolved']}"
+
+    ElementTree.indent(suites)
+    return ElementTree.ElementTree(suites)
 
 def find_similar_pdfs(target_pdf, module_path):
     """Find similar PDF names in the module directory"""
@@ -170,6 +235,35 @@ def find_similar_pdfs(target_pdf, module_path):
         return best_match
     return None
 
+def main():
+    parser = argparse.ArgumentParser(description='Validate PDF references in all module files')
+    parser.add_argument('--json', metavar='PATH', help='write a JSON report to PATH')
+    parser.add_argument('--junit', metavar='PATH', help='write a JUnit XML report to PATH')
+    parser.add_argument('--workers', type=int, help='thread pool size (default: one per module)')
+    parser.add_argument('--quiet', action='store_true', help='skip the console report')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = validate_all_module_pdfs(args.workers)
+    elapsed_s = time.perf_counter() - start
+
+    if args.quiet:
+        issues = sum(len(r['failures']) + bool(r['error']) for r in results)
+    else:
+        issues = print_report(results)
+        print(f"Validated {len(results)} modules in {elapsed_s * 1000:.1f} ms")
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump(build_json_report(results, elapsed_s), f, indent=2)
+
+    if args.junit:
+        Path(args.junit).parent.mkdir(parents=True, exist_ok=True)
+        build_junit_report(results, elapsed_s).write(args.junit, encoding='utf-8', xml_declaration=True)
+
+    return issues
+
 if __name__ == "__main__":
-    issues = validate_all_module_pdfs()
-    sys.exit(0 if issues == 0 else 1)
\ No newline at end of file
+    issues = main()
+    sys.exit(0 if issues == 0 else 1)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Batch JSON Schema validation for all module flows and cross-module workflows.
+
+The schemas below are compiled once into nested Python closures, so
+validating the whole data set is a single pass with no per-node schema
+interpretation. Errors are reported as <file>#<JSON pointer>.
+
+The flow rules follow api/utils/validation.js, adjusted to the shapes the
+stored data and the Python scripts actually rely on (either flow_name or
+name, structured step objects, required source_documents).
+
+Fast enough to run as a pre-commit gate:
+    # .git/hooks/pre-commit
+    git diff --cached --name-only | grep -q '^public/data/.*\\.json$' || exit 0
+    exec python3 validate_flow_schema.py --quiet
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from flow_data import CROSS_MODULE_FILES, DATA_PATH, MODULE_FILES, find_flows
+
+STRING_LIST = {
+    'type': 'array',
+    'items': {'type': 'string'}
+}
+
+STEP_SCHEMA = {
+    'oneOf': [
+        {'type': 'string', 'minLength': 1},
+        {
+            'type': 'object',
+            'anyOf': [
+                {'required': ['action']},
+                {'required': ['description']}
+            ],
+            'properties': {
+                'step': {'type': 'integer', 'minimum': 1},
+                'step_number': {'type': 'integer', 'minimum': 1},
+                'step_id': {'type': ['string', 'integer']},
+                'action': {'type': 'string', 'minLength': 1},
+                'description': {'type': 'string'},
+                'details': {'type': ['string', 'array']},
+                'user_input': {'type': 'string'},
+                'source_documents': STRING_LIST
+            }
+        }
+    ]
+}
+
+FLOW_SCHEMA = {
+    'type': 'object',
+    'required': ['steps', 'source_documents'],
+    'anyOf': [
+        {'required': ['flow_name']},
+        {'required': ['name']}
+    ],
+    'properties': {
+        'flow_id': {'type': 'string', 'pattern': r'^[A-Za-z0-9_]+$'},
+        'id': {'type': 'string', 'pattern': r'^[A-Za-z0-9_]+$'},
+        'flow_name': {'type': 'string', 'minLength': 1, 'maxLength': 200},
+        'name': {'type': 'string', 'minLength': 1, 'maxLength': 200},
+        'description': {'type': 'string', 'minLength': 1},
+        'flow_description': {'type': 'string', 'minLength': 1},
+        'flowCategory': {'type': 'string'},
+        'category': {'type': 'string'},
+        'steps': {
+            'type': 'array',
+            'minItems': 1,
+            'items': STEP_SCHEMA
+        },
+        'prerequisites': STRING_LIST,
+        'dependencies': STRING_LIST,
+        'related_flows': STRING_LIST,
+        'citations': STRING_LIST,
+        'source_documents': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {'type': 'string', 'pattern': r'\.pdf$'}
+        }
+    }
+}
+
+CROSS_MODULE_SCHEMA = {
+    'type': 'object',
+    'required': ['workflow_id', 'workflow_name', 'description', 'workflow_steps'],
+    'properties': {
+        'workflow_id': {'type': 'string', 'pattern': r'^[A-Za-z0-9_]+$'},
+        'workflow_name': {'type': 'string', 'minLength': 1, 'maxLength': 200},
+        'description': {'type': 'string', 'minLength': 1},
+        'modules_involved': {
+            'type': 'array',
+            'minItems': 2,
+            'items': {'type': 'string', 'enum': list(MODULE_FILES)}
+        },
+        'business_value': {'type': 'string'},
+        'workflow_steps': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'required': ['step_id', 'module', 'step_description'],
+                'properties': {
+                    'step_id': {'type': ['string', 'integer']},
+                    'module': {'type': 'string', 'enum': list(MODULE_FILES)},
+                    'module_flow_reference': {
+                        'type': ['object', 'null'],
+                        'properties': {
+                            'flow_name': {'type': 'string'},
+                            'flow_id': {'type': 'string'},
+                            'description': {'type': 'string'}
+                        }
+                    },
+                    'step_description': {'type': 'string', 'minLength': 1},
+                    'outputs': STRING_LIST,
+                    'inputs': STRING_LIST,
+                    'source_documents': STRING_LIST
+                }
+            }
+        },
+        'prerequisites': STRING_LIST,
+        'source_documents': STRING_LIST
+    }
+}
+
+JSON_TYPES = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None
+}
+
+
+def escape_pointer(token):
+    """Escape a key for use in a JSON pointer (RFC 6901)"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def compile_type_filter(schema):
+    """Predicate telling whether a value has one of the schema's types"""
+    if 'type' not in schema:
+        return lambda value: True
+    types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+    type_checks = [JSON_TYPES[t] for t in types]
+    return lambda value: any(check(value) for check in type_checks)
+
+
+def compile_schema(schema):
+    """Compile a schema dict into a validate(value, pointer, errors) function.
+
+    Supports the keywords used by the schemas above: type, required,
+    properties, items, enum, pattern, minLength, maxLength, minItems,
+    minimum, oneOf and anyOf. Every check is resolved here, once.
+    """
+    checks = []
+
+    if 'type' in schema:
+        accepts_type = compile_type_filter(schema)
+        expected = schema['type'] if isinstance(schema['type'], str) else ' or '.join(schema['type'])
+
+        def check_type(value, pointer, errors):
+            if not accepts_type(value):
+                errors.append((pointer, f'expected {expected}, got {type(value).__name__}'))
+                return False
+            return True
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+
+        def check_enum(value, pointer, errors):
+            if value not in allowed:
+                errors.append((pointer, f'{value!r} is not one of the allowed values'))
+            return True
+        checks.append(check_enum)
+
+    if 'pattern' in schema or 'minLength' in schema or 'maxLength' in schema:
+        regex = re.compile(schema['pattern']) if 'pattern' in schema else None
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength')
+
+        def check_string(value, pointer, errors):
+            if not isinstance(value, str):
+                return True
+            if len(value) < min_length:
+                errors.append((pointer, f'shorter than {min_length} characters'))
+            if max_length is not None and len(value) > max_length:
+                errors.append((pointer, f'longer than {max_length} characters'))
+            if regex is not None and not regex.search(value):
+                errors.append((pointer, f'does not match pattern {regex.pattern!r}'))
+            return True
+        checks.append(check_string)
+
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+
+        def check_minimum(value, pointer, errors):
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value < minimum:
+                errors.append((pointer, f'{value} is less than {minimum}'))
+            return True
+        checks.append(check_minimum)
+
+    if 'required' in schema:
+        required = schema['required']
+
+        def check_required(value, pointer, errors):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        errors.append((pointer, f'missing required property {key!r}'))
+            return True
+        checks.append(check_required)
+
+    if 'properties' in schema:
+        properties = [
+            (key, escape_pointer(key), compile_schema(sub_schema))
+            for key, sub_schema in schema['properties'].items()
+        ]
+
+        def check_properties(value, pointer, errors):
+            if isinstance(value, dict):
+                for key, token, validate in properties:
+                    if key in value:
+                        validate(value[key], f'{pointer}/{token}', errors)
+            return True
+        checks.append(check_properties)
+
+    if 'minItems' in schema:
+        min_items = schema['minItems']
+
+        def check_min_items(value, pointer, errors):
+            if isinstance(value, list) and len(value) < min_items:
+                errors.append((pointer, f'expected at least {min_items} items, got {len(value)}'))
+            return True
+        checks.append(check_min_items)
+
+    if 'items' in schema:
+        validate_item = compile_schema(schema['items'])
+
+        def check_items(value, pointer, errors):
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    validate_item(item, f'{pointer}/{i}', errors)
+            return True
+        checks.append(check_items)
+
+    for keyword in ('oneOf', 'anyOf'):
+        if keyword in schema:
+            branches = [
+                (compile_schema(sub_schema), compile_type_filter(sub_schema))
+                for sub_schema in schema[keyword]
+            ]
+            exactly_one = keyword == 'oneOf'
+
+            def check_branches(value, pointer, errors, branches=branches,
+                               keyword=keyword, exactly_one=exactly_one):
+                branch_errors = []
+                matched = 0
+                for validate, accepts_type in branches:
+                    candidate = []
+                    validate(value, pointer, candidate)
+                    if candidate:
+                        branch_errors.append((not accepts_type(value), len(candidate), candidate))
+                    else:
+                        matched += 1
+                if matched == 0:
+                    # Report the closest branch, preferring one of the right type
+                    errors.extend(min(branch_errors, key=lambda b: b[:2])[2])
+                elif exactly_one and matched > 1:
+                    errors.append((pointer, f'matches {matched} {keyword} branches, expected exactly one'))
+                return True
+            checks.append(check_branches)
+
+    def validate(value, pointer, errors):
+        for check in checks:
+            # A type mismatch makes the remaining keywords meaningless
+            if not check(value, pointer, errors):
+                return
+    return validate
+
+
+# Compiled once at import time
+validate_flow = compile_schema(FLOW_SCHEMA)
+validate_cross_module_workflow = compile_schema(CROSS_MODULE_SCHEMA)
+
+
+def validate_all(data_path=DATA_PATH):
+    """Validate every module flow and cross-module workflow.
+
+    Returns (errors, stats) where errors is a list of
+    (file_name, json_pointer, message).
+    """
+    errors = []
+    stats = {'files': 0, 'flows': 0, 'workflows': 0}
+
+    for file_name in MODULE_FILES.values():
+        path = os.path.join(data_path, file_name)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append((file_name, '', str(e)))
+            continue
+
+        stats['files'] += 1
+        flows_pointer, flows = find_flows(data)
+        if not flows:
+            errors.append((file_name, '', 'no user_flows or flows list found'))
+            continue
+
+        file_errors = []
+        for i, flow in enumerate(flows):
+            validate_flow(flow, f'{flows_pointer}/{i}', file_errors)
+        stats['flows'] += len(flows)
+        errors.extend((file_name, pointer, message) for pointer, message in file_errors)
+
+    for file_name in CROSS_MODULE_FILES:
+        path = os.path.join(data_path, file_name)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append((file_name, '', str(e)))
+            continue
+
+        stats['files'] += 1
+        stats['workflows'] += 1
+        file_errors = []
+        validate_cross_module_workflow(data, '', file_errors)
+        errors.extend((file_name, pointer, message) for pointer, message in file_errors)
+
+    return errors, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate all flow data against the flow schemas')
+    parser.add_argument('--json', action='store_true', help='print errors as JSON')
+    parser.add_argument('--quiet', action='store_true', help='only print errors')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    errors, stats = validate_all()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps({
+            'valid': not errors,
+            'duration_ms': round(elapsed_ms, 3),
+            **stats,
+            'errors': [
+                {'file': file_name, 'pointer': pointer, 'message': message}
+                for file_name, pointer, message in errors
+            ]
+        }, indent=2))
+        return 1 if errors else 0
+
+    for file_name, pointer, message in errors:
+        print(f"❌ {file_name}#{pointer}: {message}")
+
+    if not args.quiet:
+        print(f"\nValidated {stats['flows']} flows and {stats['workflows']} cross-module workflows "
+              f"in {stats['files']} files ({elapsed_ms:.1f} ms)")
+        if errors:
+            print(f"❌ {len(errors)} schema errors found")
+        else:
+            print("✅ All flow data matches the schema")
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
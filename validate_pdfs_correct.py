@@ -8,32 +8,19 @@ import json
 import os
 from pathlib import Path
 
+from flow_data import DATA_PATH, MODULE_FILES, PDFS_PATH, find_flows
+from pdf_paths import resolve_pdf_path
+
 def validate_pdf_references():
     # Base paths
-    base_dir = Path('/Users/ashutoshbijoor/Documents/Accion Labs/Projects/Cision/Nexus/Brandwatch/brandwatch-docs-viewer')
-    json_dir = base_dir / 'public' / 'data'
-    pdf_base_dir = base_dir / 'public' / 'pdfs'
-
-    # JSON files to check
-    json_files = [
-        'advertise_user_flows_with_citations.json',
-        'audience_user_flows_with_citations.json',
-        'benchmark_user_flows_with_citations.json',
-        'brandwatch_reviews_user_flows_with_citations.json',
-        'consumer_research_user_flows_with_citations.json',
-        'engage_user_flows_with_citations.json',
-        'influence_user_flows_with_citations.json',
-        'listen_user_flows_with_citations.json',
-        'measure_user_flows_with_citations.json',
-        'publish_user_flows_with_citations.json',
-        'vizia_user_flows_with_citations.json'
-    ]
+    json_dir = Path(DATA_PATH)
+    pdf_base_dir = Path(PDFS_PATH)
 
     all_valid = True
     total_refs = 0
     invalid_refs = []
 
-    for json_file in json_files:
+    for module_id, json_file in MODULE_FILES.items():
         json_path = json_dir / json_file
         if not json_path.exists():
             print(f"⚠️  JSON file not found: {json_file}")
@@ -42,21 +29,21 @@ def validate_pdf_references():
         with open(json_path, 'r') as f:
             data = json.load(f)
 
-        module_name = data.get('module', 'Unknown')
+        module_name = data.get('module', module_id) if isinstance(data, dict) else module_id
         print(f"\nChecking {module_name} module ({json_file})...")
 
         module_refs = 0
         module_invalid = []
 
-        for flow in data.get('user_flows', []):
+        _, flows = find_flows(data)
+        for flow in flows:
             for pdf_ref in flow.get('source_documents', []):
                 module_refs += 1
                 total_refs += 1
 
-                # The PDF reference in JSON includes the module prefix
+                # Any citation form resolves to public/pdfs/[Module]/[path]
                 # e.g., "Engage/Getting Started/Introduction to Engage.pdf"
-                # This needs to be checked at public/pdfs/[full_path]
-                pdf_full_path = pdf_base_dir / pdf_ref
+                pdf_full_path = pdf_base_dir / resolve_pdf_path(pdf_ref, module_id)
 
                 if not pdf_full_path.exists():
                     module_invalid.append(pdf_ref)
@@ -67,7 +54,7 @@ def validate_pdf_references():
             print(f"  ❌ Found {len(module_invalid)} invalid references:")
             for ref in module_invalid:
                 print(f"     - {ref}")
-                print(f"       Expected at: {pdf_base_dir / ref}")
+                print(f"       Expected at: {pdf_base_dir / resolve_pdf_path(ref, module_id)}")
         else:
             print(f"  ✅ All {module_refs} PDF references are valid")
 
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Watch-mode PDF reference validator.
+
+Keeps every module's parsed flows and an index of the PDFs under
+public/pdfs in memory, then revalidates only what a change touches:
+  - a module JSON write reloads and rechecks that one module
+  - a PDF being added or removed rechecks only the references to it
+
+Results are written to data/generated/validation_status.json,
+which the API serves from GET /api/validation/status.
+
+Uses inotify on Linux and falls back to mtime polling elsewhere.
+
+Usage:
+    python3 validate_watch.py            # run until interrupted
+    python3 validate_watch.py --once     # validate everything, write status, exit
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+
+from flow_data import (
+    DATA_PATH,
+    MODULE_FILES,
+    PDFS_PATH,
+    SERVER_GENERATED_PATH,
+    get_flow_id,
+    iter_source_documents,
+    load_module,
+    module_for_file,
+    write_json_atomic,
+)
+from pdf_paths import resolve_pdf_path
+
+STATUS_FILE = os.path.join(SERVER_GENERATED_PATH, 'validation_status.json')
+
+
+def scan_pdf_index():
+    """Set of every PDF path under public/pdfs, relative to that directory"""
+    index = set()
+    for root, dirs, files in os.walk(PDFS_PATH):
+        for file in files:
+            if file.endswith('.pdf'):
+                rel_path = os.path.relpath(os.path.join(root, file), PDFS_PATH)
+                index.add(rel_path.replace(os.sep, '/'))
+    return index
+
+
+class ValidationState:
+    """In-memory module models, PDF index and per-reference results"""
+
+    def __init__(self):
+        self.pdf_index = set()
+        # module_id -> list of reference dicts
+        self.references = {}
+        # pdf relative path -> list of reference dicts pointing at it
+        self.by_pdf = {}
+        self.module_errors = {}
+        self.module_timings = {}
+        self.last_event = None
+
+    def load_all(self):
+        self.pdf_index = scan_pdf_index()
+        for module_id in MODULE_FILES:
+            self.reload_module(module_id)
+
+    def reload_module(self, module_id):
+        """Re-parse one module file and validate all of its references"""
+        start = time.perf_counter()
+
+        # Drop the module's old references from the reverse index
+        for ref in self.references.get(module_id, []):
+            refs = self.by_pdf.get(ref['resolved'])
+            if refs is not None:
+                refs[:] = [r for r in refs if r['module'] != module_id]
+                if not refs:
+                    del self.by_pdf[ref['resolved']]
+
+        references = []
+        self.module_errors.pop(module_id, None)
+        try:
+            data, flows_pointer, flows = load_module(module_id)
+        except (OSError, ValueError) as e:
+            # A half-written or missing file: keep reporting the error until fixed
+            self.module_errors[module_id] = str(e)
+            flows_pointer, flows = '', []
+
+        for i, flow in enumerate(flows):
+            for pointer, doc in iter_source_documents(flow):
+                resolved = resolve_pdf_path(doc, module_id)
+                ref = {
+                    'module': module_id,
+                    'flow_id': get_flow_id(flow),
+                    'pointer': f'{flows_pointer}/{i}{pointer}',
+                    'document': doc,
+                    'resolved': resolved,
+                    'valid': resolved in self.pdf_index
+                }
+                references.append(ref)
+                self.by_pdf.setdefault(resolved, []).append(ref)
+
+        self.references[module_id] = references
+        self.module_timings[module_id] = (time.perf_counter() - start) * 1000
+
+    def pdf_changed(self, rel_path, exists):
+        """Update the PDF index and recheck only references to that file"""
+        if exists:
+            self.pdf_index.add(rel_path)
+        else:
+            self.pdf_index.discard(rel_path)
+
+        for ref in self.by_pdf.get(rel_path, []):
+            ref['valid'] = exists
+        return {ref['module'] for ref in self.by_pdf.get(rel_path, [])}
+
+    def status(self):
+        modules = {}
+        total_refs = 0
+        total_missing = 0
+
+        for module_id in MODULE_FILES:
+            refs = self.references.get(module_id, [])
+            missing = [
+                {key: ref[key] for key in ('flow_id', 'pointer', 'document', 'resolved')}
+                for ref in refs if not ref['valid']
+            ]
+            modules[module_id] = {
+                'references': len(refs),
+                'missing': missing,
+                'error': self.module_errors.get(module_id),
+                'duration_ms': round(self.module_timings.get(module_id, 0), 3)
+            }
+            total_refs += len(refs)
+            total_missing += len(missing)
+
+        return {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'valid': total_missing == 0 and not self.module_errors,
+            'total_references': total_refs,
+            'total_missing': total_missing,
+            'pdf_count': len(self.pdf_index),
+            'last_event': self.last_event,
+            'modules': modules
+        }
+
+    def handle_change(self, path, exists):
+        """Dispatch a filesystem change; returns True if status changed"""
+        start = time.perf_counter()
+        abs_path = os.path.abspath(path)
+
+        if abs_path.startswith(PDFS_PATH + os.sep) and abs_path.endswith('.pdf'):
+            rel_path = os.path.relpath(abs_path, PDFS_PATH).replace(os.sep, '/')
+            affected = self.pdf_changed(rel_path, exists)
+            kind = 'pdf'
+        elif os.path.dirname(abs_path) == DATA_PATH and module_for_file(abs_path):
+            module_id = module_for_file(abs_path)
+            self.reload_module(module_id)
+            affected = {module_id}
+            rel_path = os.path.basename(abs_path)
+            kind = 'module'
+        else:
+            return False
+
+        self.last_event = {
+            'type': kind,
+            'path': rel_path,
+            'exists': exists,
+            'affected_modules': sorted(affected),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            'at': datetime.now(timezone.utc).isoformat()
+        }
+        return True
+
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Recursive directory watcher on top of the Linux inotify syscalls"""
+
+    def __init__(self, roots):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {}
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root):
+        for path, dirs, files in os.walk(root):
+            wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = path
+
+    def wait(self, timeout):
+        """Block for events; returns {path: exists} for changed files"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return {}
+
+        changes = {}
+        # Let a burst of writes settle so one save is handled once
+        time.sleep(0.01)
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(buf):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                directory = self.watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.add_tree(path)
+                        for root, dirs, files in os.walk(path):
+                            for file in files:
+                                changes[os.path.join(root, file)] = True
+                    continue
+
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    changes[path] = False
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changes[path] = True
+                elif mask & IN_CREATE and path.endswith('.pdf'):
+                    changes[path] = True
+        return changes
+
+
+class PollingWatcher:
+    """Portable fallback: compare file mtimes on every interval"""
+
+    def __init__(self, roots):
+        self.roots = roots
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for root in self.roots:
+            for path, dirs, files in os.walk(root):
+                for file in files:
+                    if file.endswith(('.pdf', '.json')):
+                        full_path = os.path.join(path, file)
+                        try:
+                            snapshot[full_path] = os.stat(full_path).st_mtime_ns
+                        except FileNotFoundError:
+                            pass
+        return snapshot
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        current = self.scan()
+        changes = {}
+        for path, mtime in current.items():
+            if self.snapshot.get(path) != mtime:
+                changes[path] = True
+        for path in self.snapshot.keys() - current.keys():
+            changes[path] = False
+        self.snapshot = current
+        return changes
+
+
+def create_watcher(roots, force_polling=False):
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(roots)
+
+
+def print_summary(status):
+    for module_id, result in status['modules'].items():
+        if result['error']:
+            print(f"❌ {module_id}: {result['error']}")
+        elif result['missing']:
+            print(f"❌ {module_id}: {len(result['missing'])}/{result['references']} missing")
+            for ref in result['missing']:
+                print(f"   • {ref['flow_id']}: {ref['document']}")
+        else:
+            print(f"✅ {module_id}: all {result['references']} references valid")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--once', action='store_true',
+                        help='validate once, write the status file and exit')
+    parser.add_argument('--poll', action='store_true',
+                        help='use mtime polling instead of inotify')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds between polls / select timeout (default: 1.0)')
+    parser.add_argument('--status-file', default=STATUS_FILE,
+                        help='where to write validation results')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = ValidationState()
+    state.load_all()
+    status = state.status()
+    write_json_atomic(args.status_file, status)
+
+    print(f"Loaded {len(MODULE_FILES)} modules and {len(state.pdf_index)} PDFs "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print_summary(status)
+
+    if args.once:
+        return 0 if status['valid'] else 1
+
+    watcher = create_watcher([DATA_PATH, PDFS_PATH], force_polling=args.poll)
+    print(f"\n👀 Watching for changes ({type(watcher).__name__}), Ctrl+C to stop")
+
+    try:
+        while True:
+            changes = watcher.wait(args.interval)
+            updated = False
+            for path, exists in changes.items():
+                if state.handle_change(path, exists):
+                    updated = True
+                    event = state.last_event
+                    print(f"🔄 {event['type']} {event['path']} → revalidated "
+                          f"{', '.join(event['affected_modules']) or 'nothing'} "
+                          f"in {event['duration_ms']:.2f} ms")
+            if updated:
+                status = state.status()
+                write_json_atomic(args.status_file, status)
+                print(f"   {status['total_missing']} missing of {status['total_references']} references")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
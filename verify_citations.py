@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Check that each flow step is actually supported by the PDFs it cites.
+
+For every module (in parallel) the cited PDFs' cached page text is turned
+into a shingle -> pages inverted index. Each step is shingled the same
+way and scored against the pages of its cited documents only:
+
+    score = mean(share of step words on the page,
+                 share of step word pairs on the page)
+
+Words are stemmed so "creating" on the page supports "create" in a step.
+
+The best page is reported with its 1-based page number; steps scoring
+below the threshold are flagged "unsupported".
+
+    python3 verify_citations.py [--threshold 0.3] [--json PATH]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from flow_data import (
+    MODULE_FILES,
+    SERVER_GENERATED_PATH,
+    get_flow_id,
+    get_flow_name,
+    get_step_text,
+    iter_source_documents,
+    load_module,
+    write_json_atomic,
+)
+from pdf_paths import resolve_pdf_path
+from pdf_text import get_pdf_pages, warm_cache
+from text_utils import shingles, stemmed_tokens
+
+REPORT_FILE = os.path.join(SERVER_GENERATED_PATH, 'citation_verification.json')
+DEFAULT_THRESHOLD = 0.3
+
+
+class PageIndex:
+    """Shingle -> [(document, page)] postings over a set of PDFs"""
+
+    def __init__(self):
+        self.postings = {}
+        self.missing = set()
+
+    def add_document(self, rel_path):
+        pages = get_pdf_pages(rel_path)
+        if pages is None:
+            self.missing.add(rel_path)
+            return
+        for page_number, text in enumerate(pages, start=1):
+            tokens = stemmed_tokens(text)
+            for shingle in shingles(tokens, k=1) | shingles(tokens, k=2):
+                self.postings.setdefault(shingle, []).append((rel_path, page_number))
+
+    def best_page(self, text, documents):
+        """Best (document, page, score) for text among the given documents"""
+        tokens = stemmed_tokens(text)
+        words = shingles(tokens, k=1)
+        # Word pairs reward phrasing taken from the page; short steps use words only
+        pairs = shingles(tokens, k=2) if len(tokens) > 2 else set()
+        if not words:
+            return None, None, 0.0
+
+        documents = set(documents)
+        word_hits = Counter()
+        pair_hits = Counter()
+        for shingle_set, hits in ((words, word_hits), (pairs, pair_hits)):
+            for shingle in shingle_set:
+                for document, page in self.postings.get(shingle, ()):
+                    if document in documents:
+                        hits[(document, page)] += 1
+
+        best = (None, None, 0.0)
+        for key, count in word_hits.items():
+            score = count / len(words)
+            if pairs:
+                score = (score + pair_hits[key] / len(pairs)) / 2
+            if score > best[2]:
+                best = (key[0], key[1], score)
+        return best
+
+
+def verify_module(module_id, threshold=DEFAULT_THRESHOLD):
+    """Score every step of one module against its cited PDFs"""
+    start = time.perf_counter()
+    _, flows_pointer, flows = load_module(module_id)
+
+    index = PageIndex()
+    for rel_path in module_cited_documents(module_id, flows):
+        index.add_document(rel_path)
+
+    results = []
+    for i, flow in enumerate(flows):
+        flow_documents = [resolve_pdf_path(doc, module_id) for doc in flow.get('source_documents') or []]
+        steps = []
+        for s, step in enumerate(flow.get('steps') or []):
+            documents = list(flow_documents)
+            if isinstance(step, dict):
+                documents += [resolve_pdf_path(doc, module_id) for doc in step.get('source_documents') or []]
+
+            text = get_step_text(step)
+            document, page, score = index.best_page(text, documents)
+            steps.append({
+                'pointer': f'{flows_pointer}/{i}/steps/{s}',
+                'text': text,
+                'document': document,
+                'page': page,
+                'score': round(score, 3),
+                'supported': score >= threshold
+            })
+
+        results.append({
+            'flow_id': get_flow_id(flow),
+            'flow_name': get_flow_name(flow),
+            'documents': flow_documents,
+            'supported_steps': sum(1 for step in steps if step['supported']),
+            'steps': steps
+        })
+
+    return {
+        'module': module_id,
+        'missing_documents': sorted(index.missing),
+        'steps': sum(len(flow['steps']) for flow in results),
+        'unsupported': sum(len(flow['steps']) - flow['supported_steps'] for flow in results),
+        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+        'flows': results
+    }
+
+
+def module_cited_documents(module_id, flows):
+    """Resolved flow- and step-level citations of one module"""
+    return {
+        resolve_pdf_path(doc, module_id)
+        for flow in flows for _, doc in iter_source_documents(flow)
+    }
+
+
+def cited_documents():
+    """Every resolved citation across all modules"""
+    documents = set()
+    for module_id in MODULE_FILES:
+        _, _, flows = load_module(module_id)
+        documents |= module_cited_documents(module_id, flows)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify flow steps against their cited PDFs')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum score for a supported step (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--json', metavar='PATH', default=REPORT_FILE,
+                        help='where to write the report')
+    parser.add_argument('--workers', type=int, help='process pool size')
+    parser.add_argument('--verbose', action='store_true', help='list every unsupported step')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    # Extract any PDFs not in the text cache yet, in parallel
+    warm_cache(cited_documents(), args.workers)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        modules = list(pool.map(verify_module, MODULE_FILES, [args.threshold] * len(MODULE_FILES)))
+
+    total_steps = sum(m['steps'] for m in modules)
+    total_unsupported = sum(m['unsupported'] for m in modules)
+
+    print("=" * 80)
+    print("CITATION VERIFICATION")
+    print("=" * 80)
+    for module in modules:
+        status = '✅' if module['unsupported'] == 0 else '⚠️ '
+        print(f"{status} {module['module']}: {module['steps'] - module['unsupported']}/{module['steps']} "
+              f"steps supported by cited PDFs ({module['duration_ms']:.0f} ms)")
+        for document in module['missing_documents']:
+            print(f"   ❌ cited PDF not found: {document}")
+        if args.verbose:
+            for flow in module['flows']:
+                for step in flow['steps']:
+                    if not step['supported']:
+                        print(f"   • {flow['flow_id']} {step['pointer']} ({step['score']:.2f}): {step['text'][:80]}")
+
+    write_json_atomic(args.json, {
+        'threshold': args.threshold,
+        'total_steps': total_steps,
+        'total_unsupported': total_unsupported,
+        'modules': {module['module']: module for module in modules}
+    })
+
+    print(f"\n{total_steps - total_unsupported}/{total_steps} steps supported "
+          f"({time.perf_counter() - start:.1f} s)")
+    print(f"Report written to {args.json}")
+    return 0 if total_unsupported == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())